@@ -1,11 +1,22 @@
 import flet as ft
 import asyncio
+import threading
+import time
 from datetime import datetime
 
 from controllers.empresa_controller import EmpresaController
 from controllers.usuario_controller import UsuarioController
 from controllers.operador_controller import OperadorController
 from controllers.contrato_controller import ContratoController
+from controle_acesso import ControleAcesso
+from utils.cancelamento import TokenCancelamento
+from utils.logger import obter_logger
+from views.tabela_contratos import TabelaContratos
+
+logger = obter_logger(__name__)
+
+# Intervalo mínimo (s) entre atualizações da tela durante uma busca
+INTERVALO_ATUALIZACAO_TELA = 0.25
 
 class TelaContratos:
     def __init__(self):
@@ -146,31 +157,13 @@ class TelaContratos:
             label="Operador"
         )
         
-        # Tabela de dados
-        data_table = ft.DataTable(
-            columns=[
-                ft.DataColumn(ft.Text("Matrícula", weight=ft.FontWeight.BOLD)),
-                ft.DataColumn(ft.Text("Nome", weight=ft.FontWeight.BOLD)),
-                ft.DataColumn(ft.Text("CPF", weight=ft.FontWeight.BOLD)),
-                ft.DataColumn(ft.Text("Data Admissão", weight=ft.FontWeight.BOLD)),
-                ft.DataColumn(ft.Text("Cargo", weight=ft.FontWeight.BOLD)),
-                ft.DataColumn(ft.Text("Departamento", weight=ft.FontWeight.BOLD)),
-                ft.DataColumn(ft.Text("Situação", weight=ft.FontWeight.BOLD)),
-                ft.DataColumn(ft.Text("Empresa", weight=ft.FontWeight.BOLD)),
-            ],
-            rows=[],
-            border=ft.border.all(1, ft.colors.BLUE_GREY_200),
-            vertical_lines=ft.border.BorderSide(1, ft.colors.BLUE_GREY_200),
-            horizontal_lines=ft.border.BorderSide(1, ft.colors.BLUE_GREY_200),
-            heading_row_color=ft.colors.BLUE_50,
-            heading_row_height=50,
-            data_row_color=ft.colors.WHITE,
-            data_row_min_height=40,
-            data_row_max_height=40,
-            column_spacing=20,
-            width=1100,
-            horizontal_margin=10
-        )
+        # Tabela de dados (paginada). Ela e o restante do estado da busca são
+        # locais da sessão: no modo web a mesma TelaContratos atende todas
+        tabela_contratos = TabelaContratos()
+        # Token da busca de contratos em andamento (botão Cancelar)
+        busca_em_andamento = [None]
+        # Usuário logado e suas permissões: cada sessão tem o seu
+        controle_acesso = ControleAcesso()
         
         # Container para a tabela com scroll
         table_container = ft.Container(
@@ -193,10 +186,11 @@ class TelaContratos:
                         ],
                         alignment=ft.MainAxisAlignment.SPACE_BETWEEN
                     ),
+                    tabela_contratos.barra_filtros,
                     ft.Container(height=10),
                     ft.Container(
                         content=ft.Column(
-                            [data_table],
+                            [tabela_contratos.data_table],
                             scroll=ft.ScrollMode.AUTO,
                             spacing=0,
                             height=400,
@@ -204,7 +198,8 @@ class TelaContratos:
                         border=ft.border.all(1, ft.colors.BLUE_GREY_200),
                         border_radius=8,
                         padding=10
-                    )
+                    ),
+                    tabela_contratos.barra_paginacao
                 ]
             ),
             padding=20,
@@ -215,12 +210,19 @@ class TelaContratos:
         )
         
         # Indicador de carregamento
-        self.progress = ft.ProgressBar(
+        progress = ft.ProgressBar(
             visible=False,
             color=ft.colors.BLUE,
             bgcolor=ft.colors.BLUE_GREY_100
         )
         
+        # Andamento por tenant na busca em todas as empresas
+        status_busca = ft.Text(
+            visible=False,
+            size=12,
+            color=ft.colors.BLUE_GREY_700
+        )
+        
         # Container principal que vai alternar entre login e conteúdo
         self.main_container = ft.Container(expand=True)
         
@@ -254,6 +256,7 @@ class TelaContratos:
                 # Login bem sucedido
                 erro_login.visible = False
                 info_usuario.value = f"Usuário: {usuario.value}"
+                controle_acesso.usuario_atual = usuario.value
                 
                 # Verificar se é admin
                 usuario_data = self.usuario_controller.get_usuario(usuario.value)
@@ -265,7 +268,8 @@ class TelaContratos:
                         header,
                         tabs,
                         filtros_card,
-                        self.progress,
+                        progress,
+                        status_busca,
                         table_container
                     ],
                     expand=True,
@@ -292,6 +296,7 @@ class TelaContratos:
         
         def fazer_logout(e):
             """Realiza o logout do usuário."""
+            controle_acesso.fazer_logout()
             usuario.value = ""
             senha.value = ""
             empresa_dropdown.options = []
@@ -305,118 +310,146 @@ class TelaContratos:
             self.page.update()
         
         def buscar_contratos(e):
-            try:
-                # Validar mês e ano
-                if not mes.value or not ano.value:
-                    self.page.open(
-                        ft.SnackBar(
-                            content=ft.Text("Por favor, preencha mês e ano"),
-                            bgcolor=ft.colors.RED_400
-                        )
+            """Valida os filtros e dispara a busca em uma thread de trabalho.
+
+            O handler retorna logo; páginas chegam à tabela pela thread da busca
+            e a tela continua respondendo (paginação, outras sessões no modo web).
+            """
+            # Validar mês e ano
+            if not mes.value or not ano.value:
+                page.open(
+                    ft.SnackBar(
+                        content=ft.Text("Por favor, preencha mês e ano"),
+                        bgcolor=ft.colors.RED_400
                     )
-                    return
+                )
+                return
 
-                # Mostrar progresso
-                self.progress.visible = True
-                self.page.update()
+            # Mostrar progresso e impedir uma segunda busca simultânea
+            cancelamento = TokenCancelamento()
+            busca_em_andamento[0] = cancelamento
+            btn_buscar.disabled = True
+            btn_cancelar.visible = True
+            btn_cancelar.disabled = False
+            progress.value = None
+            progress.visible = True
+            status_busca.value = "Buscando contratos..."
+            status_busca.visible = True
 
-                # Limpar tabela atual
-                data_table.rows.clear()
+            # Limpar tabela atual
+            tabela_contratos.limpar()
+            table_container.content.controls[0].controls[1].value = "Total de registros: 0"
+            page.update()
 
-                # INFORMAÇÕES DE DEPURAÇÃO DETALHADAS
-                print("=" * 50)
-                print("DEPURAÇÃO DE BUSCA DE CONTRATOS")
-                print("=" * 50)
-                print(f"Mês selecionado: {mes.value} (tipo: {type(mes.value)})")
-                print(f"Ano selecionado: {ano.value} (tipo: {type(ano.value)})")
-                print(f"Empresa selecionada: {empresa_dropdown.value} (tipo: {type(empresa_dropdown.value)})")
-                print(f"Operador selecionado: {operador_dropdown.value} (tipo: {type(operador_dropdown.value)})")
-                
-                # Debug: Mostrar opções disponíveis
-                print("\nOpções disponíveis no dropdown de empresas:")
-                for option in empresa_dropdown.options:
-                    if option is not None and hasattr(option, 'value'):
-                        print(f"  - Valor: '{option.value}', Texto: '{option.text}'")
-                    else:
-                        print(f"  - Opção inválida: {option}")
+            threading.Thread(
+                target=executar_busca,
+                args=(mes.value, ano.value, empresa_dropdown.value, operador_dropdown.value, cancelamento),
+                name="busca_contratos",
+                daemon=True
+            ).start()
 
-                print("\nOpções disponíveis no dropdown de operadores:")
-                for option in operador_dropdown.options:
-                    if option is not None and hasattr(option, 'value'):
-                        print(f"  - Valor: '{option.value}', Texto: '{option.text}'")
-                    else:
-                        print(f"  - Opção inválida: {option}")
-                print("=" * 50)
+        def cancelar_busca(e):
+            """Interrompe a busca em andamento; as páginas já recebidas continuam na tabela."""
+            if busca_em_andamento[0] is not None:
+                busca_em_andamento[0].cancelar()
+                btn_cancelar.disabled = True
+                status_busca.value = "Cancelando busca..."
+                page.update()
 
-                # Fetch contracts based on selected filters
-                contratos, mensagem = self.contrato_controller.buscar_contratos(
-                    mes=mes.value,
-                    ano=ano.value,
-                    codigo_empresa=empresa_dropdown.value,
-                    email_operador=operador_dropdown.value
-                )
+        def executar_busca(mes_busca, ano_busca, codigo_empresa, email_operador, cancelamento):
+            """Busca os contratos fora do event loop, exibindo cada página recebida."""
+            tela_lock = threading.Lock()
+            ultima_atualizacao = [0.0]
+            andamento_tenants = {}
+            andamento_paginas = [""]
+            todas_empresas = not codigo_empresa
 
-                # Imprimir resultados da busca
-                print("\nRESULTADOS DA BUSCA:")
-                print(f"Total de contratos encontrados: {len(contratos)}")
-                if len(contratos) > 0:
-                    print("Primeiros 3 contratos (amostra):")
-                    for i, contrato in enumerate(contratos[:3]):
-                        if isinstance(contrato, dict):
-                            print(f"Contrato {i+1}: Matrícula={contrato.get('matricula', 'N/A')}, Nome={contrato.get('nome', 'N/A')}")
-                        else:
-                            print(f"Contrato {i+1}: Formato inválido - {type(contrato)}")
-                print("=" * 50)
+            def atualizar_tela(forcar=False):
+                # No máximo uma atualização a cada INTERVALO_ATUALIZACAO_TELA segundos
+                agora = time.monotonic()
+                if forcar or agora - ultima_atualizacao[0] >= INTERVALO_ATUALIZACAO_TELA:
+                    ultima_atualizacao[0] = agora
+                    page.update()
 
-                # Preencher tabela com os contratos
-                for contrato in contratos:
-                    if isinstance(contrato, dict):
-                        data_table.rows.append(
-                            ft.DataRow(
-                                cells=[
-                                    ft.DataCell(ft.Text(str(contrato.get('matricula', '')))),
-                                    ft.DataCell(ft.Text(str(contrato.get('nome', '')))),
-                                    ft.DataCell(ft.Text(str(contrato.get('cpf', '')))),
-                                    ft.DataCell(ft.Text(str(contrato.get('data_admissao', '')))),
-                                    ft.DataCell(ft.Text(str(contrato.get('cargo', '')))),
-                                    ft.DataCell(ft.Text(str(contrato.get('departamento', '')))),
-                                    ft.DataCell(
-                                        ft.Container(
-                                            content=ft.Text(
-                                                str(contrato.get('situacao', '')),
-                                                color=ft.colors.WHITE,
-                                                text_align=ft.TextAlign.CENTER
-                                            ),
-                                            bgcolor=ft.colors.GREEN if contrato.get('situacao') == 'Ativo' else ft.colors.RED_400,
-                                            border_radius=15,
-                                            padding=ft.padding.symmetric(horizontal=10, vertical=5)
-                                        )
-                                    ),
-                                    ft.DataCell(ft.Text(str(contrato.get('empresa', {}).get('Codigo', '')))),
-                                ]
-                            )
-                        )
+            def atualizar_status():
+                partes = [andamento_paginas[0]] if andamento_paginas[0] else []
+                partes.extend(andamento_tenants.values())
+                status_busca.value = " | ".join(partes)
 
-                # Atualizar contador de registros
-                total_registros = len(contratos)
-                table_container.content.controls[0].controls[1].value = f"Total de registros: {total_registros}"
+            def ao_receber_pagina(paginas_concluidas, total_paginas, contratos_pagina):
+                if todas_empresas:
+                    contratos_pagina = controle_acesso.filtrar_contratos(contratos_pagina)
+                with tela_lock:
+                    tabela_contratos.adicionar_contratos(contratos_pagina)
+                    recebidos = len(tabela_contratos.contratos)
+                    progress.value = paginas_concluidas / total_paginas if total_paginas else None
+                    andamento_paginas[0] = f"Páginas {paginas_concluidas}/{total_paginas} - {recebidos} contratos"
+                    atualizar_status()
+                    table_container.content.controls[0].controls[1].value = f"Total de registros: {recebidos}"
+                    atualizar_tela()
 
-                # Esconder progresso
-                self.progress.visible = False
-                self.page.update()
+            def ao_progredir(tenet_id, situacao, quantidade):
+                with tela_lock:
+                    andamento_tenants[tenet_id] = f"{tenet_id}: {situacao}" + (f" ({quantidade})" if quantidade else "")
+                    atualizar_status()
+                    atualizar_tela()
+
+            def finalizar_busca():
+                progress.visible = False
+                btn_buscar.disabled = False
+                btn_cancelar.visible = False
+                if busca_em_andamento[0] is cancelamento:
+                    busca_em_andamento[0] = None
+                atualizar_tela(forcar=True)
+
+            try:
+                logger.debug("Busca de contratos pela tela", extra={"campos": {
+                    "mes": mes_busca, "ano": ano_busca, "empresa": codigo_empresa, "operador": email_operador
+                }})
+
+                # Fetch contracts based on selected filters
+                if codigo_empresa:
+                    contratos, mensagem = self.contrato_controller.buscar_contratos(
+                        mes=mes_busca,
+                        ano=ano_busca,
+                        codigo_empresa=codigo_empresa,
+                        email_operador=email_operador,
+                        ao_receber_pagina=ao_receber_pagina,
+                        cancelamento=cancelamento
+                    )
+                else:
+                    # Todas as Empresas: buscar em todos os tenants permitidos ao usuário
+                    contratos, mensagem = self.contrato_controller.buscar_contratos_todas_empresas(
+                        mes=mes_busca,
+                        ano=ano_busca,
+                        empresas=controle_acesso.get_empresas_permitidas(),
+                        email_operador=email_operador,
+                        ao_progredir=ao_progredir,
+                        filtrar_por_empresa=not controle_acesso.tem_acesso_total(),
+                        ao_receber_pagina=ao_receber_pagina,
+                        cancelamento=cancelamento
+                    )
+                    contratos = controle_acesso.filtrar_contratos(contratos)
+
+                logger.info("Busca concluída: %d contratos", len(contratos))
+
+                with tela_lock:
+                    # Resultado final (ordenado) substitui as páginas recebidas
+                    tabela_contratos.definir_contratos(contratos, manter_pagina=True)
+                    table_container.content.controls[0].controls[1].value = f"Total de registros: {len(contratos)}"
+                    status_busca.value = mensagem
+                    finalizar_busca()
 
             except Exception as e:
-                print(f"Erro ao buscar contratos: {str(e)}")
-                import traceback
-                print(f"Detalhes do erro:\n{traceback.format_exc()}")
-                self.page.open(
-                    ft.SnackBar(
-                        content=ft.Text(f"Erro ao buscar contratos: {str(e)}"),
-                        bgcolor=ft.colors.RED_400
+                logger.exception("Erro ao buscar contratos: %s", e)
+                with tela_lock:
+                    page.open(
+                        ft.SnackBar(
+                            content=ft.Text(f"Erro ao buscar contratos: {str(e)}"),
+                            bgcolor=ft.colors.RED_400
+                        )
                     )
-                )
-                self.progress.visible = False
-                self.page.update()
+                    finalizar_busca()
         
         # Botões
         btn_login = ft.ElevatedButton(
@@ -450,6 +483,17 @@ class TelaContratos:
             color=ft.colors.WHITE
         )
         
+        btn_cancelar = ft.OutlinedButton(
+            "Cancelar",
+            icon=ft.icons.CANCEL,
+            on_click=cancelar_busca,
+            visible=False,
+            style=ft.ButtonStyle(
+                shape=ft.RoundedRectangleBorder(radius=8),
+                padding=ft.padding.symmetric(horizontal=20, vertical=15),
+            )
+        )
+        
         # Tela de login
         login_card = ft.Card(
             content=ft.Container(
@@ -586,6 +630,7 @@ class TelaContratos:
                                     border_radius=8
                                 ),
                                 ft.Container(expand=True),
+                                btn_cancelar,
                                 btn_buscar
                             ],
                             alignment=ft.MainAxisAlignment.START,
@@ -1385,9 +1430,9 @@ class TelaContratos:
         """Atualiza a lista de usuários na tabela."""
         if hasattr(self, 'tabela_usuarios') and self.tabela_usuarios:
             self.tabela_usuarios.rows.clear()
-            for user in self.usuario_controller.get_todos_usuarios():
-                # Obter empresas do usuário
-                empresas_usuario = self.usuario_controller.get_empresas_usuario(user["username"])
+            for user in self.usuario_controller.get_usuarios_com_empresas():
+                # Empresas do usuário já vêm da mesma consulta
+                empresas_usuario = user["empresas"]
                 empresas_str = ", ".join([f"{emp['codigo']} - {emp['nome']}" for emp in empresas_usuario])
                 
                 # Criar botões de ação
@@ -2423,5 +2468,17 @@ class TelaContratos:
             self.page.update()
 
 if __name__ == "__main__":
+    import argparse
+    from utils.cache_wsdl import configurar_cache_wsdl
+    from utils.logger import configurar_logging
+
+    configurar_logging()
+
+    parser = argparse.ArgumentParser(description="Sistema de Contratos de Trabalho")
+    parser.add_argument("--wsdl-dir", help="Diretório com a cópia local do WSDL da LG (modo offline)")
+    args, _ = parser.parse_known_args()
+    if args.wsdl_dir:
+        configurar_cache_wsdl(args.wsdl_dir, offline=True)
+
     app = TelaContratos()
     ft.app(target=app.main, port=8551) 
\ No newline at end of file
@@ -1,23 +1,204 @@
-from zeep import Client
-from zeep.transports import Transport
-from zeep.plugins import HistoryPlugin
-from requests import Session
-from requests.auth import HTTPBasicAuth
-from datetime import datetime, date
-from typing import Dict, Any, Optional, List
+import asyncio
+import functools
+from dataclasses import dataclass
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import date, timedelta
+from typing import Dict, Any, Optional, List, Callable, Iterable, Iterator, AsyncIterator, NamedTuple, Tuple
+import logging
 import time
 import os, sys
 
+from database import Database
+from utils.cancelamento import BuscaCancelada, TokenCancelamento
+from utils.cliente_lg import ClienteLG, get_registro_clientes
+from utils.limitador_taxa import LimitadorTaxa, eh_throttling, estado_limitadores, get_limitador, get_limite_concorrencia
+from utils.logger import obter_logger, obter_logger_amostrado
+from utils.planejador_filtros import SEM_FILTROS, PlanoFiltros, planejar_filtros
+from utils.parser_lg import PaginaExtraida, RespostaNaoInterpretada, extrair_pagina, parser_disponivel
+from utils.resiliencia import CircuitoAbertoError, DisjuntorCircuito, PoliticaRetentativa, eh_retentavel, get_disjuntor
+
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__),'..')))
 
+logger = obter_logger(__name__)
+# Logs por contrato: só 1 a cada LOG_AMOSTRAGEM, e apenas com DEBUG ligado
+logger_contratos = obter_logger_amostrado(__name__ + ".contratos")
+
 #from parametros_conexao import usuario, senha, ambiente, tenetId, config
 
+@dataclass(frozen=True)
+class Contrato:
+    """Contrato de trabalho retornado pela LG.
+
+    Registro imutável e sem ``__dict__``, bem mais leve que o dicionário
+    aninhado usado antes. Para não quebrar quem ainda lê contratos como
+    dicionário, aceita ``contrato['campo']``, ``contrato.get('campo')``,
+    ``keys()``/``items()`` e ``to_dict()``, com o formato antigo:
+    ``'data_admissao'`` como texto dd/mm/aaaa e ``'empresa'`` como
+    ``{'Codigo': ...}``.
+    """
+    __slots__ = ('nome', 'cpf', 'data_admissao', 'cargo', 'departamento', 'matricula', 'situacao', 'empresa_codigo')
+
+    nome: str
+    cpf: str
+    data_admissao: Optional[date]
+    cargo: str
+    departamento: str
+    matricula: str
+    situacao: str
+    empresa_codigo: str
+
+    CHAVES = ('nome', 'cpf', 'data_admissao', 'cargo', 'departamento', 'matricula', 'situacao', 'empresa')
+
+    @classmethod
+    def criar(cls, nome, cpf, data_admissao, cargo, departamento, matricula, situacao, empresa_codigo) -> "Contrato":
+        """Cria o contrato internando os textos que se repetem entre linhas."""
+        return cls(
+            nome,
+            cpf,
+            data_admissao,
+            _internar(cargo),
+            _internar(departamento),
+            matricula,
+            _internar(situacao),
+            _internar(empresa_codigo)
+        )
+
+    @property
+    def data_admissao_formatada(self) -> str:
+        """Data de admissão no padrão brasileiro (dd/mm/aaaa)."""
+        if self.data_admissao is None:
+            return None
+        return self.data_admissao.strftime("%d/%m/%Y")
+
+    def __getitem__(self, chave: str):
+        if chave == 'data_admissao':
+            return self.data_admissao_formatada
+        if chave == 'empresa':
+            return {'Codigo': self.empresa_codigo}
+        if chave in self.__slots__:
+            return getattr(self, chave)
+        raise KeyError(chave)
+
+    def __contains__(self, chave) -> bool:
+        return chave in self.CHAVES
+
+    def get(self, chave: str, padrao=None):
+        try:
+            return self[chave]
+        except KeyError:
+            return padrao
+
+    def keys(self):
+        return self.CHAVES
+
+    def items(self):
+        return [(chave, self[chave]) for chave in self.CHAVES]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Dicionário no formato antigo (o mesmo da visão de dicionário)."""
+        return dict(self.items())
+
+    def para_linha(self) -> tuple:
+        """Tupla no formato da tabela local de contratos (data em ISO)."""
+        return (
+            self.nome,
+            self.cpf,
+            self.data_admissao.isoformat() if self.data_admissao else None,
+            self.cargo,
+            self.departamento,
+            str(self.matricula) if self.matricula not in (None, '') else None,
+            self.situacao,
+            self.empresa_codigo
+        )
+
+    def __reduce__(self):
+        # Registro imutável com __slots__: recriar pelo construtor (copy/pickle)
+        return (Contrato, tuple(getattr(self, campo) for campo in self.__slots__))
+
+
+def _internar(valor):
+    """Interna textos repetidos (cargo, departamento, situação, empresa)."""
+    if valor is None:
+        return None
+    return sys.intern(str(valor))
+
+
+# ao_receber_pagina(paginas_concluidas, total_paginas, contratos_da_pagina)
+AoReceberPagina = Callable[[int, int, List[Contrato]], None]
+
+
+class ResultadoBusca(list):
+    """Lista de contratos que também informa as páginas que falharam.
+
+    Continua sendo uma lista para quem só itera os contratos; quem precisa
+    saber se a busca foi parcial consulta ``completo`` e ``paginas_com_falha``.
+    """
+
+    def __init__(self, contratos=(), falhas: Optional[Dict[int, Exception]] = None, erro: Optional[Exception] = None,
+                 falhas_por_tenant: Optional[Dict[str, Exception]] = None):
+        super().__init__(contratos)
+        self.falhas = {pagina: str(e) for pagina, e in (falhas or {}).items()}
+        self.erro = str(erro) if erro else None
+        self.cancelado = isinstance(erro, BuscaCancelada)
+        # Buscas em vários tenants: tenants cuja busca falhou ou veio parcial
+        self.falhas_por_tenant = {tenant: str(e) for tenant, e in (falhas_por_tenant or {}).items()}
+
+    @property
+    def paginas_com_falha(self) -> List[int]:
+        """Números das páginas (a partir de 0) que não puderam ser buscadas."""
+        return sorted(self.falhas)
+
+    @property
+    def completo(self) -> bool:
+        return self.erro is None and not self.falhas and not self.falhas_por_tenant
+
+
+class _ConsultaPaginada(NamedTuple):
+    """Tudo o que a consulta de uma página precisa, montado uma vez por busca."""
+    client: Any
+    filtro_factory: Any
+    filtros_especificos: Any
+    soapheaders: Dict
+    limitador: LimitadorTaxa
+    disjuntor: DisjuntorCircuito
+    bruto: bool = False
+    plano: PlanoFiltros = SEM_FILTROS
+    empresas_servidor: Any = None
+    cancelamento: Optional[TokenCancelamento] = None
+
+
 class ContratoTrabalhoLG:
     # URL fixa do WSDL
     WSDL_URL = 'https://prd-api1.lg.com.br/v1/ServicoDeContratoDeTrabalho'
 
-    def __init__(self):
+    # Páginas buscadas em paralelo por tenant, quando não configurado
+    CONCORRENCIA_PADRAO = 4
+
+    # Intervalo (s) com que a espera pelas páginas confere o cancelamento
+    INTERVALO_VERIFICACAO_CANCELAMENTO = 0.2
+
+    # Sincronização incremental: dias relidos antes da marca d'água (admissões
+    # lançadas com atraso ou corrigidas) e início da primeira sincronização
+    DIAS_SOBREPOSICAO_SINCRONIZACAO = 7
+    INICIO_SINCRONIZACAO_PADRAO = date(2000, 1, 1)
+    # Admissões futuras já cadastradas também são trazidas
+    DIAS_FUTURO_SINCRONIZACAO = 366
+
+    # Campo e operações de FiltroDeCamposEspecificos (enumerações do serviço da LG)
+    CAMPO_DATA_ADMISSAO = 2
+    OPERACAO_MENOR = 3
+    OPERACAO_MAIOR_OU_IGUAL = 4
+
+    def __init__(self, concorrencia_por_tenant: Optional[Dict[str, int]] = None,
+                 politica_retentativa: Optional[PoliticaRetentativa] = None,
+                 parser_rapido: Optional[bool] = None):
         self.client = None
+        self.concorrencia_por_tenant = dict(concorrencia_por_tenant or {})
+        self.politica_retentativa = politica_retentativa or PoliticaRetentativa()
+        # Parser rápido (lxml) das respostas; ativado também por LG_PARSER_RAPIDO=1
+        if parser_rapido is None:
+            parser_rapido = os.environ.get("LG_PARSER_RAPIDO", "0") == "1"
+        self.parser_rapido = parser_rapido and parser_disponivel()
         # Remover inicialização das credenciais no construtor
         # self.operator_email = None
         # self.operator_password = None
@@ -26,39 +207,38 @@ class ContratoTrabalhoLG:
         # self.wsdl_url = None
         # self._initialize_client()
 
-    def _initialize_client(self, operator_email: str, operator_password: str, tenet_id: str, ambiente: str):
-        """Inicializa o cliente WSDL com as credenciais fornecidas."""
+    def _initialize_client(self, operator_email: str, operator_password: str, tenet_id: str, ambiente: str) -> ClienteLG:
+        """Obtém o cliente WSDL das credenciais fornecidas a partir do registro do processo.
+
+        O WSDL é baixado e compilado apenas na primeira chamada; as seguintes
+        reutilizam a definição compilada e só trocam sessão e cabeçalhos.
+        """
         if not all([operator_email, operator_password, tenet_id, ambiente]):
             raise ValueError("Todos os parâmetros são obrigatórios: operator_email, operator_password, tenet_id, ambiente")
 
-        # Criar sessão com autenticação básica
-        session = Session()
-        session.auth = HTTPBasicAuth(operator_email, operator_password)
-        
-        # Criar transporte com a sessão autenticada
-        transport = Transport(session=session)
-        
-        # Plugin para histórico (útil para debug)
-        history = HistoryPlugin()
-
-        # Criar cliente SOAP com WSDL
-        self.client = Client(
-            wsdl=self.WSDL_URL,
-            transport=transport,
-            plugins=[history]
+        cliente = get_registro_clientes(self.WSDL_URL).obter(
+            operator_email,
+            operator_password,
+            tenet_id,
+            ambiente
         )
+        self.client = cliente.client
+        return cliente
 
-    def buscar_contratos_mes_atual(self, operator_email, operator_password, tenet_id, ambiente) -> List[Dict[str, Any]]:
+    def buscar_contratos_mes_atual(self, operator_email, operator_password, tenet_id, ambiente) -> List[Contrato]:
         """
         Busca contratos com data de admissão no mês atual.
         
         Returns:
-            List[Dict[str, Any]]: Lista de contratos do mês atual
+            List[Contrato]: Lista de contratos do mês atual
         """
         hoje = date.today()
         return self.buscar_contratos_por_mes(hoje.year, hoje.month, tenet_id, ambiente, operator_email, operator_password)
 
-    def buscar_contratos_por_mes(self, ano: int, mes: int, tenet_id: str, ambiente: str, operator_email: str, operator_password: str) -> List[Dict[str, Any]]:
+    def buscar_contratos_por_mes(self, ano: int, mes: int, tenet_id: str, ambiente: str, operator_email: str, operator_password: str, ordenar: bool = True,
+                                 empresas: Optional[Iterable[str]] = None,
+                                 ao_receber_pagina: Optional[AoReceberPagina] = None,
+                                 cancelamento: Optional[TokenCancelamento] = None) -> List[Contrato]:
         """
         Busca contratos com data de admissão em um mês específico.
         
@@ -69,189 +249,729 @@ class ContratoTrabalhoLG:
             ambiente: Ambiente (obrigatório)
             operator_email: Email do operador para autenticação (obrigatório)
             operator_password: Senha do operador para autenticação (obrigatório)
+            ordenar: Se True, ordena o resultado por data de admissão
+            empresas: Códigos das empresas desejadas (None: todas as do tenant)
+            ao_receber_pagina: Ver buscar_contratos_por_periodo
+            cancelamento: Ver buscar_contratos_por_periodo
+            
+        Returns:
+            List[Contrato]: Lista de contratos do mês especificado
+        """
+        inicio, fim = self._limites_do_mes(ano, mes)
+        return self.buscar_contratos_por_periodo(inicio, fim, tenet_id, ambiente, operator_email, operator_password, ordenar=ordenar, empresas=empresas,
+                                                 ao_receber_pagina=ao_receber_pagina, cancelamento=cancelamento)
+
+    def buscar_contratos_por_periodo(self, inicio: date, fim: date, tenet_id: str, ambiente: str, operator_email: str, operator_password: str, ordenar: bool = True,
+                                     empresas: Optional[Iterable[str]] = None,
+                                     ao_receber_pagina: Optional[AoReceberPagina] = None,
+                                     cancelamento: Optional[TokenCancelamento] = None) -> List[Contrato]:
+        """
+        Busca contratos com data de admissão no intervalo [inicio, fim).
+        
+        Os dois limites são enviados ao servidor, de modo que o volume
+        transferido acompanha o tamanho da janela pedida. Com ``empresas``, o
+        planejador de filtros envia os códigos ao servidor quando possível e
+        confere cada contrato localmente. Para processar os contratos à medida
+        que as páginas chegam, use iterar_contratos.
+        
+        Args:
+            inicio: Primeiro dia do período (inclusivo)
+            fim: Dia seguinte ao último dia do período (exclusivo)
+            tenet_id: ID do tenant no sistema (obrigatório)
+            ambiente: Ambiente (obrigatório)
+            operator_email: Email do operador para autenticação (obrigatório)
+            operator_password: Senha do operador para autenticação (obrigatório)
+            ordenar: Se True, ordena o resultado por data de admissão
+            empresas: Códigos das empresas desejadas (None: todas as do tenant)
+            ao_receber_pagina: Chamada a cada página recebida, na ordem, como
+                ao_receber_pagina(paginas_concluidas, total_paginas, contratos_da_pagina).
+                Roda na thread da busca; o resultado final continua sendo o retorno.
+            cancelamento: Token que interrompe a busca; requisições em andamento
+                são abandonadas e as páginas pendentes descartadas
             
         Returns:
-            List[Dict[str, Any]]: Lista de contratos do mês especificado
+            ResultadoBusca: Lista de contratos do período especificado. Páginas
+            que falharam mesmo após as novas tentativas não interrompem a busca:
+            ficam em ``paginas_com_falha`` e o resultado vem com ``completo=False``.
+            Uma busca cancelada traz os contratos recebidos até então, com
+            ``erro`` BuscaCancelada.
         """
+        falhas: Dict[int, Exception] = {}
+        todos_contratos = []
         try:
-            # Log detalhado dos parâmetros recebidos
-            print("\n" + "=" * 80)
-            print("DEPURAÇÃO DE CONTRATO_TRABALHO - MÉTODO BUSCAR_CONTRATOS_POR_MES")
-            print("=" * 80)
-            print(f"Parâmetros recebidos:")
-            print(f"  - ano: {ano} (tipo: {type(ano)})")
-            print(f"  - mês: {mes} (tipo: {type(mes)})")
-            print(f"  - tenet_id: {tenet_id} (tipo: {type(tenet_id)})")
-            print(f"  - ambiente: {ambiente} (tipo: {type(ambiente)})")
-            print(f"  - operator_email: {operator_email} (tipo: {type(operator_email)})")
-            print(f"  - operator_password: {'***' if operator_password else None} (tipo: {type(operator_password)})")
-            print(f"  - wsdl_url: {self.WSDL_URL}")
+            logger.debug("Buscando contratos do período", extra={"campos": {
+                "inicio": inicio, "fim": fim, "tenet_id": tenet_id, "ambiente": ambiente,
+                "operator_email": operator_email, "wsdl_url": self.WSDL_URL
+            }})
+
+            for pagina, total_paginas, contratos in self._iterar_paginas(
+                    inicio, fim, tenet_id, ambiente, operator_email, operator_password, falhas, empresas, cancelamento):
+                todos_contratos.extend(contratos)
+                if ao_receber_pagina is not None:
+                    # Páginas com falha ficam para trás: pagina + 1 já foram tratadas
+                    ao_receber_pagina(pagina + 1, total_paginas, contratos)
+
+            logger.info("Total de contratos com admissão entre %s e %s (exclusivo): %d",
+                        inicio, fim, len(todos_contratos))
+            if falhas:
+                logger.warning("Busca parcial, páginas com falha: %s", [pagina + 1 for pagina in sorted(falhas)])
             
-            # Validar parâmetros obrigatórios
-            if not all([tenet_id, ambiente, operator_email, operator_password]):
-                raise ValueError("Todos os parâmetros são obrigatórios: tenet_id, ambiente, operator_email, operator_password")
+            # Ordenar contratos por data de admissão
+            if ordenar:
+                todos_contratos = ordenar_contratos(todos_contratos)
             
-            # Reinicializar cliente com as credenciais fornecidas
-            self._initialize_client(
-                operator_email=operator_email,
-                operator_password=operator_password,
-                tenet_id=tenet_id,
-                ambiente=ambiente
-            )
+            # Amostra dos contratos (não custa nada fora do nível DEBUG)
+            if logger_contratos.logger.isEnabledFor(logging.DEBUG):
+                for contrato in todos_contratos:
+                    logger_contratos.debug("Contrato %s: %s", contrato.matricula, contrato.nome, campos={
+                        "data_admissao": contrato.data_admissao, "cargo": contrato.cargo,
+                        "departamento": contrato.departamento, "situacao": contrato.situacao
+                    })
             
-            # Obter primeiro dia do mês especificado
-            data_referencia = date(ano, mes, 1)
-            print(f"  - data_referencia: {data_referencia} (primeiro dia do mês)")
+            return ResultadoBusca(todos_contratos, falhas)
 
-            # Ajuste do namespace
-            header_factory = self.client.type_factory('ns3')
-            filtro_factory = self.client.type_factory('ns1')
+        except BuscaCancelada as e:
+            logger.info("Busca do período %s a %s cancelada após %d contratos", inicio, fim, len(todos_contratos))
+            return ResultadoBusca(ordenar_contratos(todos_contratos) if ordenar else todos_contratos, falhas, erro=e)
 
-            # Criar o objeto 'LGContextoAmbiente'
-            contexto_ambiente = header_factory.LGContextoAmbiente(
-                Ambiente=ambiente
-            )
+        except Exception as e:
+            logger.exception("Erro ao buscar contratos do período %s a %s: %s", inicio, fim, e)
+            return ResultadoBusca([], falhas, erro=e)
 
-            # Criar os tokens para autenticação
-            token_usuario = header_factory.LGTokenUsuario(
-                Senha=operator_password,
-                Usuario=operator_email,
-                GuidTenant=tenet_id
-            )
+    def iterar_contratos(self, inicio: date, fim: date, tenet_id: str, ambiente: str, operator_email: str, operator_password: str, por_pagina: bool = False,
+                         falhas: Optional[Dict[int, Exception]] = None, empresas: Optional[Iterable[str]] = None) -> Iterator:
+        """
+        Gera os contratos do intervalo [inicio, fim) à medida que as páginas chegam.
+        
+        As páginas são buscadas em paralelo, mas entregues na ordem; só as
+        páginas que chegaram fora de ordem ficam em memória. Diferente de
+        buscar_contratos_por_periodo, erros são propagados ao chamador e o
+        resultado não é ordenado (ver ordenar_contratos).
+        
+        Args:
+            inicio: Primeiro dia do período (inclusivo)
+            fim: Dia seguinte ao último dia do período (exclusivo)
+            tenet_id: ID do tenant no sistema (obrigatório)
+            ambiente: Ambiente (obrigatório)
+            operator_email: Email do operador para autenticação (obrigatório)
+            operator_password: Senha do operador para autenticação (obrigatório)
+            por_pagina: Se True, gera listas com os contratos de cada página
+            falhas: Se informado, as páginas (exceto a primeira) que falharem
+                após as novas tentativas são registradas aqui e puladas, em vez
+                de interromper a iteração
+            empresas: Códigos das empresas desejadas (None: todas as do tenant)
+            
+        Yields:
+            Contrato (ou List[Contrato] com por_pagina=True)
+        """
+        for _, _, contratos in self._iterar_paginas(inicio, fim, tenet_id, ambiente, operator_email, operator_password, falhas, empresas):
+            if por_pagina:
+                yield contratos
+            else:
+                yield from contratos
 
-            autenticacao = header_factory.LGAutenticacao(
-                TokenUsuario=token_usuario
-            )
+    def sincronizar_incremental(self, tenet_id: str, ambiente: str, operator_email: str, operator_password: str,
+                                db: Optional[Database] = None, dias_sobreposicao: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Traz para a base local apenas os contratos novos ou alterados do tenant.
+        
+        A marca d'água é a maior data de admissão (até hoje) vista na última
+        sincronização completa. Cada execução busca a partir da marca menos
+        ``dias_sobreposicao`` dias, grava página a página na tabela local
+        (upsert por tenant + ambiente + matrícula) e só avança a marca se
+        nenhuma página falhar. Sem marca, parte da maior admissão já gravada
+        localmente no mesmo ambiente ou, na primeira vez, de
+        INICIO_SINCRONIZACAO_PADRAO.
+        
+        Args:
+            tenet_id: ID do tenant no sistema (obrigatório)
+            ambiente: Ambiente (obrigatório)
+            operator_email: Email do operador para autenticação (obrigatório)
+            operator_password: Senha do operador para autenticação (obrigatório)
+            db: Banco local (padrão: Database.compartilhada())
+            dias_sobreposicao: Dias relidos antes da marca (padrão: DIAS_SOBREPOSICAO_SINCRONIZACAO)
             
-            print(f"\nDados de autenticação preparados:")
-            print(f"  - Usuario: {operator_email}")
-            print(f"  - Senha: {'***' if operator_password else None}")
-            print(f"  - GuidTenant: {tenet_id}")
-            print(f"  - Ambiente: {ambiente}")
-
-            # Criar o filtro específico para DATA_ADMISSAO
-            filtro_especifico_type = self.client.get_type('{lg.com.br/api/dto/v1}FiltroDeCamposEspecificos')
-            array_filtro_especifico_type = self.client.get_type('{lg.com.br/api/dto/v1}ArrayOfFiltroDeCamposEspecificos')
-
-            # Criar filtro para DATA_ADMISSAO - usando operação de maior ou igual
-            # Operação 4 = Maior ou igual
-            filtro_data_admissao = filtro_especifico_type(
-                Campo=2,  # 2 = DATA_ADMISSAO
-                Operacao=4,  # Operação de maior ou igual
-                ValoresParaFiltrar=[
-                    data_referencia.strftime("%Y-%m-%d")
-                ]
-            )
+        Returns:
+            Dict[str, Any]: inicio, fim, contratos recebidos, páginas com falha e a nova marca
+        """
+        db = db or Database.compartilhada()
+        if dias_sobreposicao is None:
+            dias_sobreposicao = self.DIAS_SOBREPOSICAO_SINCRONIZACAO
 
-            # Criar array de filtros específicos
-            filtros_especificos = array_filtro_especifico_type([filtro_data_admissao])
-
-            # Lista para armazenar todos os contratos
-            todos_contratos = []
-            pagina = 0
-            total_paginas = None  # Será atualizado com o valor real na primeira chamada
-
-            # Loop para buscar todas as páginas
-            while True:
-                print(f'Buscando página {pagina + 1}...')
-                
-                # Criar filtro com paginação - sem filtrar por empresa
-                filtro = filtro_factory.FiltroDeContratoPorDemanda(
-                    PaginaAtual=pagina,
-                    FiltrosEspecificos=filtros_especificos
-                )
+        hoje = date.today()
+        marca = db.get_marca_sincronizacao(tenet_id, ambiente)
+        marca_anterior = marca["marca_data_admissao"] if marca else db.get_maior_data_admissao(tenet_id, ambiente)
+        if marca_anterior:
+            inicio = date.fromisoformat(marca_anterior) - timedelta(days=dias_sobreposicao)
+        else:
+            inicio = self.INICIO_SINCRONIZACAO_PADRAO
+        fim = hoje + timedelta(days=self.DIAS_FUTURO_SINCRONIZACAO)
 
-                # Chamar o serviço
-                response = self.client.service.ConsultarListaPorDemanda(
-                    filtro=filtro,
-                    _soapheaders={
-                        "LGContextoAmbiente": contexto_ambiente,
-                        "LGAutenticacao": autenticacao
-                    }
-                )
-                
-                print("Resposta completa:")
-                print(response)
-
-                if not response:
-                    print("Resposta vazia recebida do servidor")
-                    break
-
-                # Na primeira chamada, obter o total de páginas
-                if total_paginas is None:
-                    total_paginas = response.TotalDePaginas
-                    print(f'Total de páginas a serem buscadas: {total_paginas}')
-
-                # Processar contratos da página atual
-                if hasattr(response, 'Retorno') and hasattr(response.Retorno, 'ContratoDeTrabalhoParcial'):
-                    contratos_pagina = response.Retorno.ContratoDeTrabalhoParcial
-                    for contrato in contratos_pagina:
-                        data_admissao = contrato.DataAdmissao.date()
-                        # Adicionar todos os contratos com data de admissão >= data_referencia
-                        todos_contratos.append({
-                            'nome': contrato.Pessoa.Nome,
-                            'cpf': contrato.Pessoa.Cpf,
-                            'data_admissao': self._format_date(str(data_admissao)),
-                            'cargo': contrato.Cargo.Descricao,
-                            'departamento': contrato.CentroDeCusto.Descricao,
-                            'matricula': contrato.Matricula,
-                            'situacao': contrato.SituacaoDoColaborador.Descricao,
-                            'empresa': {
-                                'Codigo': contrato.Empresa.Codigo
-                            }
-                        })
-                    print(f'Contratos encontrados na página {pagina + 1}: {len(contratos_pagina)}')
-                else:
-                    print(f'Nenhum contrato encontrado na página {pagina + 1}')
+        logger.info("Sincronização incremental do tenant %s (%s): %s a %s", tenet_id, ambiente, inicio, fim)
+
+        falhas: Dict[int, Exception] = {}
+        recebidos = 0
+        maior_data = date.fromisoformat(marca_anterior) if marca_anterior else None
+        for contratos in self.iterar_contratos(inicio, fim, tenet_id, ambiente, operator_email, operator_password,
+                                               por_pagina=True, falhas=falhas):
+            recebidos += db.salvar_contratos(tenet_id, ambiente, [contrato.para_linha() for contrato in contratos])
+            for contrato in contratos:
+                if contrato.data_admissao and (maior_data is None or contrato.data_admissao > maior_data):
+                    maior_data = contrato.data_admissao
 
-                # Incrementar página
-                pagina += 1
+        # A marca não passa de hoje: admissões futuras podem ainda ser cadastradas antes delas
+        nova_marca = min(maior_data, hoje) if maior_data else None
+        if falhas:
+            logger.warning("Sincronização parcial (páginas com falha: %s); marca d'água mantida", sorted(falhas))
+            nova_marca = date.fromisoformat(marca_anterior) if marca_anterior else None
+        elif nova_marca:
+            db.salvar_marca_sincronizacao(tenet_id, ambiente, nova_marca.isoformat(), recebidos)
 
-                # Verificar se já buscamos todas as páginas
-                if pagina >= total_paginas:
-                    print(f'Buscamos todas as {total_paginas} páginas disponíveis')
-                    break
+        return {
+            "tenet_id": tenet_id,
+            "ambiente": ambiente,
+            "inicio": inicio,
+            "fim": fim,
+            "contratos_recebidos": recebidos,
+            "paginas_com_falha": sorted(falhas),
+            "marca_data_admissao": nova_marca
+        }
 
-                # Pequena pausa para não sobrecarregar o servidor
-                time.sleep(0.5)
+    async def abuscar_contratos_por_mes(self, ano: int, mes: int, tenet_id: str, ambiente: str, operator_email: str, operator_password: str, ordenar: bool = True,
+                                        empresas: Optional[Iterable[str]] = None) -> List[Contrato]:
+        """Versão assíncrona de buscar_contratos_por_mes (ver abuscar_contratos_por_periodo)."""
+        inicio, fim = self._limites_do_mes(ano, mes)
+        return await self.abuscar_contratos_por_periodo(inicio, fim, tenet_id, ambiente, operator_email, operator_password, ordenar=ordenar, empresas=empresas)
 
-            print(f'Total de contratos encontrados com data de admissão a partir de {self._format_date(str(data_referencia))}: {len(todos_contratos)}')
+    async def abuscar_contratos_por_periodo(self, inicio: date, fim: date, tenet_id: str, ambiente: str, operator_email: str, operator_password: str, ordenar: bool = True,
+                                            empresas: Optional[Iterable[str]] = None) -> List[Contrato]:
+        """
+        Versão assíncrona de buscar_contratos_por_periodo.
+        
+        Usa zeep.AsyncClient sobre um httpx.AsyncClient com pool de conexões, de
+        modo que várias buscas possam rodar no mesmo event loop (ex.: handlers do
+        Flet) sem bloquear threads. As páginas são buscadas concorrentemente,
+        limitadas pela concorrência configurada para o tenant.
+        
+        Args:
+            inicio: Primeiro dia do período (inclusivo)
+            fim: Dia seguinte ao último dia do período (exclusivo)
+            tenet_id: ID do tenant no sistema (obrigatório)
+            ambiente: Ambiente (obrigatório)
+            operator_email: Email do operador para autenticação (obrigatório)
+            operator_password: Senha do operador para autenticação (obrigatório)
+            ordenar: Se True, ordena o resultado por data de admissão
+            empresas: Códigos das empresas desejadas (None: todas as do tenant)
             
+        Returns:
+            ResultadoBusca: Lista de contratos do período especificado (ver
+            buscar_contratos_por_periodo)
+        """
+        falhas: Dict[int, Exception] = {}
+        try:
+            todos_contratos = [
+                contrato async for contrato in self.aiterar_contratos(
+                    inicio, fim, tenet_id, ambiente, operator_email, operator_password, falhas=falhas, empresas=empresas
+                )
+            ]
+
             # Ordenar contratos por data de admissão
-            todos_contratos.sort(key=lambda x: datetime.strptime(x['data_admissao'], '%d/%m/%Y'))
-            
-            # Imprimir detalhes de cada contrato
-            if todos_contratos:
-                print("\nContratos encontrados:")
-                for contrato in todos_contratos:
-                    print(f"\nMatrícula: {contrato['matricula']}")
-                    print(f"Nome: {contrato['nome']}")
-                    print(f"Data Admissão: {contrato['data_admissao']}")
-                    print(f"Cargo: {contrato['cargo']}")
-                    print(f"Departamento: {contrato['departamento']}")
-                    print(f"Situação: {contrato['situacao']}")
-            
-            return todos_contratos
+            if ordenar:
+                todos_contratos = ordenar_contratos(todos_contratos)
+            logger.info("Total de contratos entre %s e %s (exclusivo): %d", inicio, fim, len(todos_contratos))
+            return ResultadoBusca(todos_contratos, falhas)
 
         except Exception as e:
-            print(f"Erro ao buscar contratos do mês {mes}/{ano}: {str(e)}")
-            # Imprimir detalhes do erro para debug
-            import traceback
-            traceback.print_exc()
-            return []
+            logger.exception("Erro ao buscar contratos do período %s a %s: %s", inicio, fim, e)
+            return ResultadoBusca([], falhas, erro=e)
 
-    def _format_date(self, date_str: str) -> str:
-        """Formata a data para o padrão brasileiro."""
-        try:
-            if not date_str:
+    async def aiterar_contratos(self, inicio: date, fim: date, tenet_id: str, ambiente: str, operator_email: str, operator_password: str, por_pagina: bool = False,
+                                falhas: Optional[Dict[int, Exception]] = None, empresas: Optional[Iterable[str]] = None) -> AsyncIterator:
+        """Versão assíncrona de iterar_contratos (async for)."""
+        async for _, _, contratos in self._aiterar_paginas(inicio, fim, tenet_id, ambiente, operator_email, operator_password, falhas, empresas):
+            if por_pagina:
+                yield contratos
+            else:
+                for contrato in contratos:
+                    yield contrato
+
+    def _iterar_paginas(self, inicio: date, fim: date, tenet_id: str, ambiente: str, operator_email: str, operator_password: str,
+                        falhas: Optional[Dict[int, Exception]] = None,
+                        empresas: Optional[Iterable[str]] = None,
+                        cancelamento: Optional[TokenCancelamento] = None) -> Iterator[Tuple[int, int, List[Contrato]]]:
+        """Gera (pagina, total_paginas, contratos) na ordem das páginas.
+
+        Com ``falhas`` informado, páginas que falharem (exceto a primeira, que
+        define o total) são registradas e puladas em vez de propagar o erro.
+        Com ``cancelamento``, todas as páginas (inclusive a primeira) rodam no
+        executor e a espera confere o token: no cancelamento a iteração levanta
+        BuscaCancelada sem aguardar as requisições em andamento.
+        """
+        # Validar parâmetros obrigatórios
+        if not all([tenet_id, ambiente, operator_email, operator_password]):
+            raise ValueError("Todos os parâmetros são obrigatórios: tenet_id, ambiente, operator_email, operator_password")
+        if fim <= inicio:
+            raise ValueError("O fim do período deve ser posterior ao início")
+
+        # Obter cliente (WSDL já compilado) com as credenciais fornecidas
+        cliente = self._initialize_client(
+            operator_email=operator_email,
+            operator_password=operator_password,
+            tenet_id=tenet_id,
+            ambiente=ambiente
+        )
+        consulta = self._preparar_consulta(cliente, inicio, fim, empresas, cancelamento)
+
+        # Buscar a primeira página para descobrir o total de páginas
+        if cancelamento is None:
+            response = self._consultar_pagina(consulta, 0)
+        else:
+            executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"lg-{tenet_id}")
+            try:
+                primeira = executor.submit(self._consultar_pagina, consulta, 0)
+                response = self._aguardar({primeira}, cancelamento).pop().result()
+            finally:
+                executor.shutdown(wait=False)
+        if not response:
+            logger.warning("Resposta vazia recebida do servidor")
+            return
+
+        total_paginas = response.TotalDePaginas or 1
+        logger.debug("Total de páginas a serem buscadas: %d", total_paginas)
+        yield 0, total_paginas, self._processar_pagina(response, 0, inicio, fim, consulta.plano.empresas_locais)
+
+        if total_paginas <= 1:
+            return
+
+        # Demais páginas em paralelo, limitadas pela concorrência do tenant. No
+        # máximo `janela` páginas ficam em andamento ou aguardando entrega.
+        max_workers = min(self.get_concorrencia(tenet_id), total_paginas - 1)
+        janela = max_workers * 2
+        executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"lg-{tenet_id}")
+        em_andamento = {}
+        prontas = {}
+        proxima_submeter = 1
+        proxima_entregar = 1
+
+        def buscar_pagina(pagina: int):
+            try:
+                return self._processar_pagina(self._consultar_pagina(consulta, pagina), pagina, inicio, fim, consulta.plano.empresas_locais)
+            except BuscaCancelada:
+                raise
+            except Exception as e:
+                if falhas is None:
+                    raise
+                logger.warning("Página %d ignorada após falha: %s", pagina + 1, e)
+                falhas[pagina] = e
                 return None
-            date_obj = datetime.strptime( date_str, "%Y-%m-%d" )
-            return date_obj.strftime("%d/%m/%Y")
-        except:
-            return date_str
+
+        try:
+            while proxima_entregar < total_paginas:
+                while proxima_submeter < total_paginas and proxima_submeter < proxima_entregar + janela:
+                    em_andamento[executor.submit(buscar_pagina, proxima_submeter)] = proxima_submeter
+                    proxima_submeter += 1
+
+                concluidos = self._aguardar(em_andamento, cancelamento)
+                for futuro in concluidos:
+                    prontas[em_andamento.pop(futuro)] = futuro.result()
+
+                while proxima_entregar in prontas:
+                    contratos = prontas.pop(proxima_entregar)
+                    if contratos is not None:
+                        yield proxima_entregar, total_paginas, contratos
+                    proxima_entregar += 1
+
+            logger.debug("Buscamos todas as %d páginas disponíveis", total_paginas)
+        finally:
+            # Consumidor interrompeu a iteração ou houve erro: descartar o restante
+            for futuro in em_andamento:
+                futuro.cancel()
+            executor.shutdown(wait=False)
+
+    def _aguardar(self, futuros, cancelamento: Optional[TokenCancelamento]) -> set:
+        """wait(FIRST_COMPLETED) que confere o cancelamento enquanto espera.
+
+        Raises:
+            BuscaCancelada: se o token for cancelado antes de algum futuro terminar
+        """
+        if cancelamento is None:
+            return wait(futuros, return_when=FIRST_COMPLETED)[0]
+        while True:
+            cancelamento.verificar()
+            concluidos, _ = wait(futuros, timeout=self.INTERVALO_VERIFICACAO_CANCELAMENTO, return_when=FIRST_COMPLETED)
+            if concluidos:
+                return concluidos
+
+    async def _aiterar_paginas(self, inicio: date, fim: date, tenet_id: str, ambiente: str, operator_email: str, operator_password: str,
+                               falhas: Optional[Dict[int, Exception]] = None,
+                               empresas: Optional[Iterable[str]] = None) -> AsyncIterator[Tuple[int, int, List[Contrato]]]:
+        """Versão assíncrona de _iterar_paginas."""
+        # Validar parâmetros obrigatórios
+        if not all([tenet_id, ambiente, operator_email, operator_password]):
+            raise ValueError("Todos os parâmetros são obrigatórios: tenet_id, ambiente, operator_email, operator_password")
+        if fim <= inicio:
+            raise ValueError("O fim do período deve ser posterior ao início")
+
+        registro = get_registro_clientes(self.WSDL_URL)
+        loop = asyncio.get_running_loop()
+        obter = functools.partial(registro.obter_async, operator_email, operator_password, tenet_id, ambiente,
+                                  reservar=True)
+        if registro.precisa_compilar():
+            # A compilação do WSDL é bloqueante: fazê-la fora do event loop
+            cliente = await loop.run_in_executor(None, obter)
+        else:
+            cliente = obter()
+        # Reservado: a sessão httpx só é fechada (no loop dela) depois da busca
+        cliente.loop = loop
+        try:
+            async for item in self._aiterar_paginas_cliente(cliente, inicio, fim, falhas, empresas):
+                yield item
+        finally:
+            cliente.devolver()
+
+    async def _aiterar_paginas_cliente(self, cliente: ClienteLG, inicio: date, fim: date,
+                                       falhas: Optional[Dict[int, Exception]] = None,
+                                       empresas: Optional[Iterable[str]] = None) -> AsyncIterator[Tuple[int, int, List[Contrato]]]:
+        tenet_id = cliente.tenet_id
+        consulta = self._preparar_consulta(cliente, inicio, fim, empresas)
+
+        # Primeira página para descobrir o total de páginas
+        response = await self._aconsultar_pagina(consulta, 0)
+        if not response:
+            logger.warning("Resposta vazia recebida do servidor")
+            return
+
+        total_paginas = response.TotalDePaginas or 1
+        yield 0, total_paginas, self._processar_pagina(response, 0, inicio, fim, consulta.plano.empresas_locais)
+
+        if total_paginas <= 1:
+            return
+
+        janela = self.get_concorrencia(tenet_id)
+        em_andamento = {}
+        prontas = {}
+        proxima_submeter = 1
+        proxima_entregar = 1
+
+        try:
+            while proxima_entregar < total_paginas:
+                while proxima_submeter < total_paginas and proxima_submeter < proxima_entregar + janela:
+                    tarefa = asyncio.ensure_future(self._aconsultar_pagina(consulta, proxima_submeter))
+                    em_andamento[tarefa] = proxima_submeter
+                    proxima_submeter += 1
+
+                concluidas, _ = await asyncio.wait(em_andamento, return_when=asyncio.FIRST_COMPLETED)
+                for tarefa in concluidas:
+                    pagina = em_andamento.pop(tarefa)
+                    erro = tarefa.exception()
+                    if erro is None:
+                        prontas[pagina] = self._processar_pagina(tarefa.result(), pagina, inicio, fim, consulta.plano.empresas_locais)
+                    elif falhas is None:
+                        raise erro
+                    else:
+                        logger.warning("Página %d ignorada após falha: %s", pagina + 1, erro)
+                        falhas[pagina] = erro
+                        prontas[pagina] = None
+
+                while proxima_entregar in prontas:
+                    contratos = prontas.pop(proxima_entregar)
+                    if contratos is not None:
+                        yield proxima_entregar, total_paginas, contratos
+                    proxima_entregar += 1
+        finally:
+            for tarefa in em_andamento:
+                tarefa.cancel()
+
+    def _preparar_consulta(self, cliente: ClienteLG, inicio: date, fim: date,
+                           empresas: Optional[Iterable[str]] = None,
+                           cancelamento: Optional[TokenCancelamento] = None) -> _ConsultaPaginada:
+        """Monta filtros, cabeçalhos, limitador e disjuntor da busca."""
+        # No modo de parser rápido a resposta HTTP chega sem ser interpretada
+        client = cliente.client_bruto if self.parser_rapido else cliente.client
+
+        # Ajuste do namespace
+        filtro_factory = client.type_factory('ns1')
+
+        # Criar os filtros específicos de DATA_ADMISSAO (início e fim)
+        filtros_especificos = self._montar_filtros_especificos(client, inicio, fim)
+
+        # Filtro de empresas: no servidor quando o serviço aceitar, sempre conferido localmente
+        tipo_filtro = filtro_factory.FiltroDeContratoPorDemanda
+        elementos_filtro = dict(getattr(tipo_filtro, 'elements', []))
+        plano = planejar_filtros(empresas, set(elementos_filtro))
+        empresas_servidor = None
+        if plano.empresas_servidor:
+            empresas_servidor = elementos_filtro['Empresas'].type(list(plano.empresas_servidor))
+            logger.debug("Filtro de empresas enviado ao servidor: %s", list(plano.empresas_servidor))
+
+        # Limitador de taxa compartilhado por todas as buscas do tenant/operador
+        limitador = get_limitador(cliente.tenet_id, cliente.operator_email)
+
+        # Cabeçalhos de contexto e autenticação da credencial
+        return _ConsultaPaginada(
+            client,
+            filtro_factory,
+            filtros_especificos,
+            cliente.cabecalhos_soap(),
+            limitador,
+            get_disjuntor(cliente.tenet_id),
+            self.parser_rapido,
+            plano,
+            empresas_servidor,
+            cancelamento
+        )
+
+    @staticmethod
+    def estado_limitadores() -> Dict[str, Dict]:
+        """Retorna o estado dos limitadores de taxa de cada tenant/operador."""
+        return estado_limitadores()
+
+    def get_concorrencia(self, tenet_id: str) -> int:
+        """Retorna quantas páginas podem ser buscadas em paralelo para o tenant."""
+        return self.concorrencia_por_tenant.get(tenet_id, self.CONCORRENCIA_PADRAO)
+
+    def definir_concorrencia(self, tenet_id: str, concorrencia: int):
+        """Define quantas páginas podem ser buscadas em paralelo para o tenant."""
+        if concorrencia < 1:
+            raise ValueError("A concorrência deve ser de pelo menos 1")
+        self.concorrencia_por_tenant[tenet_id] = concorrencia
+
+    def _montar_filtros_especificos(self, client, inicio: date, fim: date):
+        """Monta o array de FiltroDeCamposEspecificos com os dois limites de DATA_ADMISSAO."""
+        filtro_especifico_type = client.get_type('{lg.com.br/api/dto/v1}FiltroDeCamposEspecificos')
+        array_filtro_especifico_type = client.get_type('{lg.com.br/api/dto/v1}ArrayOfFiltroDeCamposEspecificos')
+
+        # DATA_ADMISSAO >= inicio
+        filtro_inicio = filtro_especifico_type(
+            Campo=self.CAMPO_DATA_ADMISSAO,
+            Operacao=self.OPERACAO_MAIOR_OU_IGUAL,
+            ValoresParaFiltrar=[
+                inicio.strftime("%Y-%m-%d")
+            ]
+        )
+
+        # DATA_ADMISSAO < fim
+        filtro_fim = filtro_especifico_type(
+            Campo=self.CAMPO_DATA_ADMISSAO,
+            Operacao=self.OPERACAO_MENOR,
+            ValoresParaFiltrar=[
+                fim.strftime("%Y-%m-%d")
+            ]
+        )
+
+        # Criar array de filtros específicos
+        return array_filtro_especifico_type([filtro_inicio, filtro_fim])
+
+    def _limites_do_mes(self, ano: int, mes: int):
+        """Retorna o intervalo [primeiro dia do mês, primeiro dia do mês seguinte)."""
+        inicio = date(ano, mes, 1)
+        fim = date(ano + 1, 1, 1) if mes == 12 else date(ano, mes + 1, 1)
+        return inicio, fim
+
+    def _consultar_pagina(self, consulta: _ConsultaPaginada, pagina: int):
+        """Consulta uma página de ConsultarListaPorDemanda, com novas tentativas isoladas.
+
+        Cada tentativa passa pelo disjuntor do tenant (que falha imediatamente
+        se a LG estiver fora), pelo limitador de taxa e pelo limite global de
+        requisições simultâneas, ocupado só durante a chamada. Erros
+        temporários são tentados novamente, só para esta página, com backoff
+        exponencial e jitter; erros fatais (ex.: Fault de autenticação) são
+        propagados logo. Com cancelamento na consulta, nenhuma tentativa começa
+        depois do cancelamento e as esperas (entre tentativas, pelo limitador
+        de taxa ou por uma vaga) são interrompidas; uma chamada de teste do
+        disjuntor cancelada é liberada para a próxima.
+        """
+        filtro = self._criar_filtro(consulta.filtro_factory, consulta.filtros_especificos, pagina, consulta.empresas_servidor)
+        politica = self.politica_retentativa
+        cancelamento = consulta.cancelamento
+
+        for tentativa in range(1, politica.tentativas + 1):
+            if cancelamento is not None:
+                cancelamento.verificar()
+            with consulta.disjuntor.chamada():
+                consulta.limitador.adquirir(cancelamento)
+                get_limite_concorrencia().adquirir(cancelamento)
+                inicio = time.monotonic()
+                try:
+                    response = self._requisitar_pagina(consulta, filtro)
+                    if consulta.bruto:
+                        response = self._interpretar_resposta_bruta(consulta, response)
+                except Exception as e:
+                    if not self._registrar_erro(consulta, e) or tentativa == politica.tentativas:
+                        raise
+                    erro = e
+                else:
+                    self._registrar_sucesso(consulta, time.monotonic() - inicio)
+                    return response
+            logger.warning("Erro na página %d (tentativa %d): %s", pagina + 1, tentativa, erro)
+            if cancelamento is not None:
+                cancelamento.esperar(politica.espera(tentativa))
+            else:
+                time.sleep(politica.espera(tentativa))
+
+    async def _aconsultar_pagina(self, consulta: _ConsultaPaginada, pagina: int):
+        """Versão assíncrona de _consultar_pagina, para clientes zeep.AsyncClient."""
+        filtro = self._criar_filtro(consulta.filtro_factory, consulta.filtros_especificos, pagina, consulta.empresas_servidor)
+        politica = self.politica_retentativa
+
+        for tentativa in range(1, politica.tentativas + 1):
+            with consulta.disjuntor.chamada():
+                await consulta.limitador.aadquirir()
+                await get_limite_concorrencia().aadquirir()
+                inicio = time.monotonic()
+                try:
+                    response = await self._arequisitar_pagina(consulta, filtro)
+                    if consulta.bruto:
+                        response = self._interpretar_resposta_bruta(consulta, response)
+                except Exception as e:
+                    if not self._registrar_erro(consulta, e) or tentativa == politica.tentativas:
+                        raise
+                    erro = e
+                else:
+                    self._registrar_sucesso(consulta, time.monotonic() - inicio)
+                    return response
+            logger.warning("Erro na página %d (tentativa %d): %s", pagina + 1, tentativa, erro)
+            await asyncio.sleep(politica.espera(tentativa))
+
+    @staticmethod
+    def _requisitar_pagina(consulta: _ConsultaPaginada, filtro):
+        # Vaga do limite global já adquirida: devolvida assim que a LG responder
+        try:
+            return consulta.client.service.ConsultarListaPorDemanda(
+                filtro=filtro,
+                _soapheaders=consulta.soapheaders
+            )
+        finally:
+            get_limite_concorrencia().liberar()
+
+    @staticmethod
+    async def _arequisitar_pagina(consulta: _ConsultaPaginada, filtro):
+        try:
+            return await consulta.client.service.ConsultarListaPorDemanda(
+                filtro=filtro,
+                _soapheaders=consulta.soapheaders
+            )
+        finally:
+            get_limite_concorrencia().liberar()
+
+    def _interpretar_resposta_bruta(self, consulta: _ConsultaPaginada, resposta):
+        """Lê a resposta HTTP com o parser rápido, recorrendo ao zeep se necessário.
+
+        Faults, status de erro ou XML inesperado são entregues ao zeep, que
+        levanta as exceções de costume (Fault, TransportError) ou devolve o
+        objeto completo.
+        """
+        if resposta.status_code == 200:
+            try:
+                return extrair_pagina(resposta.content)
+            except RespostaNaoInterpretada as e:
+                logger.debug("Parser rápido indisponível para esta resposta (%s); usando o zeep", e)
+
+        binding = consulta.client.service._binding
+        operacao = binding.get('ConsultarListaPorDemanda')
+        return binding.process_reply(consulta.client, operacao, resposta)
+
+    def _registrar_sucesso(self, consulta: _ConsultaPaginada, latencia: float):
+        consulta.limitador.registrar_sucesso(latencia)
+        consulta.disjuntor.registrar_sucesso()
+
+    def _registrar_erro(self, consulta: _ConsultaPaginada, erro: Exception) -> bool:
+        """Atualiza limitador e disjuntor; retorna se o erro merece nova tentativa."""
+        if eh_throttling(erro):
+            consulta.limitador.registrar_throttling()
+        else:
+            consulta.limitador.registrar_falha()
+
+        retentavel = eh_retentavel(erro)
+        if retentavel:
+            # Só falhas de infraestrutura contam para abrir o circuito
+            consulta.disjuntor.registrar_falha()
+        elif not isinstance(erro, CircuitoAbertoError):
+            # Erro fatal, mas o servidor respondeu: a LG está no ar
+            consulta.disjuntor.registrar_sucesso()
+        return retentavel
+
+    def _criar_filtro(self, filtro_factory, filtros_especificos, pagina: int, empresas=None):
+        # Criar filtro com paginação; empresas só quando o planejador as enviar ao servidor
+        if empresas is None:
+            return filtro_factory.FiltroDeContratoPorDemanda(
+                PaginaAtual=pagina,
+                FiltrosEspecificos=filtros_especificos
+            )
+        return filtro_factory.FiltroDeContratoPorDemanda(
+            PaginaAtual=pagina,
+            FiltrosEspecificos=filtros_especificos,
+            Empresas=empresas
+        )
+
+    def _processar_pagina(self, response, pagina: int, inicio: Optional[date] = None, fim: Optional[date] = None,
+                          empresas: Optional[frozenset] = None) -> List[Contrato]:
+        """Converte os contratos de uma resposta em registros Contrato.
+
+        Aceita tanto o objeto do zeep quanto a PaginaExtraida do parser rápido.
+        Contratos fora de [inicio, fim) ou de empresas fora de ``empresas``
+        (filtro local do planejador) são descartados; como esses filtros em
+        geral já vão para o servidor, isso só apara as bordas das páginas.
+        Contratos sem data de admissão (elemento nulo ou vazio) são mantidos,
+        com ``data_admissao`` None: o servidor os incluiu na faixa pedida.
+        """
+        if isinstance(response, PaginaExtraida):
+            registros = response.registros
+        elif hasattr(response, 'Retorno') and hasattr(response.Retorno, 'ContratoDeTrabalhoParcial'):
+            registros = [
+                (
+                    contrato.Pessoa.Nome,
+                    contrato.Pessoa.Cpf,
+                    contrato.DataAdmissao.date() if contrato.DataAdmissao else None,
+                    contrato.Cargo.Descricao,
+                    contrato.CentroDeCusto.Descricao,
+                    contrato.Matricula,
+                    contrato.SituacaoDoColaborador.Descricao,
+                    contrato.Empresa.Codigo
+                )
+                for contrato in response.Retorno.ContratoDeTrabalhoParcial
+            ]
+        else:
+            registros = []
+
+        if not registros:
+            logger.debug("Nenhum contrato encontrado na página %d", pagina + 1)
+            return []
+
+        contratos = [
+            Contrato.criar(*registro)
+            for registro in registros
+            if (registro[2] is None or not ((inicio and registro[2] < inicio) or (fim and registro[2] >= fim)))
+            and (empresas is None or str(registro[7]) in empresas)
+        ]
+        sem_data = sum(1 for contrato in contratos if contrato.data_admissao is None)
+        if sem_data:
+            logger.warning("Página %d: %d contrato(s) sem data de admissão", pagina + 1, sem_data)
+        logger.debug("Contratos encontrados na página %d: %d", pagina + 1, len(registros))
+        return contratos
+
+
+# Contratos sem data de admissão ficam no fim da ordenação
+_SEM_DATA = date.max
+
+
+def _chave_data_admissao(contrato: Contrato) -> date:
+    return contrato.data_admissao or _SEM_DATA
+
+
+def ordenar_contratos(contratos: List[Contrato]) -> List[Contrato]:
+    """Ordena contratos por data de admissão (etapa opcional após a busca).
+
+    Compara o ``date`` nativo do contrato; o texto dd/mm/aaaa só é gerado na
+    exibição (``data_admissao_formatada``).
+    """
+    return sorted(contratos, key=_chave_data_admissao)
 
 # Exemplo de uso
 if __name__ == "__main__":
+    from utils.logger import configurar_logging
+
+    configurar_logging()
     contrato = ContratoTrabalhoLG()
     
     # Busca contratos do mês atual
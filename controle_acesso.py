@@ -1,5 +1,9 @@
-from typing import Dict, List, Set, Optional
+from typing import Dict, FrozenSet, List, NamedTuple, Optional, Tuple
+from contrato_trabalho import Contrato
 from database import Database
+from utils.logger import obter_logger
+
+logger = obter_logger(__name__)
 
 # Definição dos usuários e suas senhas
 USUARIOS = {
@@ -17,10 +21,33 @@ PERMISSOES_EMPRESAS = {
     "pedro": ["1", "7", "8", "9"]  # Empresas que Pedro pode acessar
 }
 
+class SnapshotPermissoes(NamedTuple):
+    """Permissões do usuário logado, carregadas uma vez por sessão."""
+    username: str
+    nome: Optional[str]
+    is_admin: bool
+    # Códigos das empresas permitidas, comparados exatamente como cadastrados
+    codigos_empresas: FrozenSet[str]
+    empresas: Tuple[Dict, ...]
+    versao: int
+
+
 class ControleAcesso:
     def __init__(self):
-        self.db = Database()
-        self.usuario_atual = None
+        self.db = Database.compartilhada()
+        self._usuario_atual = None
+        self._snapshot: Optional[SnapshotPermissoes] = None
+    
+    @property
+    def usuario_atual(self) -> Optional[str]:
+        return self._usuario_atual
+    
+    @usuario_atual.setter
+    def usuario_atual(self, username: Optional[str]):
+        self._usuario_atual = username
+        self._snapshot = None
+        if username:
+            self.permissoes()
     
     def fazer_login(self, username: str, senha: str) -> bool:
         """Verifica as credenciais e faz o login do usuário."""
@@ -33,57 +60,83 @@ class ControleAcesso:
         """Faz o logout do usuário atual."""
         self.usuario_atual = None
     
+    def permissoes(self) -> Optional[SnapshotPermissoes]:
+        """Retorna o snapshot de permissões do usuário atual.
+        
+        É carregado no login e recarregado apenas quando usuários, empresas ou
+        permissões mudam (Database.versao_permissoes); nas demais chamadas não
+        há acesso ao banco.
+        """
+        if not self._usuario_atual:
+            return None
+        
+        snapshot = self._snapshot
+        if snapshot is None or snapshot.versao != self.db.versao_permissoes:
+            snapshot = self._carregar_permissoes(self._usuario_atual)
+            self._snapshot = snapshot
+        return snapshot
+    
+    def _carregar_permissoes(self, username: str) -> SnapshotPermissoes:
+        versao = self.db.versao_permissoes
+        usuario = self.db.get_usuario(username)
+        is_admin = bool(usuario and usuario["is_admin"])
+        if is_admin:
+            empresas = self.db.get_todas_empresas()
+        else:
+            empresas = self.db.get_empresas_permitidas(username)
+        
+        return SnapshotPermissoes(
+            username=username,
+            nome=usuario["nome"] if usuario else None,
+            is_admin=is_admin,
+            codigos_empresas=frozenset(emp["codigo"] for emp in empresas),
+            empresas=tuple(empresas),
+            versao=versao
+        )
+    
     def get_usuario_atual(self) -> Optional[str]:
         """Retorna o nome do usuário atual."""
-        if self.usuario_atual:
-            usuario = self.db.get_usuario(self.usuario_atual)
-            return usuario["nome"] if usuario else None
-        return None
+        snapshot = self.permissoes()
+        return snapshot.nome if snapshot else None
+    
+    def tem_acesso_total(self) -> bool:
+        """Indica se o usuário atual é administrador (acesso a todas as empresas)."""
+        snapshot = self.permissoes()
+        return bool(snapshot and snapshot.is_admin)
     
     def get_empresas_permitidas(self) -> List[Dict]:
         """Retorna a lista de empresas que o usuário atual tem permissão para acessar."""
-        if not self.usuario_atual:
+        snapshot = self.permissoes()
+        if not snapshot:
             return []
-        
-        usuario = self.db.get_usuario(self.usuario_atual)
-        if usuario and usuario["is_admin"]:
-            return self.db.get_todas_empresas()
-        
-        return self.db.get_empresas_permitidas(self.usuario_atual)
+        return [dict(empresa) for empresa in snapshot.empresas]
     
-    def filtrar_contratos(self, contratos: List[Dict]) -> List[Dict]:
-        """Filtra os contratos com base nas permissões do usuário atual."""
-        if not self.usuario_atual:
+    def filtrar_contratos(self, contratos: List[Contrato]) -> List[Contrato]:
+        """Filtra os contratos com base nas permissões do usuário atual (sem acessar o banco)."""
+        snapshot = self.permissoes()
+        if not snapshot:
             return []
         
-        usuario = self.db.get_usuario(self.usuario_atual)
-        if usuario and usuario["is_admin"]:
+        if snapshot.is_admin:
             return contratos
         
-        empresas_permitidas = {emp["codigo"] for emp in self.get_empresas_permitidas()}
-        print(f"Empresas permitidas para o usuário {self.usuario_atual}: {empresas_permitidas}")
-        
+        permitidas = snapshot.codigos_empresas
         contratos_filtrados = [
             contrato for contrato in contratos
-            if str(contrato.get('empresa', {}).get('Codigo', '')) in empresas_permitidas
+            if str(contrato.empresa_codigo if isinstance(contrato, Contrato)
+                   else contrato.get('empresa', {}).get('Codigo', '')) in permitidas
         ]
         
-        print(f"Contratos antes do filtro: {len(contratos)}")
-        print(f"Contratos após filtro: {len(contratos_filtrados)}")
+        logger.debug("Filtro de permissões: %d de %d contratos", len(contratos_filtrados), len(contratos))
         
         return contratos_filtrados
     
     def tem_acesso_empresa(self, codigo_empresa: str) -> bool:
         """Verifica se o usuário atual tem acesso a uma determinada empresa."""
-        if not self.usuario_atual:
+        snapshot = self.permissoes()
+        if not snapshot:
             return False
-        
-        usuario = self.db.get_usuario(self.usuario_atual)
-        if usuario and usuario["is_admin"]:
-            return True
-        
-        empresas_permitidas = {emp["codigo"] for emp in self.get_empresas_permitidas()}
-        return codigo_empresa in empresas_permitidas
+        return snapshot.is_admin or codigo_empresa in snapshot.codigos_empresas
     
     def adicionar_usuario(self, username: str, senha: str, nome: str, empresas: List[str]) -> bool:
         """Adiciona um novo usuário ao sistema."""
@@ -1,28 +1,46 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from contrato_trabalho import ResultadoBusca, ordenar_contratos
+from utils.cancelamento import BuscaCancelada
 from models.contrato import ContratoModel
 from models.empresa import EmpresaModel
 from models.operador import OperadorModel
+from utils.logger import obter_logger
+
+logger = obter_logger(__name__)
 
 class ContratoController:
+    # Tenants buscados ao mesmo tempo em uma chamada da busca em todas as
+    # empresas; cada tenant ainda busca suas páginas com a concorrência
+    # própria. A carga total na LG (somando tenants e buscas simultâneas) é
+    # limitada por LG_MAX_REQUISICOES_SIMULTANEAS (utils.limitador_taxa)
+    MAX_TENANTS_SIMULTANEOS = 4
+
     def __init__(self, contrato_model=None, empresa_model=None, operador_model=None):
         self.contrato_model = contrato_model or ContratoModel()
         self.empresa_model = empresa_model or EmpresaModel()
         self.operador_model = operador_model or OperadorModel()
     
-    def buscar_contratos(self, mes, ano, codigo_empresa=None, email_operador=None):
-        """Busca contratos com base nos filtros fornecidos."""
-        # Log de entrada do método
-        print("\n" + "=" * 70)
-        print("DEPURAÇÃO DO CONTROLLER - MÉTODO BUSCAR_CONTRATOS")
-        print("=" * 70)
-        print(f"Parâmetros recebidos:")
-        print(f"  - mês: {mes} (tipo: {type(mes)})")
-        print(f"  - ano: {ano} (tipo: {type(ano)})")
-        print(f"  - código empresa: {codigo_empresa} (tipo: {type(codigo_empresa)})")
-        print(f"  - email operador: {email_operador} (tipo: {type(email_operador)})")
+    def buscar_contratos(self, mes, ano, codigo_empresa=None, email_operador=None, forcar_atualizacao=False,
+                         ao_receber_pagina=None, cancelamento=None):
+        """Busca contratos com base nos filtros fornecidos.
+
+        Com ``codigo_empresa``, só os contratos dessa empresa são buscados (o
+        filtro vai para a LG quando o WSDL aceita). Com
+        ``forcar_atualizacao=True`` o cache de buscas é ignorado.
+        ``ao_receber_pagina(paginas_concluidas, total_paginas, contratos)`` é
+        chamada a cada página recebida, para exibir o resultado aos poucos.
+        ``cancelamento`` (TokenCancelamento) interrompe a busca; os contratos
+        recebidos até então são retornados.
+        """
+        logger.debug("Buscar contratos", extra={"campos": {
+            "mes": mes, "ano": ano, "codigo_empresa": codigo_empresa, "email_operador": email_operador
+        }})
         
         # Validações
         if not mes or not ano:
-            print("ERRO: Mês e ano são obrigatórios")
+            logger.warning("Mês e ano são obrigatórios")
             return [], "Mês e ano são obrigatórios"
         
         try:
@@ -30,59 +48,44 @@ class ContratoController:
             ano_val = int(ano)
             
             if mes_val < 1 or mes_val > 12:
-                print(f"ERRO: Mês inválido: {mes_val}")
+                logger.warning("Mês inválido: %s", mes_val)
                 return [], "Mês deve estar entre 1 e 12"
             
             if ano_val < 2000 or ano_val > 2100:
-                print(f"ERRO: Ano inválido: {ano_val}")
+                logger.warning("Ano inválido: %s", ano_val)
                 return [], "Ano inválido"
-                
-            print(f"Validação de mês e ano OK: {mes_val}/{ano_val}")
         except ValueError:
-            print(f"ERRO: Valores inválidos para conversão: mês={mes}, ano={ano}")
+            logger.warning("Valores inválidos para conversão: mês=%r, ano=%r", mes, ano)
             return [], "Mês e ano devem ser números válidos"
         
         # Obter empresa selecionada
         empresa_selecionada = None
         if codigo_empresa:
-            print(f"Buscando empresa com código: {codigo_empresa}")
             empresa_selecionada = self.empresa_model.get_empresa(codigo_empresa)
             if not empresa_selecionada:
-                print(f"ERRO: Empresa não encontrada para o código: {codigo_empresa}")
+                logger.warning("Empresa não encontrada para o código: %s", codigo_empresa)
                 return [], "Empresa não encontrada"
-            print(f"Empresa encontrada: {empresa_selecionada}")
         else:
-            print("Nenhuma empresa específica selecionada, usando configuração padrão")
+            logger.debug("Nenhuma empresa específica selecionada, usando configuração padrão")
         
         # Obter operador selecionado e suas credenciais
         operador_selecionado = None
         operator_password = None
         if email_operador:
-            print(f"Buscando operador com email: {email_operador}")
-            operador_selecionado = self.operador_model.get_operador(email_operador)
-            if not operador_selecionado:
-                print(f"ERRO: Operador não encontrado para o email: {email_operador}")
-                return [], "Operador não encontrado"
-            print(f"Operador encontrado: {operador_selecionado}")
-            
-            # Se o operador selecionado for o mesmo do arquivo .env, usar a senha do .env
-            import parametros_conexao
-            if email_operador == parametros_conexao.config.username:
-                operator_password = parametros_conexao.config.password
-            else:
-                operator_password = operador_selecionado['senha']
+            operador_selecionado, operator_password, erro = self._credenciais_operador(email_operador)
+            if erro:
+                logger.warning("Operador não encontrado para o email: %s", email_operador)
+                return [], erro
         else:
-            print("Nenhum operador específico selecionado, usando credenciais padrão")
+            logger.debug("Nenhum operador específico selecionado, usando credenciais padrão")
         
         # Buscar contratos
         try:
-            print("\nIniciando busca de contratos com os seguintes parâmetros:")
-            print(f"  - ano: {ano_val}")
-            print(f"  - mês: {mes_val}")
-            print(f"  - tenet_id: {empresa_selecionada['tenetID'] if empresa_selecionada else 'padrão'}")
-            print(f"  - ambiente: {empresa_selecionada['ambiente'] if empresa_selecionada else 'padrão'}")
-            print(f"  - operator_email: {operador_selecionado['email'] if operador_selecionado else 'padrão'}")
-            print(f"  - operator_password: {'*****' if operator_password else 'padrão'}")
+            logger.info("Buscando contratos de %02d/%d", mes_val, ano_val, extra={"campos": {
+                "tenet_id": empresa_selecionada["tenetID"] if empresa_selecionada else "padrão",
+                "ambiente": empresa_selecionada["ambiente"] if empresa_selecionada else "padrão",
+                "operator_email": operador_selecionado["email"] if operador_selecionado else "padrão"
+            }})
             
             contratos = self.contrato_model.buscar_contratos_por_mes(
                 ano_val, 
@@ -90,19 +93,213 @@ class ContratoController:
                 tenet_id=empresa_selecionada["tenetID"] if empresa_selecionada else None,
                 ambiente=empresa_selecionada["ambiente"] if empresa_selecionada else None,
                 operator_email=operador_selecionado["email"] if operador_selecionado else None,
-                operator_password=operator_password
+                operator_password=operator_password,
+                forcar_atualizacao=forcar_atualizacao,
+                empresas=[codigo_empresa] if codigo_empresa else None,
+                ao_receber_pagina=self._repassar_paginas(ao_receber_pagina),
+                cancelamento=cancelamento
             )
             
-            print(f"\nContratos retornados pelo model: {len(contratos)}")
-            
-            # Não filtrar mais por empresa, retornar todos os contratos
-            print("Retornando todos os contratos sem filtrar por empresa")
-            
-            print("=" * 70)
+            logger.debug("Contratos retornados pelo model: %d", len(contratos))
+            if getattr(contratos, 'cancelado', False):
+                return contratos, f"Busca cancelada ({len(contratos)} contratos recebidos)"
+            if getattr(contratos, 'erro', None):
+                return contratos, f"Erro ao buscar contratos: {contratos.erro}"
+            if not getattr(contratos, 'completo', True):
+                paginas = ", ".join(str(pagina + 1) for pagina in contratos.paginas_com_falha)
+                return contratos, f"Encontrados {len(contratos)} contratos (busca parcial: falha nas páginas {paginas})"
             return contratos, f"Encontrados {len(contratos)} contratos"
         except Exception as e:
-            import traceback
-            print(f"ERRO AO BUSCAR CONTRATOS: {str(e)}")
-            print(traceback.format_exc())
-            print("=" * 70)
-            return [], f"Erro ao buscar contratos: {str(e)}" 
\ No newline at end of file
+            logger.exception("Erro ao buscar contratos: %s", e)
+            return [], f"Erro ao buscar contratos: {str(e)}"
+    
+    def estatisticas_cache(self):
+        """Retorna acertos/falhas e ocupação do cache de buscas de contratos."""
+        return self.contrato_model.estatisticas_cache()
+    
+    def buscar_contratos_todas_empresas(self, mes, ano, empresas, email_operador=None, ao_progredir=None,
+                                        forcar_atualizacao=False, max_tenants_simultaneos=None,
+                                        filtrar_por_empresa=False, ao_receber_pagina=None, cancelamento=None):
+        """Busca os contratos do mês em todos os tenants das empresas informadas.
+        
+        As empresas (ex.: ControleAcesso.get_empresas_permitidas) são agrupadas
+        por (tenetID, ambiente) e cada tenant é buscado uma única vez. Os tenants
+        rodam em paralelo, no máximo ``max_tenants_simultaneos`` por vez, e os
+        resultados são reunidos e ordenados por data de admissão. As
+        requisições à LG de todos os tenants (e de outras buscas em andamento)
+        ainda dividem o limite global de requisições simultâneas.
+        
+        Args:
+            mes: Mês da busca
+            ano: Ano da busca
+            empresas: Empresas com 'codigo', 'tenetID' e 'ambiente'
+            email_operador: Operador cujas credenciais são usadas em todos os tenants
+            ao_progredir: Chamada como ao_progredir(tenet_id, situacao, quantidade) com
+                situacao 'buscando', 'concluido', 'parcial', 'falhou' ou 'cancelado'
+            forcar_atualizacao: Ignora o cache de buscas
+            max_tenants_simultaneos: Limite de tenants em paralelo nesta chamada (padrão: MAX_TENANTS_SIMULTANEOS)
+            filtrar_por_empresa: Busca em cada tenant só as empresas informadas (usuários
+                sem acesso total), em vez de todos os contratos do tenant
+            ao_receber_pagina: Chamada a cada página recebida de qualquer tenant como
+                ao_receber_pagina(paginas_concluidas, total_paginas, contratos), com
+                páginas somadas entre os tenants que já informaram o total
+            cancelamento: TokenCancelamento compartilhado por todos os tenants; tenants
+                que ainda não começaram são descartados
+            
+        Returns:
+            Tuple[ResultadoBusca, str]: contratos de todos os tenants e mensagem
+        """
+        try:
+            mes_val = int(mes)
+            ano_val = int(ano)
+        except (TypeError, ValueError):
+            return [], "Mês e ano devem ser números válidos"
+        if mes_val < 1 or mes_val > 12:
+            return [], "Mês deve estar entre 1 e 12"
+        if ano_val < 2000 or ano_val > 2100:
+            logger.warning("Ano inválido: %s", ano_val)
+            return [], "Ano inválido"
+        
+        tenants = {}
+        for empresa in empresas or []:
+            if empresa.get("tenetID") and empresa.get("ambiente"):
+                tenants.setdefault((empresa["tenetID"], empresa["ambiente"]), []).append(empresa["codigo"])
+        if not tenants:
+            return [], "Nenhuma empresa permitida com tenant configurado"
+        
+        operador, operator_password, erro = self._credenciais_operador(email_operador)
+        if erro:
+            return [], erro
+        operator_email = operador["email"] if operador else None
+        
+        def notificar(tenet_id, situacao, quantidade=0):
+            if ao_progredir:
+                try:
+                    ao_progredir(tenet_id, situacao, quantidade)
+                except Exception as e:
+                    logger.warning("Erro ao notificar progresso do tenant %s: %s", tenet_id, e)
+        
+        repassar_pagina = self._repassar_paginas(ao_receber_pagina)
+        paginas_por_tenant = {}
+        paginas_lock = threading.Lock()
+        
+        def receber_pagina(tenet_id):
+            if repassar_pagina is None:
+                return None
+            
+            def receber(paginas_concluidas, total_paginas, contratos):
+                # Chamadas vêm das threads dos tenants; uma por vez para a UI
+                with paginas_lock:
+                    paginas_por_tenant[tenet_id] = (paginas_concluidas, total_paginas)
+                    repassar_pagina(
+                        sum(concluidas for concluidas, _ in paginas_por_tenant.values()),
+                        sum(total for _, total in paginas_por_tenant.values()),
+                        contratos
+                    )
+            return receber
+        
+        def buscar_tenant(tenet_id, ambiente):
+            if cancelamento is not None:
+                cancelamento.verificar()
+            notificar(tenet_id, "buscando")
+            codigos = tenants[(tenet_id, ambiente)] if filtrar_por_empresa else None
+            return self.contrato_model.buscar_contratos_por_mes(
+                ano_val,
+                mes_val,
+                tenet_id=tenet_id,
+                ambiente=ambiente,
+                operator_email=operator_email,
+                operator_password=operator_password,
+                forcar_atualizacao=forcar_atualizacao,
+                empresas=codigos,
+                ao_receber_pagina=receber_pagina(tenet_id),
+                cancelamento=cancelamento
+            )
+        
+        logger.info("Busca em %d tenant(s) para %02d/%d", len(tenants), mes_val, ano_val)
+        todos_contratos = []
+        falhas_por_tenant = {}
+        workers = min(len(tenants), max_tenants_simultaneos or self.MAX_TENANTS_SIMULTANEOS)
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="busca_tenant") as executor:
+            futuros = {
+                executor.submit(buscar_tenant, tenet_id, ambiente): tenet_id
+                for tenet_id, ambiente in tenants
+            }
+            if cancelamento is not None:
+                # Tenants ainda na fila não chegam a começar
+                cancelamento.ao_cancelar(lambda: [futuro.cancel() for futuro in futuros])
+            for futuro in as_completed(futuros):
+                tenet_id = futuros[futuro]
+                if futuro.cancelled():
+                    falhas_por_tenant[tenet_id] = "cancelado"
+                    notificar(tenet_id, "cancelado")
+                    continue
+                try:
+                    contratos = futuro.result()
+                except BuscaCancelada:
+                    falhas_por_tenant[tenet_id] = "cancelado"
+                    notificar(tenet_id, "cancelado")
+                    continue
+                except Exception as e:
+                    falhas_por_tenant[tenet_id] = e
+                    notificar(tenet_id, "falhou")
+                    continue
+                
+                todos_contratos.extend(contratos)
+                if getattr(contratos, "cancelado", False):
+                    falhas_por_tenant[tenet_id] = "cancelado"
+                    notificar(tenet_id, "cancelado", len(contratos))
+                elif getattr(contratos, "erro", None):
+                    falhas_por_tenant[tenet_id] = contratos.erro
+                    notificar(tenet_id, "falhou")
+                elif not getattr(contratos, "completo", True):
+                    falhas_por_tenant[tenet_id] = f"falha nas páginas {contratos.paginas_com_falha}"
+                    notificar(tenet_id, "parcial", len(contratos))
+                else:
+                    notificar(tenet_id, "concluido", len(contratos))
+        
+        if cancelamento is not None and cancelamento.cancelado:
+            resultado = ResultadoBusca(
+                ordenar_contratos(todos_contratos),
+                erro=BuscaCancelada("Busca cancelada pelo usuário"),
+                falhas_por_tenant=falhas_por_tenant
+            )
+            return resultado, f"Busca cancelada ({len(resultado)} contratos recebidos)"
+        
+        resultado = ResultadoBusca(
+            ordenar_contratos(todos_contratos),
+            erro="Falha em todos os tenants" if len(falhas_por_tenant) == len(tenants) else None,
+            falhas_por_tenant=falhas_por_tenant
+        )
+        if resultado.erro:
+            return resultado, f"Erro ao buscar contratos: {'; '.join(f'{t}: {e}' for t, e in resultado.falhas_por_tenant.items())}"
+        if falhas_por_tenant:
+            return resultado, f"Encontrados {len(resultado)} contratos em {len(tenants)} tenants (busca parcial: falha em {', '.join(sorted(falhas_por_tenant))})"
+        return resultado, f"Encontrados {len(resultado)} contratos em {len(tenants)} tenants"
+    
+    @staticmethod
+    def _repassar_paginas(ao_receber_pagina):
+        """Envolve o callback de páginas para que um erro na tela não interrompa a busca."""
+        if ao_receber_pagina is None:
+            return None
+        
+        def repassar(paginas_concluidas, total_paginas, contratos):
+            try:
+                ao_receber_pagina(paginas_concluidas, total_paginas, contratos)
+            except Exception as e:
+                logger.warning("Erro ao repassar página recebida: %s", e)
+        return repassar
+    
+    def _credenciais_operador(self, email_operador):
+        """Retorna (operador, senha, erro) do operador selecionado."""
+        if not email_operador:
+            return None, None, None
+        operador = self.operador_model.get_operador(email_operador)
+        if not operador:
+            return None, None, "Operador não encontrado"
+        
+        # Se o operador selecionado for o mesmo do arquivo .env, usar a senha do .env
+        import parametros_conexao
+        if email_operador == parametros_conexao.config.username:
+            return operador, parametros_conexao.config.password, None
+        return operador, operador['senha'], None
@@ -10,6 +10,10 @@ class UsuarioController:
         """Retorna todos os usuários cadastrados."""
         return self.usuario_model.get_todos_usuarios()
     
+    def get_usuarios_com_empresas(self):
+        """Retorna todos os usuários, cada um com a lista de empresas ('empresas')."""
+        return self.usuario_model.get_usuarios_com_empresas()
+    
     def get_usuario(self, username):
         """Retorna um usuário específico pelo nome de usuário."""
         return self.usuario_model.get_usuario(username)
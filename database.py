@@ -1,16 +1,184 @@
 import sqlite3
+from contextlib import contextmanager
+import functools
 from typing import List, Dict, Optional
 import hashlib
+import os
+import threading
+
+# Versão do esquema gravada em PRAGMA user_version; incrementar a cada migração
+VERSAO_ESQUEMA = 5
+
+DB_FILE_PADRAO = "sistema_contratos.db"
+
+# Pragmas aplicados a cada conexão nova
+PRAGMAS_CONEXAO = (
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA cache_size = -16000",  # ~16 MB
+    "PRAGMA mmap_size = 134217728",  # 128 MB
+    "PRAGMA temp_store = MEMORY",
+)
+# Tempo de espera por um lock de escrita antes de falhar (segundos)
+TIMEOUT_LOCK = 10
+
+# Índices da tabela contratos (nome -> colunas)
+INDICES_CONTRATOS = {
+    "idx_contratos_data_admissao": "tenet_id, data_admissao",
+    "idx_contratos_ambiente": "tenet_id, ambiente, data_admissao",
+    "idx_contratos_cpf": "cpf",
+    "idx_contratos_empresa": "empresa_codigo, data_admissao",
+    "idx_contratos_situacao": "situacao",
+}
+
+
+def chave_contrato(matricula, cpf, data_admissao) -> Optional[str]:
+    """Chave do contrato na tabela local: a matrícula ou, sem ela, CPF + admissão.
+
+    Retorna None quando não há como identificar o contrato (sem matrícula e
+    sem CPF).
+    """
+    if matricula not in (None, ""):
+        return str(matricula)
+    if cpf not in (None, ""):
+        return f"cpf:{cpf}:{data_admissao or ''}"
+    return None
+
+def _altera_permissoes(metodo):
+    """Marca métodos que alteram usuários, empresas ou permissões.
+
+    Ao final de cada chamada a versão de permissões do arquivo é incrementada,
+    invalidando os snapshots de permissão (ver ControleAcesso).
+    """
+    @functools.wraps(metodo)
+    def envoltorio(self, *args, **kwargs):
+        try:
+            return metodo(self, *args, **kwargs)
+        finally:
+            self._permissoes_alteradas()
+    return envoltorio
 
 class Database:
-    def __init__(self, db_file: str = "sistema_contratos.db"):
+    _compartilhadas: Dict[str, "Database"] = {}
+    _versoes_permissoes: Dict[str, int] = {}
+    _arquivos_preparados = set()
+    _lock = threading.RLock()
+
+    def __init__(self, db_file: str = DB_FILE_PADRAO, verificar: Optional[bool] = None):
+        """Abre o banco, criando ou migrando o esquema se necessário.
+
+        Args:
+            db_file: Arquivo SQLite
+            verificar: Imprime o conteúdo das tabelas (diagnóstico). Por padrão
+                segue a variável de ambiente DB_VERIFICAR=1.
+        """
         self.db_file = db_file
-        self.init_database()
-        self.corrigir_estrutura_empresas()
-        self.verify_database()
+        self._local = threading.local()
+        self.preparar_esquema()
+        if verificar is None:
+            verificar = os.environ.get("DB_VERIFICAR", "0") == "1"
+        if verificar:
+            self.verify_database()
+
+    @classmethod
+    def compartilhada(cls, db_file: str = DB_FILE_PADRAO) -> "Database":
+        """Retorna a instância do processo para o arquivo, criando-a na primeira chamada."""
+        with cls._lock:
+            db = cls._compartilhadas.get(db_file)
+            if db is None:
+                db = cls(db_file)
+                cls._compartilhadas[db_file] = db
+            return db
     
-    def get_connection(self):
-        return sqlite3.connect(self.db_file)
+    @property
+    def versao_permissoes(self) -> int:
+        """Contador do processo que muda a cada alteração de usuários, empresas ou permissões."""
+        return Database._versoes_permissoes.get(self.db_file, 0)
+
+    def _permissoes_alteradas(self):
+        with Database._lock:
+            Database._versoes_permissoes[self.db_file] = self.versao_permissoes + 1
+
+    def get_connection(self) -> sqlite3.Connection:
+        """Retorna a conexão da thread atual, abrindo-a na primeira chamada.
+
+        Cada thread reutiliza sua própria conexão (o sqlite3 não permite
+        compartilhá-las entre threads); com WAL, leitores não bloqueiam o
+        escritor e vice-versa.
+        """
+        conn = getattr(self._local, "conexao", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_file, timeout=TIMEOUT_LOCK)
+            for pragma in PRAGMAS_CONEXAO:
+                conn.execute(pragma)
+            self._local.conexao = conn
+            self._local.profundidade = 0
+        return conn
+
+    def fechar_conexao(self):
+        """Fecha a conexão da thread atual (ex.: ao encerrar uma tarefa em segundo plano)."""
+        conn = getattr(self._local, "conexao", None)
+        if conn is not None:
+            conn.close()
+            self._local.conexao = None
+
+    @contextmanager
+    def transacao(self):
+        """Unidade de trabalho: tudo dentro do bloco é gravado ou desfeito junto.
+
+        Transações aninhadas na mesma thread se juntam à mais externa.
+
+        Exemplo:
+            with db.transacao() as conn:
+                conn.execute(...)
+                conn.execute(...)
+        """
+        conn = self.get_connection()
+        if self._local.profundidade:
+            self._local.profundidade += 1
+            try:
+                yield conn
+            finally:
+                self._local.profundidade -= 1
+            return
+
+        if conn.in_transaction:
+            conn.commit()
+        self._local.profundidade = 1
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            yield conn
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            self._local.profundidade = 0
+
+    def preparar_esquema(self):
+        """Cria/migra as tabelas uma única vez, conforme PRAGMA user_version."""
+        with Database._lock:
+            if self.db_file in Database._arquivos_preparados:
+                return
+
+            versao = self.get_connection().execute("PRAGMA user_version").fetchone()[0]
+
+            if versao < 1:
+                self.init_database()
+                self.corrigir_estrutura_empresas()
+            if versao < 2:
+                self.criar_tabela_contratos()
+            if versao < 3:
+                self.criar_tabela_sincronizacao()
+            if versao < 4:
+                self.migrar_chave_contratos()
+            if versao < 5:
+                self.migrar_ambiente_contratos()
+            if versao < VERSAO_ESQUEMA:
+                with self.get_connection() as conn:
+                    conn.execute(f"PRAGMA user_version = {VERSAO_ESQUEMA}")
+
+            Database._arquivos_preparados.add(self.db_file)
     
     def corrigir_estrutura_empresas(self):
         """Corrige a estrutura da tabela empresas se necessário."""
@@ -123,8 +291,216 @@ class Database:
             
             conn.commit()
     
+    def criar_tabela_contratos(self):
+        """Cria a tabela local de contratos buscados na LG e seus índices.
+
+        A chave é (tenant, ambiente, chave_contrato): a matrícula ou, em
+        contratos sem matrícula, CPF + data de admissão; ``matricula`` fica
+        NULL nesses casos. O mesmo tenant pode existir em mais de um ambiente
+        (produção e homologação), e cada um tem seus contratos.
+        """
+        with self.transacao() as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS contratos (
+                    tenet_id TEXT NOT NULL,
+                    ambiente TEXT NOT NULL DEFAULT '',
+                    chave TEXT NOT NULL,
+                    matricula TEXT,
+                    nome TEXT,
+                    cpf TEXT,
+                    data_admissao TEXT,
+                    cargo TEXT,
+                    departamento TEXT,
+                    situacao TEXT,
+                    empresa_codigo TEXT,
+                    atualizado_em TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                    PRIMARY KEY (tenet_id, ambiente, chave)
+                ) WITHOUT ROWID
+            ''')
+            for nome, colunas in INDICES_CONTRATOS.items():
+                conn.execute(f'CREATE INDEX IF NOT EXISTS {nome} ON contratos ({colunas})')
+
+    def migrar_chave_contratos(self):
+        """Migra a tabela contratos da chave (tenant, matrícula) para (tenant, ambiente, chave).
+
+        Na chave antiga, contratos sem matrícula eram gravados com a matrícula
+        'None' e se sobrescreviam; eles passam a ter matrícula NULL e chave por
+        CPF + admissão.
+        """
+        with self.transacao() as conn:
+            colunas = [linha[1] for linha in conn.execute("PRAGMA table_info(contratos)")]
+            if "chave" in colunas:
+                return
+            self._recriar_tabela_contratos(
+                conn,
+                chave="CASE WHEN matricula IN ('None', '') THEN 'cpf:' || COALESCE(cpf, '') || ':' || COALESCE(data_admissao, '') "
+                      "ELSE matricula END",
+                matricula="NULLIF(NULLIF(matricula, 'None'), '')"
+            )
+
+    def migrar_ambiente_contratos(self):
+        """Acrescenta o ambiente à chave da tabela contratos.
+
+        Contratos já gravados recebem o ambiente da empresa do tenant quando
+        ele está cadastrado em um único ambiente; nos demais casos o ambiente
+        fica vazio, e a sincronização incremental do ambiente recomeça do
+        início em vez de partir de contratos de outro ambiente.
+        """
+        with self.transacao() as conn:
+            colunas = [linha[1] for linha in conn.execute("PRAGMA table_info(contratos)")]
+            if "ambiente" in colunas:
+                return
+            self._recriar_tabela_contratos(conn, chave="chave", matricula="matricula")
+
+    def _recriar_tabela_contratos(self, conn, chave: str, matricula: str):
+        """Recria a tabela contratos no esquema atual copiando as linhas da anterior.
+
+        Args:
+            conn: Conexão dentro de uma transação
+            chave: Expressão SQL da nova chave sobre a tabela anterior
+            matricula: Expressão SQL da matrícula sobre a tabela anterior
+        """
+        conn.execute("ALTER TABLE contratos RENAME TO contratos_antiga")
+        for nome in INDICES_CONTRATOS:
+            conn.execute(f"DROP INDEX IF EXISTS {nome}")
+        self.criar_tabela_contratos()
+        conn.execute(f'''
+            INSERT OR REPLACE INTO contratos (tenet_id, ambiente, chave, matricula, nome, cpf, data_admissao, cargo,
+                                              departamento, situacao, empresa_codigo, atualizado_em)
+            SELECT tenet_id,
+                   (SELECT CASE WHEN COUNT(DISTINCT e.ambiente) = 1 THEN MIN(e.ambiente) ELSE '' END
+                    FROM empresas e WHERE e.tenetID = contratos_antiga.tenet_id),
+                   {chave},
+                   {matricula},
+                   nome, cpf, data_admissao, cargo, departamento, situacao, empresa_codigo, atualizado_em
+            FROM contratos_antiga
+        ''')
+        conn.execute("DROP TABLE contratos_antiga")
+
+    def salvar_contratos(self, tenet_id: str, ambiente: str, contratos: List[tuple]) -> int:
+        """Grava (insere ou atualiza) contratos do tenant/ambiente em uma única transação.
+
+        Contratos sem matrícula são identificados por CPF + data de admissão
+        (ver chave_contrato); os que não têm nem matrícula nem CPF são ignorados.
+
+        Args:
+            tenet_id: Tenant de origem dos contratos
+            ambiente: Ambiente de origem dos contratos
+            contratos: Tuplas (nome, cpf, data_admissao ISO, cargo, departamento,
+                matricula, situacao, empresa_codigo)
+
+        Returns:
+            int: Quantidade de contratos gravados
+        """
+        linhas = []
+        for contrato in contratos:
+            chave = chave_contrato(contrato[5], contrato[1], contrato[2])
+            if chave is not None:
+                linhas.append((tenet_id, ambiente, chave) + tuple(contrato))
+        if not linhas:
+            return 0
+        with self.transacao() as conn:
+            conn.executemany('''
+                INSERT INTO contratos (tenet_id, ambiente, chave, nome, cpf, data_admissao, cargo, departamento,
+                                       matricula, situacao, empresa_codigo, atualizado_em)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+                ON CONFLICT (tenet_id, ambiente, chave) DO UPDATE SET
+                    matricula = excluded.matricula,
+                    nome = excluded.nome,
+                    cpf = excluded.cpf,
+                    data_admissao = excluded.data_admissao,
+                    cargo = excluded.cargo,
+                    departamento = excluded.departamento,
+                    situacao = excluded.situacao,
+                    empresa_codigo = excluded.empresa_codigo,
+                    atualizado_em = excluded.atualizado_em
+            ''', linhas)
+        return len(linhas)
+
+    def get_contratos_salvos(self, tenet_id: str, inicio: str, fim: str,
+                             empresa_codigo: Optional[str] = None, situacao: Optional[str] = None,
+                             ambiente: Optional[str] = None) -> List[tuple]:
+        """Retorna os contratos gravados do tenant com admissão em [inicio, fim).
+
+        Args:
+            tenet_id: Tenant dos contratos
+            inicio: Data inicial (ISO, inclusiva)
+            fim: Data final (ISO, exclusiva)
+            empresa_codigo: Filtra por empresa, se informado
+            situacao: Filtra pela situação do colaborador, se informada
+            ambiente: Filtra pelo ambiente, se informado
+
+        Returns:
+            List[tuple]: Tuplas no mesmo formato de salvar_contratos, ordenadas por data de admissão
+        """
+        sql = '''
+            SELECT nome, cpf, data_admissao, cargo, departamento, matricula, situacao, empresa_codigo
+            FROM contratos
+            WHERE tenet_id = ? AND data_admissao >= ? AND data_admissao < ?
+        '''
+        parametros = [tenet_id, inicio, fim]
+        if ambiente:
+            sql += ' AND ambiente = ?'
+            parametros.append(ambiente)
+        if empresa_codigo:
+            sql += ' AND empresa_codigo = ?'
+            parametros.append(empresa_codigo)
+        if situacao:
+            sql += ' AND situacao = ?'
+            parametros.append(situacao)
+        sql += ' ORDER BY data_admissao'
+        return self.get_connection().execute(sql, parametros).fetchall()
+
+    def criar_tabela_sincronizacao(self):
+        """Cria a tabela com a marca d'água da sincronização incremental de cada tenant."""
+        with self.transacao() as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS sincronizacao_contratos (
+                    tenet_id TEXT NOT NULL,
+                    ambiente TEXT NOT NULL,
+                    marca_data_admissao TEXT NOT NULL,
+                    sincronizado_em TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                    contratos_recebidos INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (tenet_id, ambiente)
+                )
+            ''')
+
+    def get_marca_sincronizacao(self, tenet_id: str, ambiente: str) -> Optional[Dict]:
+        """Retorna a marca d'água da última sincronização do tenant, se houver."""
+        row = self.get_connection().execute('''
+            SELECT marca_data_admissao, sincronizado_em, contratos_recebidos
+            FROM sincronizacao_contratos
+            WHERE tenet_id = ? AND ambiente = ?
+        ''', (tenet_id, ambiente)).fetchone()
+        if row:
+            return {
+                "marca_data_admissao": row[0],
+                "sincronizado_em": row[1],
+                "contratos_recebidos": row[2]
+            }
+        return None
+
+    def salvar_marca_sincronizacao(self, tenet_id: str, ambiente: str, marca_data_admissao: str, contratos_recebidos: int):
+        """Grava a marca d'água (data de admissão ISO) após uma sincronização completa."""
+        with self.transacao() as conn:
+            conn.execute('''
+                INSERT INTO sincronizacao_contratos (tenet_id, ambiente, marca_data_admissao, sincronizado_em, contratos_recebidos)
+                VALUES (?, ?, ?, CURRENT_TIMESTAMP, ?)
+                ON CONFLICT (tenet_id, ambiente) DO UPDATE SET
+                    marca_data_admissao = excluded.marca_data_admissao,
+                    sincronizado_em = excluded.sincronizado_em,
+                    contratos_recebidos = excluded.contratos_recebidos
+            ''', (tenet_id, ambiente, marca_data_admissao, contratos_recebidos))
+
+    def get_maior_data_admissao(self, tenet_id: str, ambiente: str) -> Optional[str]:
+        """Maior data de admissão (ISO) já gravada localmente para o tenant no ambiente."""
+        row = self.get_connection().execute(
+            'SELECT MAX(data_admissao) FROM contratos WHERE tenet_id = ? AND ambiente = ?', (tenet_id, ambiente)
+        ).fetchone()
+        return row[0] if row else None
+
     def verify_database(self):
-        """Verifica se o banco de dados foi inicializado corretamente."""
+        """Imprime tabelas e registros para conferir o banco (diagnóstico opcional)."""
         with self.get_connection() as conn:
             cursor = conn.cursor()
             
@@ -182,13 +558,13 @@ class Database:
         with self.get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute('''
-                SELECT e.codigo, e.nome
+                SELECT e.codigo, e.nome, e.tenetID, e.ambiente
                 FROM empresas e
                 INNER JOIN permissoes p ON e.codigo = p.empresa_codigo
                 INNER JOIN usuarios u ON p.usuario = u.username
                 WHERE u.username = ?
             ''', (username,))
-            return [{"codigo": row[0], "nome": row[1]} for row in cursor.fetchall()]
+            return [{"codigo": row[0], "nome": row[1], "tenetID": row[2], "ambiente": row[3]} for row in cursor.fetchall()]
     
     def get_todas_empresas(self) -> List[Dict]:
         """Retorna todas as empresas cadastradas."""
@@ -197,6 +573,7 @@ class Database:
             cursor.execute('SELECT codigo, nome, tenetID, ambiente FROM empresas')
             return [{"codigo": row[0], "nome": row[1], "tenetID": row[2], "ambiente": row[3]} for row in cursor.fetchall()]
     
+    @_altera_permissoes
     def adicionar_usuario(self, username: str, senha: str, nome: str, is_admin: bool, empresas: List[str]) -> bool:
         """Adiciona um novo usuário com suas permissões.
         
@@ -227,6 +604,7 @@ class Database:
         except sqlite3.IntegrityError:
             return False
     
+    @_altera_permissoes
     def atualizar_usuario(self, username: str, senha: str, nome: str, is_admin: bool, empresas: List[str]) -> bool:
         """Atualiza os dados de um usuário existente.
         
@@ -297,6 +675,35 @@ class Database:
                 for row in cursor.fetchall()
             ]
     
+    def get_usuarios_com_empresas(self) -> List[Dict]:
+        """Retorna todos os usuários com suas empresas em uma única consulta.
+        
+        Returns:
+            List[Dict]: usuários (username, nome, is_admin) ordenados por username,
+            cada um com a lista ``empresas`` (codigo, nome) ordenada por código
+        """
+        cursor = self.get_connection().execute('''
+            SELECT u.username, u.nome, u.is_admin, e.codigo, e.nome
+            FROM usuarios u
+            LEFT JOIN permissoes p ON p.usuario = u.username
+            LEFT JOIN empresas e ON e.codigo = p.empresa_codigo
+            ORDER BY u.username, e.codigo
+        ''')
+        usuarios = []
+        atual = None
+        for username, nome, is_admin, empresa_codigo, empresa_nome in cursor:
+            if atual is None or atual["username"] != username:
+                atual = {
+                    "username": username,
+                    "nome": nome,
+                    "is_admin": bool(is_admin),
+                    "empresas": []
+                }
+                usuarios.append(atual)
+            if empresa_codigo is not None:
+                atual["empresas"].append({"codigo": empresa_codigo, "nome": empresa_nome})
+        return usuarios
+    
     def get_empresas_usuario(self, username: str) -> List[Dict]:
         """Retorna todas as empresas que um usuário tem acesso."""
         with self.get_connection() as conn:
@@ -316,6 +723,7 @@ class Database:
                 for row in cursor.fetchall()
             ]
     
+    @_altera_permissoes
     def excluir_usuario(self, username: str) -> bool:
         """Exclui um usuário e suas permissões."""
         with self.get_connection() as conn:
@@ -338,6 +746,7 @@ class Database:
             except sqlite3.Error:
                 return False
     
+    @_altera_permissoes
     def adicionar_empresa(self, codigo: str, nome: str, tenetID: str, ambiente: str) -> bool:
         """Adiciona uma nova empresa ao sistema.
         
@@ -385,6 +794,7 @@ class Database:
                 }
             return None
     
+    @_altera_permissoes
     def atualizar_empresa(self, codigo_original, codigo, nome, tenetID, ambiente):
         """Atualiza os dados de uma empresa no banco de dados."""
         try:
@@ -399,6 +809,7 @@ class Database:
         except Exception as e:
             return False, f"Erro ao atualizar empresa: {str(e)}"
     
+    @_altera_permissoes
     def criar_empresa(self, codigo, nome, tenetID, ambiente):
         """Cria uma nova empresa no banco de dados."""
         try:
@@ -412,30 +823,31 @@ class Database:
         except Exception as e:
             return False, f"Erro ao criar empresa: {str(e)}"
     
+    @_altera_permissoes
     def excluir_empresa(self, codigo):
         """Exclui uma empresa do sistema."""
         try:
             print(f"Tentando excluir empresa com código: {codigo}")
             
-            # Primeiro, excluir as permissões
-            print("Excluindo permissões da empresa...")
-            with self.get_connection() as conn:
+            with self.transacao() as conn:
                 cursor = conn.cursor()
+
+                # Primeiro, excluir as permissões
+                print("Excluindo permissões da empresa...")
                 cursor.execute("DELETE FROM permissoes WHERE empresa_codigo = ?", (codigo,))
                 print(f"Permissões excluídas: {cursor.rowcount} registros afetados")
-            
-            # Depois, excluir a empresa
-            print("Excluindo empresa...")
-            with self.get_connection() as conn:
-                cursor = conn.cursor()
+                
+                # Depois, excluir a empresa
+                print("Excluindo empresa...")
                 cursor.execute("DELETE FROM empresas WHERE codigo = ?", (codigo,))
                 print(f"Empresa excluída: {cursor.rowcount} registros afetados")
+                
+                if cursor.rowcount == 0:
+                    print("Nenhuma empresa foi excluída. Verifique se o código existe.")
+                    # Desfaz também a exclusão das permissões
+                    conn.rollback()
+                    return False
             
-            if cursor.rowcount == 0:
-                print("Nenhuma empresa foi excluída. Verifique se o código existe.")
-                return False
-            
-            conn.commit()
             print("Exclusão concluída com sucesso")
             return True
             
@@ -472,30 +884,30 @@ class Database:
             ValueError: Se o operador não for encontrado ou se houver erro na atualização
         """
         try:
-            # Verifica se o operador existe
-            cursor = self.get_connection().cursor()
-            cursor.execute("SELECT * FROM operadores WHERE email = ?", (email_original,))
-            operador = cursor.fetchone()
-            
-            if not operador:
-                raise ValueError(f"Operador com email {email_original} não encontrado")
-            
-            # Verifica se o novo email já está em uso por outro operador
-            if email != email_original:
-                cursor.execute("SELECT * FROM operadores WHERE email = ?", (email,))
-                operador_existente = cursor.fetchone()
-                if operador_existente:
-                    raise ValueError(f"Já existe um operador com o email {email}")
-            
-            # Atualiza o operador
-            cursor.execute(
-                "UPDATE operadores SET email = ?, senha = ?, ativo = ? WHERE email = ?",
-                (email, senha, ativo, email_original)
-            )
-            self.get_connection().commit()
+            with self.transacao() as conn:
+                cursor = conn.cursor()
+
+                # Verifica se o operador existe
+                cursor.execute("SELECT * FROM operadores WHERE email = ?", (email_original,))
+                operador = cursor.fetchone()
+                
+                if not operador:
+                    raise ValueError(f"Operador com email {email_original} não encontrado")
+                
+                # Verifica se o novo email já está em uso por outro operador
+                if email != email_original:
+                    cursor.execute("SELECT * FROM operadores WHERE email = ?", (email,))
+                    operador_existente = cursor.fetchone()
+                    if operador_existente:
+                        raise ValueError(f"Já existe um operador com o email {email}")
+                
+                # Atualiza o operador
+                cursor.execute(
+                    "UPDATE operadores SET email = ?, senha = ?, ativo = ? WHERE email = ?",
+                    (email, senha, ativo, email_original)
+                )
             
         except Exception as e:
-            self.get_connection().rollback()
             raise ValueError(f"Erro ao atualizar operador: {str(e)}")
     
     def excluir_operador(self, email: str) -> bool:
@@ -537,6 +949,7 @@ class Database:
                 for row in cursor.fetchall()
             ]
     
+    @_altera_permissoes
     def criar_usuario(self, username: str, nome: str, senha: str, is_admin: bool, empresas: List[str]) -> bool:
         """Cria um novo usuário com suas permissões.
         
@@ -1,18 +1,368 @@
-from contrato_trabalho import ContratoTrabalhoLG
+from collections import OrderedDict
+from datetime import date
+import copy
+import hashlib
+import json
+import os
+import threading
+import time
+
+from contrato_trabalho import Contrato, ContratoTrabalhoLG, ResultadoBusca
+from database import Database
+from utils.logger import obter_logger
+
+logger = obter_logger(__name__)
+
+# Diretório do cache em disco das buscas; vazio desativa a camada de disco
+DIRETORIO_CACHE_PADRAO = os.environ.get("CONTRATOS_CACHE_DIR", "")
+
+class CacheContratos:
+    """Cache com validade (TTL) dos resultados de busca por mês.
+
+    A chave é (tenant, ambiente, operador, ano, mês, filtros). Há uma camada
+    em memória, limitada por número de buscas e total de contratos (LRU), e
+    uma camada opcional em disco que sobrevive a reinícios do aplicativo. O
+    mês corrente (e futuros) expira rápido, pois ainda recebe admissões; meses
+    já fechados podem ficar em cache por muito mais tempo.
+    Buscas parciais ou com erro nunca são guardadas. Quem obtém ou salva uma
+    busca recebe/entrega uma cópia da lista: ordenar ou filtrar o resultado
+    no lugar não altera o que está em cache.
+
+    Em disco, cada busca é um arquivo JSON com as linhas dos contratos (nunca
+    pickle: ler o cache não executa código). Arquivos vencidos ou ilegíveis
+    são apagados ao serem lidos, e o diretório guarda no máximo
+    ``max_arquivos_disco`` buscas (as mais antigas saem primeiro). Os arquivos
+    contêm dados pessoais (nome, CPF): o diretório deve ser de uso exclusivo
+    do aplicativo e é criado com acesso só para o usuário dele.
+    """
+
+    VERSAO_FORMATO = 2
+    EXTENSAO = ".json"
+
+    def __init__(self, ttl_mes_atual: float = 5 * 60, ttl_mes_fechado: float = 24 * 60 * 60,
+                 max_buscas: int = 64, max_contratos: int = 500_000,
+                 diretorio: str = DIRETORIO_CACHE_PADRAO, max_arquivos_disco: int = 256):
+        self.ttl_mes_atual = ttl_mes_atual
+        self.ttl_mes_fechado = ttl_mes_fechado
+        self.max_buscas = max_buscas
+        self.max_contratos = max_contratos
+        self.diretorio = diretorio or None
+        self.max_arquivos_disco = max_arquivos_disco
+        self._entradas = OrderedDict()  # chave -> (expira_em, contratos)
+        self._total_contratos = 0
+        self._lock = threading.Lock()
+        self._estatisticas = {
+            "acertos_memoria": 0,
+            "acertos_disco": 0,
+            "falhas": 0,
+            "expirados": 0,
+            "ignorados": 0,
+            "descartes": 0
+        }
+
+    @staticmethod
+    def chave(tenet_id, ambiente, operator_email, ano, mes, filtros=None):
+        return (tenet_id, ambiente, operator_email, int(ano), int(mes), tuple(sorted((filtros or {}).items())))
+
+    def ttl(self, ano: int, mes: int) -> float:
+        """Validade, em segundos, da busca de um mês."""
+        hoje = date.today()
+        if (ano, mes) >= (hoje.year, hoje.month):
+            return self.ttl_mes_atual
+        return self.ttl_mes_fechado
+
+    def obter(self, chave):
+        """Retorna os contratos em cache para a chave ou None."""
+        agora = time.time()
+        with self._lock:
+            entrada = self._entradas.get(chave)
+            if entrada is not None:
+                expira_em, contratos = entrada
+                if expira_em > agora:
+                    self._entradas.move_to_end(chave)
+                    self._estatisticas["acertos_memoria"] += 1
+                    return copy.copy(contratos)
+                self._remover(chave)
+                self._estatisticas["expirados"] += 1
+
+        entrada = self._ler_disco(chave, agora)
+        with self._lock:
+            if entrada is not None and entrada[0] > agora:
+                self._guardar_memoria(chave, *entrada)
+                self._estatisticas["acertos_disco"] += 1
+                return copy.copy(entrada[1])
+            self._estatisticas["falhas"] += 1
+            return None
+
+    def salvar(self, chave, contratos):
+        """Guarda o resultado de uma busca completa."""
+        if getattr(contratos, "erro", None) or not getattr(contratos, "completo", True):
+            with self._lock:
+                self._estatisticas["ignorados"] += 1
+            return
+
+        expira_em = time.time() + self.ttl(chave[3], chave[4])
+        contratos = copy.copy(contratos)
+        with self._lock:
+            self._guardar_memoria(chave, expira_em, contratos)
+        self._gravar_disco(chave, expira_em, contratos)
+
+    def invalidar(self, tenet_id=None):
+        """Descarta as buscas de um tenant (ou todas, sem argumento), em memória e em disco."""
+        with self._lock:
+            for chave in [c for c in self._entradas if tenet_id is None or c[0] == tenet_id]:
+                self._remover(chave)
+        if not self.diretorio:
+            return
+        prefixo = "" if tenet_id is None else self._prefixo_tenant(tenet_id) + "-"
+        try:
+            nomes = os.listdir(self.diretorio)
+        except FileNotFoundError:
+            return
+        for nome in nomes:
+            if nome.startswith(prefixo) and nome.endswith(self.EXTENSAO):
+                self._apagar_arquivo(os.path.join(self.diretorio, nome))
+
+    def estatisticas(self):
+        """Acertos, falhas e ocupação do cache."""
+        with self._lock:
+            acertos = self._estatisticas["acertos_memoria"] + self._estatisticas["acertos_disco"]
+            consultas = acertos + self._estatisticas["falhas"]
+            return dict(
+                self._estatisticas,
+                taxa_acerto=round(acertos / consultas, 3) if consultas else None,
+                buscas_em_memoria=len(self._entradas),
+                contratos_em_memoria=self._total_contratos
+            )
+
+    def _guardar_memoria(self, chave, expira_em, contratos):
+        if chave in self._entradas:
+            self._remover(chave)
+        if len(contratos) > self.max_contratos:
+            return
+        self._entradas[chave] = (expira_em, contratos)
+        self._total_contratos += len(contratos)
+        while len(self._entradas) > self.max_buscas or self._total_contratos > self.max_contratos:
+            self._remover(next(iter(self._entradas)))
+            self._estatisticas["descartes"] += 1
+
+    def _remover(self, chave):
+        _, contratos = self._entradas.pop(chave)
+        self._total_contratos -= len(contratos)
+
+    @staticmethod
+    def _prefixo_tenant(tenet_id):
+        return hashlib.sha1(repr(tenet_id).encode()).hexdigest()[:16]
+
+    def _arquivo(self, chave):
+        # O nome começa pelo tenant, para que invalidar() encontre os arquivos dele
+        nome = hashlib.sha1(repr((self.VERSAO_FORMATO, chave)).encode()).hexdigest()
+        return os.path.join(self.diretorio, f"{self._prefixo_tenant(chave[0])}-{nome}{self.EXTENSAO}")
+
+    @staticmethod
+    def _apagar_arquivo(caminho):
+        try:
+            os.remove(caminho)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning("Erro ao apagar cache de contratos em disco: %s", e)
+
+    def _ler_disco(self, chave, agora):
+        if not self.diretorio:
+            return None
+        caminho = self._arquivo(chave)
+        try:
+            with open(caminho, "r", encoding="utf-8") as arquivo:
+                dados = json.load(arquivo)
+            expira_em = dados["expira_em"]
+            if expira_em <= agora:
+                self._apagar_arquivo(caminho)
+                return None
+            return expira_em, ResultadoBusca(_contrato_do_cache(linha) for linha in dados["contratos"])
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning("Cache de contratos em disco ilegível, descartando: %s", e)
+            self._apagar_arquivo(caminho)
+            return None
+
+    def _gravar_disco(self, chave, expira_em, contratos):
+        if not self.diretorio:
+            return
+        caminho = self._arquivo(chave)
+        temporario = f"{caminho}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(self.diretorio, mode=0o700, exist_ok=True)
+            with open(temporario, "w", encoding="utf-8") as arquivo:
+                json.dump({"expira_em": expira_em, "contratos": [_linha_cache(contrato) for contrato in contratos]},
+                          arquivo, separators=(",", ":"))
+            os.replace(temporario, caminho)
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning("Erro ao gravar cache de contratos em disco: %s", e)
+            self._apagar_arquivo(temporario)
+            return
+        self._podar_disco()
+
+    def _podar_disco(self):
+        """Apaga as buscas mais antigas além de ``max_arquivos_disco`` (e caches pickle antigos)."""
+        arquivos = []
+        try:
+            with os.scandir(self.diretorio) as entradas:
+                for entrada in entradas:
+                    if entrada.name.endswith(".pickle"):
+                        self._apagar_arquivo(entrada.path)
+                    elif entrada.name.endswith(self.EXTENSAO):
+                        try:
+                            arquivos.append((entrada.stat().st_mtime_ns, entrada.path))
+                        except FileNotFoundError:
+                            pass
+        except OSError as e:
+            logger.warning("Erro ao listar cache de contratos em disco: %s", e)
+            return
+        arquivos.sort()
+        for _, caminho in arquivos[:max(0, len(arquivos) - self.max_arquivos_disco)]:
+            self._apagar_arquivo(caminho)
+
+
+def _linha_cache(contrato: Contrato) -> list:
+    """Contrato como linha JSON do cache em disco (data em ISO)."""
+    return [
+        contrato.nome,
+        contrato.cpf,
+        contrato.data_admissao.isoformat() if contrato.data_admissao else None,
+        contrato.cargo,
+        contrato.departamento,
+        contrato.matricula,
+        contrato.situacao,
+        contrato.empresa_codigo
+    ]
+
+
+def _contrato_do_cache(linha: list) -> Contrato:
+    nome, cpf, data_admissao, cargo, departamento, matricula, situacao, empresa_codigo = linha
+    return Contrato.criar(nome, cpf, date.fromisoformat(data_admissao) if data_admissao else None,
+                          cargo, departamento, matricula, situacao, empresa_codigo)
+
+
+_cache_contratos = None
+_cache_contratos_lock = threading.Lock()
+
+def get_cache_contratos() -> CacheContratos:
+    """Retorna o cache de buscas do processo."""
+    global _cache_contratos
+    with _cache_contratos_lock:
+        if _cache_contratos is None:
+            _cache_contratos = CacheContratos()
+        return _cache_contratos
 
 class ContratoModel:
-    def __init__(self, contrato_lg=None):
+    def __init__(self, contrato_lg=None, db=None, cache=None):
         self.contrato_lg = contrato_lg or ContratoTrabalhoLG()
+        self.db = db or Database.compartilhada()
+        self.cache = cache or get_cache_contratos()
     
-    def buscar_contratos_por_mes(self, ano, mes, tenet_id=None, ambiente=None, operator_email=None, operator_password=None):
-        """Busca contratos por mês e ano, com opções de filtro por empresa e operador."""
-        return self.contrato_lg.buscar_contratos_por_mes(
+    def buscar_contratos_por_mes(self, ano, mes, tenet_id=None, ambiente=None, operator_email=None, operator_password=None,
+                                 forcar_atualizacao=False, empresas=None, ao_receber_pagina=None, cancelamento=None):
+        """Busca contratos por mês e ano, com opções de filtro por empresa e operador.
+
+        Buscas repetidas dentro da validade do cache não chamam a LG; use
+        ``forcar_atualizacao=True`` para ignorar o cache. O resultado buscado
+        também é gravado na tabela local de contratos. Com ``empresas``, só
+        os contratos dessas empresas são buscados. ``ao_receber_pagina`` recebe
+        cada página à medida que chega (no acerto de cache, uma única página
+        com todo o resultado). Buscas interrompidas por ``cancelamento`` não
+        entram no cache.
+        """
+        filtros = {'empresas': tuple(sorted(empresas))} if empresas else None
+        chave = self.cache.chave(tenet_id, ambiente, operator_email, ano, mes, filtros)
+        if not forcar_atualizacao:
+            contratos = self.cache.obter(chave)
+            if contratos is not None:
+                logger.info("Contratos de %02d/%s obtidos do cache (%d)", int(mes), ano, len(contratos))
+                if ao_receber_pagina is not None:
+                    ao_receber_pagina(1, 1, contratos)
+                return contratos
+
+        contratos = self.contrato_lg.buscar_contratos_por_mes(
             ano, 
             mes, 
             tenet_id=tenet_id,
             ambiente=ambiente,
             operator_email=operator_email,
-            operator_password=operator_password
+            operator_password=operator_password,
+            empresas=empresas,
+            ao_receber_pagina=ao_receber_pagina,
+            cancelamento=cancelamento
+        )
+        self.cache.salvar(chave, contratos)
+        self.salvar_contratos(tenet_id, ambiente, contratos)
+        return contratos
+    
+    def estatisticas_cache(self):
+        """Acertos/falhas e ocupação do cache de buscas."""
+        return self.cache.estatisticas()
+    
+    def buscar_contratos_por_periodo(self, inicio, fim, tenet_id=None, ambiente=None, operator_email=None, operator_password=None,
+                                     empresas=None):
+        """Busca contratos com data de admissão no intervalo [inicio, fim)."""
+        contratos = self.contrato_lg.buscar_contratos_por_periodo(
+            inicio,
+            fim,
+            tenet_id=tenet_id,
+            ambiente=ambiente,
+            operator_email=operator_email,
+            operator_password=operator_password,
+            empresas=empresas
+        )
+        self.salvar_contratos(tenet_id, ambiente, contratos)
+        return contratos
+    
+    def salvar_contratos(self, tenet_id, ambiente, contratos):
+        """Grava os contratos na tabela local (uma transação, executemany).
+
+        Falhas de gravação não interrompem a busca: os contratos continuam
+        sendo retornados a quem pediu.
+        """
+        if not tenet_id or not ambiente or not contratos:
+            return 0
+        try:
+            return self.db.salvar_contratos(tenet_id, ambiente, [contrato.para_linha() for contrato in contratos])
+        except Exception as e:
+            logger.error("Erro ao gravar contratos localmente: %s", e)
+            return 0
+    
+    def buscar_contratos_salvos_por_mes(self, ano, mes, tenet_id, codigo_empresa=None, situacao=None, ambiente=None):
+        """Consulta os contratos do mês já gravados localmente, sem chamar a LG."""
+        inicio, fim = self.contrato_lg._limites_do_mes(ano, mes)
+        return self.buscar_contratos_salvos(inicio, fim, tenet_id, codigo_empresa, situacao, ambiente)
+    
+    def buscar_contratos_salvos(self, inicio, fim, tenet_id, codigo_empresa=None, situacao=None, ambiente=None):
+        """Consulta os contratos gravados localmente com admissão em [inicio, fim)."""
+        linhas = self.db.get_contratos_salvos(
+            tenet_id,
+            inicio.isoformat(),
+            fim.isoformat(),
+            empresa_codigo=codigo_empresa,
+            situacao=situacao,
+            ambiente=ambiente
+        )
+        return [
+            Contrato.criar(nome, cpf, date.fromisoformat(data_admissao) if data_admissao else None,
+                           cargo, departamento, matricula, situacao_contrato, empresa_codigo)
+            for nome, cpf, data_admissao, cargo, departamento, matricula, situacao_contrato, empresa_codigo in linhas
+        ]
+    
+    def iterar_contratos(self, inicio, fim, tenet_id=None, ambiente=None, operator_email=None, operator_password=None, por_pagina=False):
+        """Gera os contratos do intervalo [inicio, fim) à medida que as páginas chegam."""
+        return self.contrato_lg.iterar_contratos(
+            inicio,
+            fim,
+            tenet_id=tenet_id,
+            ambiente=ambiente,
+            operator_email=operator_email,
+            operator_password=operator_password,
+            por_pagina=por_pagina
         )
     
     def filtrar_contratos_por_empresa(self, contratos, codigo_empresa):
@@ -23,4 +373,17 @@ class ContratoModel:
         return [
             contrato for contrato in contratos
             if str(contrato.get('empresa', {}).get('Codigo', '')) == codigo_empresa
-        ] 
\ No newline at end of file
+        ]
+    
+    def sincronizar_incremental(self, tenet_id, ambiente, operator_email, operator_password):
+        """Sincroniza na base local só os contratos novos/alterados do tenant (ver ContratoTrabalhoLG)."""
+        resultado = self.contrato_lg.sincronizar_incremental(
+            tenet_id,
+            ambiente,
+            operator_email,
+            operator_password,
+            db=self.db
+        )
+        if resultado["contratos_recebidos"]:
+            self.cache.invalidar(tenet_id)
+        return resultado
@@ -2,7 +2,7 @@ from database import Database
 
 class EmpresaModel:
     def __init__(self, db=None):
-        self.db = db or Database()
+        self.db = db or Database.compartilhada()
     
     def get_todas_empresas(self):
         """Retorna todas as empresas cadastradas."""
@@ -2,7 +2,7 @@ from database import Database
 
 class OperadorModel:
     def __init__(self, db=None):
-        self.db = db or Database()
+        self.db = db or Database.compartilhada()
     
     def get_todos_operadores(self):
         """Retorna todos os operadores cadastrados."""
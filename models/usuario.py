@@ -2,12 +2,16 @@ from database import Database
 
 class UsuarioModel:
     def __init__(self, db=None):
-        self.db = db or Database()
+        self.db = db or Database.compartilhada()
     
     def get_todos_usuarios(self):
         """Retorna todos os usuários cadastrados."""
         return self.db.get_todos_usuarios()
     
+    def get_usuarios_com_empresas(self):
+        """Retorna todos os usuários com suas empresas (uma única consulta)."""
+        return self.db.get_usuarios_com_empresas()
+    
     def get_usuario(self, username):
         """Retorna um usuário específico pelo nome de usuário."""
         return self.db.get_usuario(username)
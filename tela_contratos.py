@@ -2,14 +2,18 @@ import flet as ft
 from contrato_trabalho import ContratoTrabalhoLG
 from controle_acesso import ControleAcesso
 from database import Database
+from utils.logger import obter_logger
+from views.tabela_contratos import TabelaContratos
 from datetime import datetime
 import asyncio
 
+logger = obter_logger(__name__)
+
 class TelaContratos:
     def __init__(self):
         self.contrato_lg = ContratoTrabalhoLG()
         self.controle_acesso = ControleAcesso()
-        self.db = Database()
+        self.db = Database.compartilhada()
         self.page = None  # Referência para a página
         self.tabela_empresas = None  # Referência para a tabela de empresas
         self.tabela_usuarios = None  # Referência para a tabela de usuários
@@ -137,31 +141,8 @@ class TelaContratos:
             label="Operador"
         )
         
-        # Tabela de dados
-        data_table = ft.DataTable(
-            columns=[
-                ft.DataColumn(ft.Text("Matrícula", weight=ft.FontWeight.BOLD)),
-                ft.DataColumn(ft.Text("Nome", weight=ft.FontWeight.BOLD)),
-                ft.DataColumn(ft.Text("CPF", weight=ft.FontWeight.BOLD)),
-                ft.DataColumn(ft.Text("Data Admissão", weight=ft.FontWeight.BOLD)),
-                ft.DataColumn(ft.Text("Cargo", weight=ft.FontWeight.BOLD)),
-                ft.DataColumn(ft.Text("Departamento", weight=ft.FontWeight.BOLD)),
-                ft.DataColumn(ft.Text("Situação", weight=ft.FontWeight.BOLD)),
-                ft.DataColumn(ft.Text("Empresa", weight=ft.FontWeight.BOLD)),
-            ],
-            rows=[],
-            border=ft.border.all(1, ft.colors.BLUE_GREY_200),
-            vertical_lines=ft.border.BorderSide(1, ft.colors.BLUE_GREY_200),
-            horizontal_lines=ft.border.BorderSide(1, ft.colors.BLUE_GREY_200),
-            heading_row_color=ft.colors.BLUE_50,
-            heading_row_height=50,
-            data_row_color=ft.colors.WHITE,
-            data_row_min_height=40,
-            data_row_max_height=40,
-            column_spacing=20,
-            width=1100,  # Largura fixa para garantir que todas as colunas sejam visíveis
-            horizontal_margin=10
-        )
+        # Tabela de dados (paginada)
+        tabela_contratos = TabelaContratos()
         
         # Container para a tabela com scroll
         table_container = ft.Container(
@@ -184,10 +165,11 @@ class TelaContratos:
                         ],
                         alignment=ft.MainAxisAlignment.SPACE_BETWEEN
                     ),
+                    tabela_contratos.barra_filtros,
                     ft.Container(height=10),
                     ft.Container(
                         content=ft.Column(
-                            [data_table],
+                            [tabela_contratos.data_table],
                             scroll=ft.ScrollMode.ALWAYS,
                             spacing=0,
                             height=400,
@@ -195,7 +177,8 @@ class TelaContratos:
                         border=ft.border.all(1, ft.colors.BLUE_GREY_200),
                         border_radius=8,
                         padding=10
-                    )
+                    ),
+                    tabela_contratos.barra_paginacao
                 ]
             ),
             padding=20,
@@ -292,7 +275,7 @@ class TelaContratos:
                 await page.update_async()
 
                 # Limpar tabela atual
-                data_table.rows.clear()
+                tabela_contratos.limpar()
 
                 # Obter empresa selecionada
                 empresa_selecionada = None
@@ -302,11 +285,9 @@ class TelaContratos:
                 # Obter operador selecionado
                 operador_selecionado = None
                 if operador_dropdown.value:
-                    print(f"Email do operador selecionado: {operador_dropdown.value}")
                     operador_selecionado = self.db.get_operador(operador_dropdown.value)
-                    print(f"Operador selecionado: {operador_selecionado}")
-                    if operador_selecionado:
-                        print(f"Credenciais do operador: {operador_selecionado['email']} / {operador_selecionado['senha']}")
+                    logger.debug("Operador selecionado: %s (encontrado: %s)",
+                                 operador_dropdown.value, operador_selecionado is not None)
 
                 # Buscar contratos
                 contratos = await self.buscar_contratos_api(
@@ -315,11 +296,11 @@ class TelaContratos:
                     empresa_selecionada,
                     operador_selecionado
                 )
-                print(f"Total de contratos retornados da API: {len(contratos)}")
+                logger.debug("Total de contratos retornados da API: %d", len(contratos))
                 
                 # Filtrar contratos baseado nas permissões do usuário
                 contratos_filtrados = self.controle_acesso.filtrar_contratos(contratos)
-                print(f"Total de contratos após filtro de permissões: {len(contratos_filtrados)}")
+                logger.debug("Total de contratos após filtro de permissões: %d", len(contratos_filtrados))
                 
                 # Filtrar por empresa selecionada
                 if empresa_dropdown.value:
@@ -327,38 +308,10 @@ class TelaContratos:
                         contrato for contrato in contratos_filtrados
                         if str(contrato.get('empresa', {}).get('Codigo', '')) == empresa_dropdown.value
                     ]
-                    print(f"Total de contratos após filtro de empresa: {len(contratos_filtrados)}")
+                    logger.debug("Total de contratos após filtro de empresa: %d", len(contratos_filtrados))
                 
-                # Preencher tabela
-                for contrato in contratos_filtrados:
-                    print(f"Adicionando contrato à tabela: {contrato['matricula']} - {contrato['nome']}")
-                    data_table.rows.append(
-                        ft.DataRow(
-                            cells=[
-                                ft.DataCell(ft.Text(contrato['matricula'])),
-                                ft.DataCell(ft.Text(contrato['nome'])),
-                                ft.DataCell(ft.Text(contrato['cpf'])),
-                                ft.DataCell(ft.Text(contrato['data_admissao'])),
-                                ft.DataCell(ft.Text(contrato['cargo'])),
-                                ft.DataCell(ft.Text(contrato['departamento'])),
-                                ft.DataCell(
-                                    ft.Container(
-                                        content=ft.Text(
-                                            contrato['situacao'],
-                                            color=ft.colors.WHITE,
-                                            text_align=ft.TextAlign.CENTER
-                                        ),
-                                        bgcolor=ft.colors.GREEN if contrato['situacao'] == 'Ativo' else ft.colors.RED_400,
-                                        border_radius=15,
-                                        padding=ft.padding.symmetric(horizontal=10, vertical=5)
-                                    )
-                                ),
-                                ft.DataCell(ft.Text(str(contrato.get('empresa', {}).get('Codigo', '')))),
-                            ]
-                        )
-                    )
-                
-                print(f"Total de linhas adicionadas à tabela: {len(data_table.rows)}")
+                # Preencher tabela: só a página visível vira controles
+                tabela_contratos.definir_contratos(contratos_filtrados)
                 
                 # Atualizar contador de registros
                 total_registros = len(contratos_filtrados)
@@ -367,7 +320,7 @@ class TelaContratos:
                 # Esconder progresso
                 self.progress.visible = False
                 await page.update_async()
-                print("Atualização da página concluída")
+                logger.debug("Atualização da página concluída")
             except Exception as e:
                 page.show_snack_bar(
                     ft.SnackBar(
@@ -816,9 +769,9 @@ class TelaContratos:
         
         def atualizar_lista_usuarios():
             lista_usuarios.rows.clear()
-            for user in self.db.get_todos_usuarios():
-                # Obter empresas do usuário
-                empresas_usuario = self.db.get_empresas_usuario(user["username"])
+            for user in self.db.get_usuarios_com_empresas():
+                # Empresas do usuário já vêm da mesma consulta
+                empresas_usuario = user["empresas"]
                 empresas_str = ", ".join([f"{emp['codigo']} - {emp['nome']}" for emp in empresas_usuario])
                 
                 lista_usuarios.rows.append(
@@ -1253,7 +1206,7 @@ class TelaContratos:
                 for operador in operadores
             ]
             operador_dropdown.value = ""
-            print("Operadores disponíveis:", [op["email"] for op in operadores])
+            logger.debug("Operadores disponíveis: %d", len(operadores))
             page.update()
         
         # Indicador de carregamento
@@ -1263,31 +1216,8 @@ class TelaContratos:
             bgcolor=ft.colors.BLUE_GREY_100
         )
         
-        # Tabela de dados
-        data_table = ft.DataTable(
-            columns=[
-                ft.DataColumn(ft.Text("Matrícula", weight=ft.FontWeight.BOLD)),
-                ft.DataColumn(ft.Text("Nome", weight=ft.FontWeight.BOLD)),
-                ft.DataColumn(ft.Text("CPF", weight=ft.FontWeight.BOLD)),
-                ft.DataColumn(ft.Text("Data Admissão", weight=ft.FontWeight.BOLD)),
-                ft.DataColumn(ft.Text("Cargo", weight=ft.FontWeight.BOLD)),
-                ft.DataColumn(ft.Text("Departamento", weight=ft.FontWeight.BOLD)),
-                ft.DataColumn(ft.Text("Situação", weight=ft.FontWeight.BOLD)),
-                ft.DataColumn(ft.Text("Empresa", weight=ft.FontWeight.BOLD)),
-            ],
-            rows=[],
-            border=ft.border.all(1, ft.colors.BLUE_GREY_200),
-            vertical_lines=ft.border.BorderSide(1, ft.colors.BLUE_GREY_200),
-            horizontal_lines=ft.border.BorderSide(1, ft.colors.BLUE_GREY_200),
-            heading_row_color=ft.colors.BLUE_50,
-            heading_row_height=50,
-            data_row_color=ft.colors.WHITE,
-            data_row_min_height=40,
-            data_row_max_height=40,
-            column_spacing=20,
-            width=1100,  # Largura fixa para garantir que todas as colunas sejam visíveis
-            horizontal_margin=10
-        )
+        # Tabela de dados (paginada)
+        tabela_contratos = TabelaContratos()
         
         # Container para a tabela com scroll
         table_container = ft.Container(
@@ -1310,10 +1240,11 @@ class TelaContratos:
                         ],
                         alignment=ft.MainAxisAlignment.SPACE_BETWEEN
                     ),
+                    tabela_contratos.barra_filtros,
                     ft.Container(height=10),
                     ft.Container(
                         content=ft.Column(
-                            [data_table],
+                            [tabela_contratos.data_table],
                             scroll=ft.ScrollMode.ALWAYS,
                             spacing=0,
                             height=400,
@@ -1321,7 +1252,8 @@ class TelaContratos:
                         border=ft.border.all(1, ft.colors.BLUE_GREY_200),
                         border_radius=8,
                         padding=10
-                    )
+                    ),
+                    tabela_contratos.barra_paginacao
                 ]
             ),
             padding=20,
@@ -1345,7 +1277,7 @@ class TelaContratos:
                 await page.update_async()
 
                 # Limpar tabela atual
-                data_table.rows.clear()
+                tabela_contratos.limpar()
 
                 # Obter empresa selecionada
                 empresa_selecionada = None
@@ -1355,11 +1287,9 @@ class TelaContratos:
                 # Obter operador selecionado
                 operador_selecionado = None
                 if operador_dropdown.value:
-                    print(f"Email do operador selecionado: {operador_dropdown.value}")
                     operador_selecionado = self.db.get_operador(operador_dropdown.value)
-                    print(f"Operador selecionado: {operador_selecionado}")
-                    if operador_selecionado:
-                        print(f"Credenciais do operador: {operador_selecionado['email']} / {operador_selecionado['senha']}")
+                    logger.debug("Operador selecionado: %s (encontrado: %s)",
+                                 operador_dropdown.value, operador_selecionado is not None)
 
                 # Buscar contratos
                 contratos = await self.buscar_contratos_api(
@@ -1368,11 +1298,11 @@ class TelaContratos:
                     empresa_selecionada,
                     operador_selecionado
                 )
-                print(f"Total de contratos retornados da API: {len(contratos)}")
+                logger.debug("Total de contratos retornados da API: %d", len(contratos))
                 
                 # Filtrar contratos baseado nas permissões do usuário
                 contratos_filtrados = self.controle_acesso.filtrar_contratos(contratos)
-                print(f"Total de contratos após filtro de permissões: {len(contratos_filtrados)}")
+                logger.debug("Total de contratos após filtro de permissões: %d", len(contratos_filtrados))
                 
                 # Filtrar por empresa selecionada
                 if empresa_dropdown.value:
@@ -1380,38 +1310,10 @@ class TelaContratos:
                         contrato for contrato in contratos_filtrados
                         if str(contrato.get('empresa', {}).get('Codigo', '')) == empresa_dropdown.value
                     ]
-                    print(f"Total de contratos após filtro de empresa: {len(contratos_filtrados)}")
+                    logger.debug("Total de contratos após filtro de empresa: %d", len(contratos_filtrados))
                 
-                # Preencher tabela
-                for contrato in contratos_filtrados:
-                    print(f"Adicionando contrato à tabela: {contrato['matricula']} - {contrato['nome']}")
-                    data_table.rows.append(
-                        ft.DataRow(
-                            cells=[
-                                ft.DataCell(ft.Text(contrato['matricula'])),
-                                ft.DataCell(ft.Text(contrato['nome'])),
-                                ft.DataCell(ft.Text(contrato['cpf'])),
-                                ft.DataCell(ft.Text(contrato['data_admissao'])),
-                                ft.DataCell(ft.Text(contrato['cargo'])),
-                                ft.DataCell(ft.Text(contrato['departamento'])),
-                                ft.DataCell(
-                                    ft.Container(
-                                        content=ft.Text(
-                                            contrato['situacao'],
-                                            color=ft.colors.WHITE,
-                                            text_align=ft.TextAlign.CENTER
-                                        ),
-                                        bgcolor=ft.colors.GREEN if contrato['situacao'] == 'Ativo' else ft.colors.RED_400,
-                                        border_radius=15,
-                                        padding=ft.padding.symmetric(horizontal=10, vertical=5)
-                                    )
-                                ),
-                                ft.DataCell(ft.Text(str(contrato.get('empresa', {}).get('Codigo', '')))),
-                            ]
-                        )
-                    )
-                
-                print(f"Total de linhas adicionadas à tabela: {len(data_table.rows)}")
+                # Preencher tabela: só a página visível vira controles
+                tabela_contratos.definir_contratos(contratos_filtrados)
                 
                 # Atualizar contador de registros
                 total_registros = len(contratos_filtrados)
@@ -1420,7 +1322,7 @@ class TelaContratos:
                 # Esconder progresso
                 progress.visible = False
                 await page.update_async()
-                print("Atualização da página concluída")
+                logger.debug("Atualização da página concluída")
             except Exception as e:
                 page.show_snack_bar(
                     ft.SnackBar(
@@ -1807,9 +1709,9 @@ class TelaContratos:
         """Atualiza a lista de usuários na tabela."""
         if hasattr(self, 'tabela_usuarios') and self.tabela_usuarios:
             self.tabela_usuarios.rows.clear()
-            for user in self.db.get_todos_usuarios():
-                # Obter empresas do usuário
-                empresas_usuario = self.db.get_empresas_usuario(user["username"])
+            for user in self.db.get_usuarios_com_empresas():
+                # Empresas do usuário já vêm da mesma consulta
+                empresas_usuario = user["empresas"]
                 empresas_str = ", ".join([f"{emp['codigo']} - {emp['nome']}" for emp in empresas_usuario])
                 
                 self.tabela_usuarios.rows.append(
@@ -1914,20 +1816,34 @@ class TelaContratos:
                 raise ValueError("Ano inválido")
 
             # Buscar contratos com os parâmetros da empresa selecionada
-            contratos = self.contrato_lg.buscar_contratos_por_mes(
+            contratos = await self.contrato_lg.abuscar_contratos_por_mes(
                 ano_val, 
                 mes_val, 
                 tenet_id=empresa_selecionada["tenetID"] if empresa_selecionada else None,
                 ambiente=empresa_selecionada["ambiente"] if empresa_selecionada else None,
                 operator_email=operador_selecionado["email"] if operador_selecionado else None,
-                operator_password=operador_selecionado["senha"] if operador_selecionado else None
+                operator_password=operador_selecionado["senha"] if operador_selecionado else None,
+                # Empresa selecionada vai para o filtro do servidor (ver planejar_filtros)
+                empresas=[empresa_selecionada["codigo"]] if empresa_selecionada else None
             )
 
             return contratos
         except Exception as e:
-            print(f"Erro ao buscar contratos: {e}")
+            logger.error("Erro ao buscar contratos: %s", e)
             raise
 
 if __name__ == "__main__":
+    import argparse
+    from utils.cache_wsdl import configurar_cache_wsdl
+    from utils.logger import configurar_logging
+
+    configurar_logging()
+
+    parser = argparse.ArgumentParser(description="Sistema de Contratos de Trabalho")
+    parser.add_argument("--wsdl-dir", help="Diretório com a cópia local do WSDL da LG (modo offline)")
+    args, _ = parser.parse_known_args()
+    if args.wsdl_dir:
+        configurar_cache_wsdl(args.wsdl_dir, offline=True)
+
     app = TelaContratos()
     ft.app(target=app.main) 
\ No newline at end of file
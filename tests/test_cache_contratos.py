@@ -0,0 +1,91 @@
+from datetime import date
+
+from contrato_trabalho import Contrato, ResultadoBusca
+from models.contrato import CacheContratos
+
+
+def _contratos(quantidade=2, empresa="10"):
+    return ResultadoBusca([
+        Contrato.criar(f"Nome {i}", str(i), date(2020, 1, i + 1), "Analista", "TI", str(i), "Ativo", empresa)
+        for i in range(quantidade)
+    ])
+
+
+def test_invalidar_remove_tenant_do_disco(tmp_path):
+    cache = CacheContratos(diretorio=str(tmp_path))
+    chave_a = cache.chave("tenant-a", "1", "op@exemplo", 2020, 1)
+    chave_b = cache.chave("tenant-b", "1", "op@exemplo", 2020, 1)
+    cache.salvar(chave_a, _contratos())
+    cache.salvar(chave_b, _contratos())
+
+    cache.invalidar("tenant-a")
+
+    assert cache.obter(chave_a) is None
+    # Outra instância (ex.: após reinício) também não encontra o tenant invalidado
+    outro = CacheContratos(diretorio=str(tmp_path))
+    assert outro.obter(chave_a) is None
+    assert len(outro.obter(chave_b)) == 2
+
+
+def test_invalidar_sem_tenant_limpa_o_disco(tmp_path):
+    cache = CacheContratos(diretorio=str(tmp_path))
+    cache.salvar(cache.chave("tenant-a", "1", "op@exemplo", 2020, 1), _contratos())
+    cache.salvar(cache.chave(None, None, None, 2020, 2), _contratos())
+
+    cache.invalidar()
+
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_disco_guarda_json_e_recria_contratos(tmp_path):
+    cache = CacheContratos(diretorio=str(tmp_path))
+    chave = cache.chave("tenant-a", "1", "op@exemplo", 2020, 1)
+    cache.salvar(chave, _contratos())
+
+    [arquivo] = tmp_path.iterdir()
+    assert arquivo.suffix == ".json"
+    lidos = CacheContratos(diretorio=str(tmp_path)).obter(chave)
+    assert list(lidos) == list(_contratos())
+    assert lidos[0].data_admissao == date(2020, 1, 1)
+
+
+def test_arquivos_vencidos_e_ilegiveis_sao_apagados(tmp_path):
+    cache = CacheContratos(diretorio=str(tmp_path), ttl_mes_fechado=-1)
+    vencida = cache.chave("tenant-a", "1", "op@exemplo", 2020, 1)
+    cache.salvar(vencida, _contratos())
+    ilegivel = cache.chave("tenant-a", "1", "op@exemplo", 2020, 2)
+    with open(cache._arquivo(ilegivel), "w") as arquivo:
+        arquivo.write("{corrompido")
+
+    leitor = CacheContratos(diretorio=str(tmp_path))
+    assert leitor.obter(vencida) is None
+    assert leitor.obter(ilegivel) is None
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_disco_limita_numero_de_buscas(tmp_path):
+    cache = CacheContratos(diretorio=str(tmp_path), max_arquivos_disco=3)
+    chaves = [cache.chave("tenant-a", "1", "op@exemplo", 2020, mes) for mes in range(1, 7)]
+    for chave in chaves:
+        cache.salvar(chave, _contratos())
+
+    assert len(list(tmp_path.iterdir())) == 3
+    leitor = CacheContratos(diretorio=str(tmp_path))
+    assert leitor.obter(chaves[-1]) is not None
+
+
+def test_resultado_alterado_por_quem_obteve_nao_altera_o_cache():
+    cache = CacheContratos()
+    chave = cache.chave("tenant-a", "1", "op@exemplo", 2020, 1)
+    original = _contratos(3)
+    cache.salvar(chave, original)
+    original.clear()
+
+    primeiro = cache.obter(chave)
+    primeiro.sort(key=lambda contrato: contrato.nome, reverse=True)
+    primeiro.pop()
+
+    segundo = cache.obter(chave)
+    assert isinstance(segundo, ResultadoBusca) and segundo.completo
+    assert [contrato.nome for contrato in segundo] == ["Nome 0", "Nome 1", "Nome 2"]
+    assert segundo is not primeiro
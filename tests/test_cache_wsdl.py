@@ -0,0 +1,50 @@
+from unittest import mock
+
+from utils.cache_wsdl import CacheWsdl
+
+URL_WSDL = "https://lg.exemplo/servico?wsdl"
+URL_XSD = "https://lg.exemplo/servico?xsd=1"
+
+
+def _cache(tmp_path):
+    cache = CacheWsdl(str(tmp_path), intervalo_revalidacao=0)
+    cache.salvar(URL_WSDL, b"<wsdl v1/>")
+    cache.salvar(URL_XSD, b"<xsd v1/>")
+    return cache
+
+
+def _sessao(*respostas):
+    sessao = mock.Mock()
+    sessao.get.side_effect = [
+        resposta if isinstance(resposta, Exception) else mock.Mock(content=resposta)
+        for resposta in respostas
+    ]
+    return sessao
+
+
+def test_revalidacao_com_falha_nao_grava_nada(tmp_path):
+    cache = _cache(tmp_path)
+    revalidado_em = cache._manifesto["revalidado_em"]
+    callback = mock.Mock()
+    cache.ao_atualizar(callback)
+
+    cache._revalidar(_sessao(b"<wsdl v2/>", IOError("conexão recusada")))
+
+    assert cache.obter(URL_WSDL) == b"<wsdl v1/>"
+    assert cache.obter(URL_XSD) == b"<xsd v1/>"
+    assert cache._manifesto["revalidado_em"] == revalidado_em
+    callback.assert_not_called()
+    assert not cache._revalidando
+
+
+def test_revalidacao_com_mudancas_grava_tudo_e_avisa(tmp_path):
+    cache = _cache(tmp_path)
+    callback = mock.Mock()
+    cache.ao_atualizar(mock.Mock(side_effect=RuntimeError("falha em um ouvinte")))
+    cache.ao_atualizar(callback)
+
+    cache._revalidar(_sessao(b"<wsdl v2/>", b"<xsd v1/>"))
+
+    assert cache.obter(URL_WSDL) == b"<wsdl v2/>"
+    assert CacheWsdl(str(tmp_path)).obter(URL_WSDL) == b"<wsdl v2/>"
+    callback.assert_called_once_with()
@@ -0,0 +1,56 @@
+import asyncio
+from types import SimpleNamespace
+from unittest import mock
+
+import pytest
+
+from utils.cliente_lg import RegistroClientesLG
+
+
+def test_atualizacao_do_wsdl_fecha_os_clientes_descartados():
+    registro = RegistroClientesLG("https://lg.exemplo/wsdl", cache_wsdl=mock.Mock())
+    registro._client_base = SimpleNamespace()
+    cliente = registro.obter("operador@exemplo", "senha", "tenant", "1")
+
+    with mock.patch.object(cliente, "fechar") as fechar:
+        registro._invalidar_wsdl()
+
+    fechar.assert_called_once_with()
+    assert len(registro) == 0
+    assert registro.precisa_compilar()
+
+
+def test_sessao_assincrona_reservada_fecha_no_loop_ao_ser_devolvida():
+    pytest.importorskip("httpx")
+    registro = RegistroClientesLG("https://lg.exemplo/wsdl", cache_wsdl=mock.Mock())
+    registro._client_base = SimpleNamespace()
+
+    async def executar():
+        loop = asyncio.get_running_loop()
+        cliente = registro.obter_async("operador@exemplo", "senha", "tenant", "1", reservar=True)
+        cliente.loop = loop
+        # Atualização do WSDL chega pela thread de revalidação durante a busca
+        await loop.run_in_executor(None, registro._invalidar_wsdl)
+        assert not cliente.session.is_closed
+
+        cliente.devolver()
+        await asyncio.wrap_future(cliente._fechamento)
+        return cliente
+
+    cliente = asyncio.run(executar())
+
+    assert cliente.session.is_closed
+    registro.limpar()
+
+
+def test_sessao_assincrona_descartada_fora_de_um_loop_e_fechada():
+    pytest.importorskip("httpx")
+    registro = RegistroClientesLG("https://lg.exemplo/wsdl", cache_wsdl=mock.Mock(), max_clientes=1)
+    registro._client_base = SimpleNamespace()
+    antigo = registro.obter_async("a@exemplo", "senha", "tenant", "1")
+
+    # LRU a partir de uma chamada síncrona, sem event loop na thread
+    registro.obter_async("b@exemplo", "senha", "tenant", "1")
+
+    assert antigo.session.is_closed
+    registro.limpar()
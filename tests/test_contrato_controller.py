@@ -0,0 +1,50 @@
+from controllers.contrato_controller import ContratoController
+from contrato_trabalho import ResultadoBusca
+
+
+class ContratoModelFalso:
+    def __init__(self):
+        self.chamadas = []
+
+    def buscar_contratos_por_mes(self, ano, mes, **kwargs):
+        self.chamadas.append(dict(kwargs, ano=ano, mes=mes))
+        return ResultadoBusca()
+
+
+class EmpresaModelFalso:
+    def get_empresa(self, codigo):
+        return {"codigo": codigo, "tenetID": "tenant", "ambiente": "producao"}
+
+
+def _controller():
+    return ContratoController(contrato_model=ContratoModelFalso(), empresa_model=EmpresaModelFalso(),
+                              operador_model=object())
+
+
+def test_busca_de_uma_empresa_envia_o_filtro_de_empresa():
+    controller = _controller()
+
+    _, mensagem = controller.buscar_contratos(4, 2025, codigo_empresa="10")
+
+    assert mensagem == "Encontrados 0 contratos"
+    chamada, = controller.contrato_model.chamadas
+    assert chamada["empresas"] == ["10"]
+    assert (chamada["tenet_id"], chamada["ambiente"]) == ("tenant", "producao")
+
+
+def test_busca_sem_empresa_nao_filtra():
+    controller = _controller()
+
+    controller.buscar_contratos(4, 2025)
+
+    assert controller.contrato_model.chamadas[0]["empresas"] is None
+
+
+def test_busca_em_todas_as_empresas_valida_o_ano_antes_de_buscar():
+    controller = _controller()
+    empresas = [{"codigo": "10", "tenetID": "tenant", "ambiente": "producao"}]
+
+    for ano in (1999, 2101):
+        contratos, mensagem = controller.buscar_contratos_todas_empresas(4, ano, empresas)
+        assert (contratos, mensagem) == ([], "Ano inválido")
+    assert controller.contrato_model.chamadas == []
@@ -0,0 +1,64 @@
+from datetime import date
+from unittest import mock
+
+import pytest
+
+from contrato_trabalho import Contrato
+from controle_acesso import ControleAcesso
+
+
+class BancoFalso:
+    versao_permissoes = 0
+
+    def __init__(self, empresas_permitidas):
+        self.empresas_permitidas = empresas_permitidas
+
+    def get_usuario(self, username):
+        return {"username": username, "nome": username.title(), "is_admin": False}
+
+    def get_empresas_permitidas(self, username):
+        return [{"codigo": codigo, "nome": codigo, "tenetID": "t", "ambiente": "1"} for codigo in self.empresas_permitidas]
+
+
+@pytest.fixture
+def controle():
+    def criar(*empresas_permitidas):
+        with mock.patch("controle_acesso.Database.compartilhada", return_value=BancoFalso(empresas_permitidas)):
+            controle = ControleAcesso()
+        controle.usuario_atual = "joao"
+        return controle
+    return criar
+
+
+def _contrato(empresa):
+    return Contrato.criar("Nome", "1", date(2024, 1, 1), "Analista", "TI", "1", "Ativo", empresa)
+
+
+def test_filtro_compara_codigos_exatamente(controle):
+    acesso = controle("001", "2")
+    contratos = [_contrato("001"), _contrato("1"), _contrato("2"), _contrato("02")]
+
+    assert [contrato.empresa_codigo for contrato in acesso.filtrar_contratos(contratos)] == ["001", "2"]
+
+
+def test_filtro_aceita_contratos_em_dicionario(controle):
+    acesso = controle("5")
+    contratos = [{"empresa": {"Codigo": 5}}, {"empresa": {"Codigo": "05"}}, {}]
+
+    assert acesso.filtrar_contratos(contratos) == [{"empresa": {"Codigo": 5}}]
+
+
+def test_acesso_a_empresa_exige_o_codigo_cadastrado(controle):
+    acesso = controle("001")
+
+    assert acesso.tem_acesso_empresa("001")
+    assert not acesso.tem_acesso_empresa("1")
+    assert not controle("1").tem_acesso_empresa("001")
+
+
+def test_sem_usuario_nada_e_permitido(controle):
+    acesso = controle("1")
+    acesso.fazer_logout()
+
+    assert acesso.filtrar_contratos([_contrato("1")]) == []
+    assert not acesso.tem_acesso_empresa("1")
@@ -0,0 +1,129 @@
+import sqlite3
+from datetime import date
+
+from contrato_trabalho import Contrato
+from database import Database
+
+SELECT_CONTRATOS = 'SELECT chave, matricula, cpf FROM contratos ORDER BY chave'
+
+
+def _linha(matricula, cpf, dia=1):
+    return Contrato.criar(f"Nome {cpf}", cpf, date(2024, 1, dia), "Analista", "TI", matricula, "Ativo", "10").para_linha()
+
+
+def test_contratos_sem_matricula_nao_se_sobrescrevem(tmp_path):
+    db = Database(str(tmp_path / "contratos.db"))
+
+    gravados = db.salvar_contratos("tenant", "producao", [
+        _linha(None, "111"),
+        _linha(None, "222"),
+        _linha("", "333"),
+        _linha("42", "444"),
+    ])
+
+    assert gravados == 4
+    linhas = db.get_connection().execute(SELECT_CONTRATOS).fetchall()
+    assert linhas == [
+        ("42", "42", "444"),
+        ("cpf:111:2024-01-01", None, "111"),
+        ("cpf:222:2024-01-01", None, "222"),
+        ("cpf:333:2024-01-01", None, "333"),
+    ]
+    salvos = db.get_contratos_salvos("tenant", "2024-01-01", "2024-02-01")
+    assert sorted(linha[5] or "" for linha in salvos) == ["", "", "", "42"]
+
+
+def test_contrato_sem_matricula_e_sem_cpf_e_ignorado(tmp_path):
+    db = Database(str(tmp_path / "contratos.db"))
+
+    assert db.salvar_contratos("tenant", "producao", [_linha(None, None), _linha("1", "111")]) == 1
+
+
+def test_migra_tabela_com_chave_por_matricula(tmp_path):
+    arquivo = str(tmp_path / "antigo.db")
+    conn = sqlite3.connect(arquivo)
+    conn.executescript('''
+        CREATE TABLE contratos (
+            tenet_id TEXT NOT NULL,
+            matricula TEXT NOT NULL,
+            nome TEXT,
+            cpf TEXT,
+            data_admissao TEXT,
+            cargo TEXT,
+            departamento TEXT,
+            situacao TEXT,
+            empresa_codigo TEXT,
+            atualizado_em TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (tenet_id, matricula)
+        ) WITHOUT ROWID;
+        CREATE INDEX idx_contratos_cpf ON contratos (cpf);
+        CREATE TABLE empresas (codigo TEXT PRIMARY KEY, nome TEXT, tenetID TEXT, ambiente TEXT);
+        INSERT INTO empresas VALUES ('10', 'Empresa', 'tenant', 'producao');
+        INSERT INTO contratos (tenet_id, matricula, nome, cpf, data_admissao)
+        VALUES ('tenant', '7', 'Com Matrícula', '777', '2024-01-05'),
+               ('tenant', 'None', 'Sem Matrícula', '888', '2024-01-06');
+        PRAGMA user_version = 3;
+    ''')
+    conn.close()
+
+    db = Database(arquivo)
+
+    assert db.get_connection().execute(SELECT_CONTRATOS).fetchall() == [
+        ("7", "7", "777"),
+        ("cpf:888:2024-01-06", None, "888"),
+    ]
+    # O tenant só está cadastrado em produção: os contratos antigos são de lá
+    assert db.get_maior_data_admissao("tenant", "producao") == "2024-01-06"
+    assert db.salvar_contratos("tenant", "producao", [_linha(None, "999")]) == 1
+
+
+def test_maior_data_admissao_e_por_ambiente(tmp_path):
+    db = Database(str(tmp_path / "contratos.db"))
+    db.salvar_contratos("tenant", "producao", [_linha("1", "111", dia=10)])
+    db.salvar_contratos("tenant", "homologacao", [_linha("1", "111", dia=20), _linha("2", "222", dia=25)])
+
+    assert db.get_maior_data_admissao("tenant", "producao") == "2024-01-10"
+    assert db.get_maior_data_admissao("tenant", "homologacao") == "2024-01-25"
+    assert db.get_maior_data_admissao("outro", "producao") is None
+    # A mesma matrícula em ambientes diferentes não se sobrescreve
+    assert len(db.get_contratos_salvos("tenant", "2024-01-01", "2024-02-01")) == 3
+    assert len(db.get_contratos_salvos("tenant", "2024-01-01", "2024-02-01", ambiente="producao")) == 1
+
+
+def test_migra_chave_sem_ambiente(tmp_path):
+    arquivo = str(tmp_path / "v4.db")
+    conn = sqlite3.connect(arquivo)
+    conn.executescript('''
+        CREATE TABLE contratos (
+            tenet_id TEXT NOT NULL,
+            chave TEXT NOT NULL,
+            matricula TEXT,
+            nome TEXT,
+            cpf TEXT,
+            data_admissao TEXT,
+            cargo TEXT,
+            departamento TEXT,
+            situacao TEXT,
+            empresa_codigo TEXT,
+            atualizado_em TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (tenet_id, chave)
+        ) WITHOUT ROWID;
+        CREATE TABLE empresas (codigo TEXT PRIMARY KEY, nome TEXT, tenetID TEXT, ambiente TEXT);
+        INSERT INTO empresas VALUES ('10', 'Um ambiente', 'tenant-a', 'producao'),
+                                    ('20', 'Produção', 'tenant-b', 'producao'),
+                                    ('21', 'Homologação', 'tenant-b', 'homologacao');
+        INSERT INTO contratos (tenet_id, chave, matricula, cpf, data_admissao)
+        VALUES ('tenant-a', '1', '1', '111', '2024-01-05'),
+               ('tenant-b', '2', '2', '222', '2024-01-07');
+        PRAGMA user_version = 4;
+    ''')
+    conn.close()
+
+    db = Database(arquivo)
+
+    assert db.get_connection().execute(
+        'SELECT tenet_id, ambiente, chave FROM contratos ORDER BY tenet_id'
+    ).fetchall() == [("tenant-a", "producao", "1"), ("tenant-b", "", "2")]
+    # Ambiente desconhecido: a sincronização de cada ambiente recomeça do início
+    assert db.get_maior_data_admissao("tenant-b", "producao") is None
+    assert db.get_maior_data_admissao("tenant-b", "homologacao") is None
@@ -0,0 +1,101 @@
+import random
+import unicodedata
+from datetime import date
+
+import pytest
+
+from contrato_trabalho import Contrato
+from utils.indice_contratos import CAMPOS_ORDENACAO, IndiceContratos, _chave_ordenacao
+
+NOMES = ["João", "Maria", "José", "Ana", "Conceição", "Silva", "Souza", "Araújo", "Jo", "Mariana", "Sá"]
+TERMOS = ["jo", "JOÃO", "mar", "ana", "silva", "ceic", "sa", "ra", "1", "12", "123.4", "98", "zz", "s", "ão"]
+
+
+def _sem_acento(texto):
+    texto = unicodedata.normalize("NFKD", str(texto))
+    return "".join(caractere for caractere in texto if not unicodedata.combining(caractere)).lower()
+
+
+def _contratos(quantidade, semente):
+    aleatorio = random.Random(semente)
+    contratos = []
+    for _ in range(quantidade):
+        nome = " ".join(aleatorio.sample(NOMES, aleatorio.randint(1, 3))) if aleatorio.random() > 0.05 else None
+        digitos = "".join(aleatorio.choice("0123456789") for _ in range(11))
+        cpf = aleatorio.choice([digitos, f"{digitos[:3]}.{digitos[3:6]}.{digitos[6:9]}-{digitos[9:]}", None])
+        data = date(2024, 1, aleatorio.randint(1, 31)) if aleatorio.random() > 0.1 else None
+        contratos.append(Contrato.criar(
+            nome, cpf, data,
+            aleatorio.choice(["Analista", "Técnico", "Gerente", None]),
+            aleatorio.choice(["TI", "RH"]),
+            aleatorio.choice([aleatorio.randint(1, 2000), None]),
+            aleatorio.choice(["Ativo", "Afastado", "Férias"]),
+            aleatorio.choice([10, 20, 30]),
+        ))
+    return contratos
+
+
+def _casa_termo(contrato, termo):
+    """Regra de busca de IndiceContratos.buscar_texto, conferida linearmente."""
+    palavras = [_sem_acento(palavra) for palavra in (contrato.nome or "").split()]
+    if len(termo) < 3:
+        if any(palavra.startswith(termo) for palavra in palavras):
+            return True
+    elif any(termo in palavra for palavra in palavras):
+        return True
+    if contrato.matricula is not None and str(contrato.matricula).lower().startswith(termo):
+        return True
+    sem_pontuacao = termo.replace(".", "").replace("-", "").replace("/", "")
+    cpf = "".join(caractere for caractere in contrato.cpf or "" if caractere.isdigit())
+    return sem_pontuacao.isdigit() and cpf.startswith(sem_pontuacao)
+
+
+def _consulta_linear(contratos, texto, filtros, ordenar_por, decrescente):
+    termos = _sem_acento(texto or "").split()
+    posicoes = [
+        posicao for posicao, contrato in enumerate(contratos)
+        if all(getattr(contrato, "empresa_codigo" if campo == "empresa" else campo) == valor
+               for campo, valor in filtros.items() if valor is not None)
+        and all(_casa_termo(contrato, termo) for termo in termos)
+    ]
+    if ordenar_por is not None:
+        atributo = "empresa_codigo" if ordenar_por == "empresa" else ordenar_por
+        crescente = sorted(range(len(contratos)), key=lambda posicao: _chave_ordenacao(getattr(contratos[posicao], atributo)))
+        ordem = crescente[::-1] if decrescente else crescente
+        selecionadas = set(posicoes)
+        posicoes = [posicao for posicao in ordem if posicao in selecionadas]
+    return [contratos[posicao] for posicao in posicoes]
+
+
+@pytest.mark.parametrize("semente", range(5))
+def test_consulta_indexada_igual_ao_filtro_linear(semente):
+    contratos = _contratos(300, semente)
+    indice = IndiceContratos(contratos)
+    aleatorio = random.Random(semente + 100)
+
+    for _ in range(200):
+        texto = " ".join(aleatorio.sample(TERMOS, aleatorio.randint(0, 2)))
+        filtros = {
+            "empresa": aleatorio.choice([None, 10, 20]),
+            "situacao": aleatorio.choice([None, "Ativo", "Férias"]),
+            "cargo": aleatorio.choice([None, None, "Analista", "Gerente"]),
+        }
+        ordenar_por = aleatorio.choice((None,) + CAMPOS_ORDENACAO)
+        decrescente = aleatorio.random() < 0.5
+
+        obtido = indice.consultar(texto, filtros, ordenar_por, decrescente)
+
+        esperado = _consulta_linear(contratos, texto, filtros, ordenar_por, decrescente)
+        assert [id(contrato) for contrato in obtido] == [id(contrato) for contrato in esperado], (texto, filtros, ordenar_por)
+
+
+def test_indice_preparado_responde_igual_ao_montado_sob_demanda():
+    contratos = _contratos(200, 42)
+    preparado = IndiceContratos(contratos)
+    preparado.preparar()
+    sob_demanda = IndiceContratos(contratos)
+
+    for termo in TERMOS:
+        assert preparado.buscar_texto(termo) == sob_demanda.buscar_texto(termo)
+    for campo in CAMPOS_ORDENACAO:
+        assert preparado.ordem(campo, True) == sob_demanda.ordem(campo, True)
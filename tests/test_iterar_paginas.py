@@ -0,0 +1,103 @@
+import threading
+import time
+from collections import Counter
+from datetime import date, datetime
+from types import SimpleNamespace
+
+from requests import exceptions as requests_exceptions
+
+from contrato_trabalho import ContratoTrabalhoLG, _ConsultaPaginada
+from utils.limitador_taxa import LimitadorTaxa
+from utils.resiliencia import DisjuntorCircuito, PoliticaRetentativa
+
+INICIO = date(2024, 1, 1)
+FIM = date(2024, 2, 1)
+TOTAL_PAGINAS = 6
+
+
+def _contrato(pagina):
+    return SimpleNamespace(
+        Pessoa=SimpleNamespace(Nome=f"Página {pagina}", Cpf=str(pagina)),
+        DataAdmissao=datetime(2024, 1, 10),
+        Cargo=SimpleNamespace(Descricao="Analista"),
+        CentroDeCusto=SimpleNamespace(Descricao="TI"),
+        Matricula=pagina,
+        SituacaoDoColaborador=SimpleNamespace(Descricao="Ativo"),
+        Empresa=SimpleNamespace(Codigo=10),
+    )
+
+
+class ServicoFalso:
+    """ConsultarListaPorDemanda com um contrato por página.
+
+    ``erros`` mapeia a página para os erros levantados, um por tentativa.
+    """
+
+    def __init__(self, atraso=lambda pagina: 0, erros=None):
+        self.atraso = atraso
+        self.erros = {pagina: list(lista) for pagina, lista in (erros or {}).items()}
+        self.chamadas = Counter()
+        self.concluidas = []
+        self._lock = threading.Lock()
+
+    def ConsultarListaPorDemanda(self, filtro, _soapheaders):
+        pagina = filtro.PaginaAtual
+        with self._lock:
+            self.chamadas[pagina] += 1
+            pendentes = self.erros.get(pagina)
+            erro = pendentes.pop(0) if pendentes else None
+        time.sleep(self.atraso(pagina))
+        if erro is not None:
+            raise erro
+        with self._lock:
+            self.concluidas.append(pagina)
+        return SimpleNamespace(TotalDePaginas=TOTAL_PAGINAS, Retorno=SimpleNamespace(ContratoDeTrabalhoParcial=[_contrato(pagina)]))
+
+
+def _iterar(servico, falhas=None):
+    lg = ContratoTrabalhoLG(concorrencia_por_tenant={"tenant": 4},
+                            politica_retentativa=PoliticaRetentativa(tentativas=3, espera_base=0, espera_maxima=0))
+    consulta = _ConsultaPaginada(
+        client=SimpleNamespace(service=servico),
+        filtro_factory=SimpleNamespace(FiltroDeContratoPorDemanda=SimpleNamespace),
+        filtros_especificos=None,
+        soapheaders={},
+        limitador=LimitadorTaxa(taxa_inicial=1000, taxa_maxima=1000),
+        disjuntor=DisjuntorCircuito()
+    )
+    lg._initialize_client = lambda **_: None
+    lg._preparar_consulta = lambda *_: consulta
+    return list(lg._iterar_paginas(INICIO, FIM, "tenant", "1", "operador@exemplo", "senha", falhas=falhas))
+
+
+def test_paginas_concluidas_fora_de_ordem_sao_entregues_em_ordem():
+    # Páginas mais altas respondem antes das mais baixas
+    servico = ServicoFalso(atraso=lambda pagina: (TOTAL_PAGINAS - pagina) * 0.03 if pagina else 0)
+
+    paginas = _iterar(servico)
+
+    assert servico.concluidas[1:] != sorted(servico.concluidas[1:])
+    assert [pagina for pagina, _, _ in paginas] == list(range(TOTAL_PAGINAS))
+    assert [contratos[0].matricula for _, _, contratos in paginas] == list(range(TOTAL_PAGINAS))
+    assert {total for _, total, _ in paginas} == {TOTAL_PAGINAS}
+
+
+def test_pagina_com_falha_temporaria_e_tentada_sozinha():
+    servico = ServicoFalso(erros={3: [requests_exceptions.ReadTimeout("parado")]})
+
+    paginas = _iterar(servico)
+
+    assert [pagina for pagina, _, _ in paginas] == list(range(TOTAL_PAGINAS))
+    assert servico.chamadas == Counter({pagina: 2 if pagina == 3 else 1 for pagina in range(TOTAL_PAGINAS)})
+
+
+def test_pagina_que_esgota_tentativas_e_pulada_e_registrada():
+    erro = requests_exceptions.ReadTimeout("parado")
+    servico = ServicoFalso(erros={2: [erro] * 3})
+    falhas = {}
+
+    paginas = _iterar(servico, falhas=falhas)
+
+    assert [pagina for pagina, _, _ in paginas] == [0, 1, 3, 4, 5]
+    assert falhas == {2: erro}
+    assert servico.chamadas[2] == 3
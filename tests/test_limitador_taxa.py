@@ -0,0 +1,119 @@
+import threading
+import time
+from types import SimpleNamespace
+from unittest import mock
+
+import pytest
+from zeep import exceptions as zeep_exceptions
+
+from contrato_trabalho import ContratoTrabalhoLG, _ConsultaPaginada
+from utils.cancelamento import BuscaCancelada, TokenCancelamento
+from utils.limitador_taxa import LimitadorTaxa, eh_throttling
+from utils.resiliencia import DisjuntorCircuito, PoliticaRetentativa
+
+
+def test_espera_por_token_e_interrompida_pelo_cancelamento():
+    # Na taxa mínima, o segundo token só viria em 10 s
+    limitador = LimitadorTaxa(taxa_inicial=0.1, taxa_minima=0.1)
+    limitador.adquirir()
+    cancelamento = TokenCancelamento()
+    threading.Timer(0.1, cancelamento.cancelar).start()
+
+    inicio = time.monotonic()
+    with pytest.raises(BuscaCancelada):
+        limitador.adquirir(cancelamento)
+
+    assert time.monotonic() - inicio < 2
+
+
+def test_throttling_corta_a_taxa_pela_metade_e_esvazia_o_balde():
+    limitador = LimitadorTaxa(taxa_inicial=8)
+    limitador.tokens = limitador.capacidade
+
+    limitador.registrar_throttling()
+
+    assert limitador.taxa == 4
+    assert limitador.tokens == 0
+    # Sem tokens, a próxima requisição espera 1/taxa
+    assert limitador.reservar() == pytest.approx(0.25, abs=0.01)
+    assert limitador.estado()["throttlings"] == 1
+
+
+def test_throttlings_seguidos_param_na_taxa_minima():
+    limitador = LimitadorTaxa(taxa_inicial=4, taxa_minima=0.5)
+
+    for _ in range(10):
+        limitador.registrar_throttling()
+
+    assert limitador.taxa == 0.5
+
+
+def test_respostas_rapidas_aumentam_a_taxa_de_forma_aditiva_ate_o_maximo():
+    limitador = LimitadorTaxa(taxa_inicial=4, taxa_maxima=5, latencia_alvo=3)
+
+    limitador.registrar_sucesso(0.5)
+    limitador.registrar_sucesso(0.5)
+    assert limitador.taxa == 4 + 2 * LimitadorTaxa.INCREMENTO
+
+    for _ in range(10):
+        limitador.registrar_sucesso(0.5)
+    assert limitador.taxa == 5
+
+
+def test_latencia_acima_do_alvo_reduz_a_taxa():
+    limitador = LimitadorTaxa(taxa_inicial=10, latencia_alvo=3)
+
+    limitador.registrar_sucesso(5)
+
+    assert limitador.taxa == pytest.approx(10 * LimitadorTaxa.FATOR_LATENCIA)
+
+
+def test_latencia_media_amortece_uma_resposta_lenta_isolada():
+    limitador = LimitadorTaxa(taxa_inicial=10, latencia_alvo=3)
+    limitador.registrar_sucesso(1)
+
+    # Média móvel: 1 + 0.2 * (9 - 1) = 2.6, ainda abaixo do alvo
+    limitador.registrar_sucesso(9)
+
+    assert limitador.latencia_media == pytest.approx(2.6)
+    assert limitador.taxa == 10 + 2 * LimitadorTaxa.INCREMENTO
+
+
+def test_falha_reduz_a_taxa_menos_que_throttling():
+    limitador = LimitadorTaxa(taxa_inicial=8)
+
+    limitador.registrar_falha()
+
+    assert limitador.taxa == 8 * LimitadorTaxa.FATOR_FALHA
+    assert limitador.estado()["falhas"] == 1
+
+
+@pytest.mark.parametrize("erro, esperado", [
+    (SimpleNamespace(status_code=429), True),
+    (SimpleNamespace(response=SimpleNamespace(status_code=503)), True),
+    (SimpleNamespace(status_code=500), False),
+    (TimeoutError("parado"), False),
+])
+def test_identifica_throttling_pelo_status(erro, esperado):
+    assert eh_throttling(erro) is esperado
+
+
+def test_pagina_com_throttling_reduz_a_taxa_do_tenant():
+    resposta = SimpleNamespace(TotalDePaginas=1)
+    servico = mock.Mock()
+    servico.ConsultarListaPorDemanda.side_effect = [zeep_exceptions.TransportError(status_code=429), resposta]
+    limitador = LimitadorTaxa(taxa_inicial=100, taxa_maxima=100)
+    consulta = _ConsultaPaginada(
+        client=SimpleNamespace(service=servico),
+        filtro_factory=mock.Mock(),
+        filtros_especificos=None,
+        soapheaders={},
+        limitador=limitador,
+        disjuntor=DisjuntorCircuito()
+    )
+    lg = ContratoTrabalhoLG(politica_retentativa=PoliticaRetentativa(tentativas=2, espera_base=0, espera_maxima=0))
+
+    assert lg._consultar_pagina(consulta, 0) is resposta
+    # Metade pelo throttling, mais um incremento pela resposta seguinte
+    assert limitador.taxa == 100 * LimitadorTaxa.FATOR_THROTTLING + LimitadorTaxa.INCREMENTO
+    assert limitador.estado()["throttlings"] == 1
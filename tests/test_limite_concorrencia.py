@@ -0,0 +1,128 @@
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+from unittest import mock
+
+import pytest
+
+from contrato_trabalho import ContratoTrabalhoLG, _ConsultaPaginada
+from utils.cancelamento import BuscaCancelada, TokenCancelamento
+from utils.limitador_taxa import LimitadorTaxa, LimiteConcorrencia
+from utils.resiliencia import DisjuntorCircuito
+
+
+def _consulta(servico):
+    return _ConsultaPaginada(
+        client=SimpleNamespace(service=servico),
+        filtro_factory=mock.Mock(),
+        filtros_especificos=None,
+        soapheaders={},
+        limitador=LimitadorTaxa(taxa_inicial=1000, taxa_maxima=1000),
+        disjuntor=DisjuntorCircuito()
+    )
+
+
+def test_paginas_de_buscas_diferentes_dividem_o_limite_global():
+    limite = LimiteConcorrencia(2)
+    em_andamento = []
+    maximo = [0]
+    lock = threading.Lock()
+
+    def consultar(**_):
+        with lock:
+            em_andamento.append(1)
+            maximo[0] = max(maximo[0], len(em_andamento))
+        time.sleep(0.05)
+        with lock:
+            em_andamento.pop()
+        return SimpleNamespace(TotalDePaginas=1)
+
+    servico = SimpleNamespace(ConsultarListaPorDemanda=consultar)
+    # Várias instâncias, como tenants/sessões diferentes buscando ao mesmo tempo
+    buscas = [(ContratoTrabalhoLG(), _consulta(servico)) for _ in range(6)]
+    with mock.patch("contrato_trabalho.get_limite_concorrencia", return_value=limite):
+        threads = [threading.Thread(target=lg._consultar_pagina, args=(consulta, 0)) for lg, consulta in buscas]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    assert maximo[0] == 2
+    assert limite.estado()["em_uso"] == 0
+
+
+def test_vaga_e_devolvida_quando_a_chamada_falha():
+    limite = LimiteConcorrencia(1)
+    servico = mock.Mock()
+    servico.ConsultarListaPorDemanda.side_effect = ValueError("erro fatal")
+
+    with mock.patch("contrato_trabalho.get_limite_concorrencia", return_value=limite):
+        with pytest.raises(ValueError):
+            ContratoTrabalhoLG()._consultar_pagina(_consulta(servico), 0)
+
+    assert limite.estado()["em_uso"] == 0
+
+
+def test_espera_por_vaga_e_interrompida_pelo_cancelamento():
+    limite = LimiteConcorrencia(1)
+    limite.adquirir()
+    cancelamento = TokenCancelamento()
+    threading.Timer(0.1, cancelamento.cancelar).start()
+
+    with pytest.raises(BuscaCancelada):
+        limite.adquirir(cancelamento)
+    limite.liberar()
+    assert limite.estado()["em_uso"] == 0
+
+
+def test_limite_assincrono_nao_bloqueia_o_event_loop():
+    limite = LimiteConcorrencia(1)
+    ordem = []
+
+    async def ocupar(nome):
+        await limite.aadquirir()
+        ordem.append(nome)
+        await asyncio.sleep(0.02)
+        limite.liberar()
+
+    async def executar():
+        await asyncio.gather(ocupar("a"), ocupar("b"), ocupar("c"))
+
+    asyncio.run(executar())
+
+    assert sorted(ordem) == ["a", "b", "c"]
+    assert limite.estado() == {"maximo": 1, "em_uso": 0, "esperas": 2}
+
+
+def test_espera_assincrona_e_acordada_por_liberar_de_outra_thread():
+    limite = LimiteConcorrencia(1)
+    limite.adquirir()
+
+    async def executar():
+        threading.Timer(0.05, limite.liberar).start()
+        await asyncio.wait_for(limite.aadquirir(), timeout=2)
+
+    asyncio.run(executar())
+
+    assert limite.estado() == {"maximo": 1, "em_uso": 1, "esperas": 1}
+    assert limite._avisos == []
+
+
+def test_espera_assincrona_cancelada_nao_ocupa_vaga():
+    limite = LimiteConcorrencia(1)
+    limite.adquirir()
+
+    async def executar():
+        espera = asyncio.ensure_future(limite.aadquirir())
+        await asyncio.sleep(0.02)
+        espera.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await espera
+
+    asyncio.run(executar())
+    limite.liberar()
+
+    assert limite.estado()["em_uso"] == 0
+    assert limite._avisos == []
+    limite.adquirir()
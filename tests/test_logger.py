@@ -0,0 +1,42 @@
+import logging
+import subprocess
+import sys
+from pathlib import Path
+
+from utils.logger import LoggerAmostrado, obter_logger_amostrado
+
+
+def _registrar_pagina(logger_amostrado):
+    logger_amostrado.info("página %d", 1)
+
+
+def test_registro_amostrado_aponta_para_quem_chamou(caplog):
+    logger_amostrado = LoggerAmostrado(logging.getLogger("teste.amostrado"), a_cada=1)
+
+    with caplog.at_level(logging.DEBUG, logger="teste.amostrado"):
+        _registrar_pagina(logger_amostrado)
+        logger_amostrado.log(logging.INFO, "direto")
+
+    primeiro, segundo = caplog.records
+    assert primeiro.funcName == "_registrar_pagina"
+    assert primeiro.getMessage() == "página 1"
+    assert segundo.funcName == "test_registro_amostrado_aponta_para_quem_chamou"
+    assert segundo.pathname == __file__
+
+
+def test_amostragem_lida_no_primeiro_registro(monkeypatch):
+    logger_amostrado = obter_logger_amostrado("teste.amostragem")
+    monkeypatch.setenv("LOG_AMOSTRAGEM", "7")
+
+    assert logger_amostrado.a_cada == 7
+
+
+def test_importar_modulos_nao_configura_o_logging():
+    codigo = (
+        "import logging, contrato_trabalho, utils.cache_wsdl;"
+        "print(len(logging.getLogger().handlers))"
+    )
+    saida = subprocess.run([sys.executable, "-c", codigo], capture_output=True, text=True,
+                           check=True, cwd=Path(__file__).resolve().parents[1])
+
+    assert saida.stdout.strip() == "0"
@@ -0,0 +1,162 @@
+from datetime import date, datetime
+from types import SimpleNamespace
+
+import pytest
+
+from contrato_trabalho import ContratoTrabalhoLG
+from utils.parser_lg import PaginaExtraida, RespostaNaoInterpretada
+
+INICIO = date(2024, 1, 1)
+FIM = date(2024, 2, 1)
+
+RESPOSTA_COM_DATA_NULA = b"""<?xml version="1.0" encoding="utf-8"?>
+<s:Envelope xmlns:s="http://schemas.xmlsoap.org/soap/envelope/"
+            xmlns:i="http://www.w3.org/2001/XMLSchema-instance">
+  <s:Body>
+    <ConsultarListaPorDemandaResponse>
+      <Retorno>
+        <TotalDePaginas>1</TotalDePaginas>
+        <ContratoDeTrabalhoParcial>
+          <Pessoa><Nome>Com Data</Nome><Cpf>111</Cpf></Pessoa>
+          <DataAdmissao>2024-01-15T00:00:00</DataAdmissao>
+          <Cargo><Descricao>Analista</Descricao></Cargo>
+          <CentroDeCusto><Descricao>TI</Descricao></CentroDeCusto>
+          <Matricula>1</Matricula>
+          <SituacaoDoColaborador><Descricao>Ativo</Descricao></SituacaoDoColaborador>
+          <Empresa><Codigo>10</Codigo></Empresa>
+        </ContratoDeTrabalhoParcial>
+        <ContratoDeTrabalhoParcial>
+          <Pessoa><Nome>Sem Data</Nome><Cpf>222</Cpf></Pessoa>
+          <DataAdmissao i:nil="true"/>
+          <Cargo><Descricao>Analista</Descricao></Cargo>
+          <CentroDeCusto><Descricao>TI</Descricao></CentroDeCusto>
+          <Matricula>2</Matricula>
+          <SituacaoDoColaborador><Descricao>Ativo</Descricao></SituacaoDoColaborador>
+          <Empresa><Codigo>10</Codigo></Empresa>
+        </ContratoDeTrabalhoParcial>
+        <ContratoDeTrabalhoParcial>
+          <Pessoa><Nome>Data Vazia</Nome><Cpf>333</Cpf></Pessoa>
+          <DataAdmissao></DataAdmissao>
+          <Cargo><Descricao>Analista</Descricao></Cargo>
+          <CentroDeCusto><Descricao>TI</Descricao></CentroDeCusto>
+          <Matricula>3</Matricula>
+          <SituacaoDoColaborador><Descricao>Ativo</Descricao></SituacaoDoColaborador>
+          <Empresa><Codigo>10</Codigo></Empresa>
+        </ContratoDeTrabalhoParcial>
+      </Retorno>
+    </ConsultarListaPorDemandaResponse>
+  </s:Body>
+</s:Envelope>"""
+
+
+def _lg():
+    # _processar_pagina não depende do estado do cliente
+    return ContratoTrabalhoLG.__new__(ContratoTrabalhoLG)
+
+
+def _contrato_zeep(matricula, data_admissao):
+    return SimpleNamespace(
+        Pessoa=SimpleNamespace(Nome=f"Contrato {matricula}", Cpf=str(matricula)),
+        DataAdmissao=data_admissao,
+        Cargo=SimpleNamespace(Descricao="Analista"),
+        CentroDeCusto=SimpleNamespace(Descricao="TI"),
+        Matricula=matricula,
+        SituacaoDoColaborador=SimpleNamespace(Descricao="Ativo"),
+        Empresa=SimpleNamespace(Codigo=10),
+    )
+
+
+def test_parser_rapido_data_admissao_nula_vira_none():
+    pytest.importorskip("lxml")
+    from utils.parser_lg import extrair_pagina
+
+    pagina = extrair_pagina(RESPOSTA_COM_DATA_NULA)
+
+    assert [registro[2] for registro in pagina.registros] == [date(2024, 1, 15), None, None]
+
+
+def test_parser_rapido_mantem_contratos_sem_data_ao_aparar_bordas():
+    pytest.importorskip("lxml")
+    from utils.parser_lg import extrair_pagina
+
+    contratos = _lg()._processar_pagina(extrair_pagina(RESPOSTA_COM_DATA_NULA), 0, INICIO, FIM)
+
+    assert [contrato.matricula for contrato in contratos] == [1, 2, 3]
+    assert [contrato.data_admissao for contrato in contratos] == [date(2024, 1, 15), None, None]
+
+
+def test_pagina_extraida_com_data_nula_respeita_filtros():
+    registros = [
+        ("Fora", "1", date(2023, 12, 31), "Analista", "TI", "1", "Ativo", "10"),
+        ("Sem Data", "2", None, "Analista", "TI", "2", "Ativo", "10"),
+        ("Outra Empresa", "3", None, "Analista", "TI", "3", "Ativo", "20"),
+    ]
+
+    contratos = _lg()._processar_pagina(PaginaExtraida(1, registros), 0, INICIO, FIM, frozenset({"10"}))
+
+    assert [contrato.matricula for contrato in contratos] == ['2']
+    assert contratos[0].data_admissao is None
+
+
+def test_resposta_zeep_com_data_nula():
+    resposta = SimpleNamespace(
+        TotalDePaginas=1,
+        Retorno=SimpleNamespace(ContratoDeTrabalhoParcial=[
+            _contrato_zeep(1, datetime(2024, 1, 15)),
+            _contrato_zeep(2, None),
+        ])
+    )
+
+    contratos = _lg()._processar_pagina(resposta, 0, INICIO, FIM)
+
+    assert [contrato.data_admissao for contrato in contratos] == [date(2024, 1, 15), None]
+    assert contratos[1]['data_admissao'] is None
+
+
+def _resposta_zeep_equivalente():
+    """O que o zeep devolve para RESPOSTA_COM_DATA_NULA (xsd:int -> int, dateTime -> datetime)."""
+    def contrato(nome, cpf, data_admissao, matricula):
+        return SimpleNamespace(
+            Pessoa=SimpleNamespace(Nome=nome, Cpf=cpf),
+            DataAdmissao=data_admissao,
+            Cargo=SimpleNamespace(Descricao="Analista"),
+            CentroDeCusto=SimpleNamespace(Descricao="TI"),
+            Matricula=matricula,
+            SituacaoDoColaborador=SimpleNamespace(Descricao="Ativo"),
+            Empresa=SimpleNamespace(Codigo=10),
+        )
+
+    return SimpleNamespace(TotalDePaginas=1, Retorno=SimpleNamespace(ContratoDeTrabalhoParcial=[
+        contrato("Com Data", "111", datetime(2024, 1, 15), 1),
+        contrato("Sem Data", "222", None, 2),
+        contrato("Data Vazia", "333", None, 3),
+    ]))
+
+
+def test_parser_rapido_e_zeep_produzem_os_mesmos_contratos():
+    pytest.importorskip("lxml")
+    from utils.parser_lg import extrair_pagina
+
+    pagina = extrair_pagina(RESPOSTA_COM_DATA_NULA)
+    rapido = _lg()._processar_pagina(pagina, 0, INICIO, FIM, frozenset({"10"}))
+    zeep = _lg()._processar_pagina(_resposta_zeep_equivalente(), 0, INICIO, FIM, frozenset({"10"}))
+
+    assert pagina.TotalDePaginas == 1
+    assert rapido == zeep
+    for contrato_rapido, contrato_zeep in zip(rapido, zeep):
+        assert [type(valor) for valor in contrato_rapido.para_linha()] == [type(valor) for valor in contrato_zeep.para_linha()]
+        assert type(contrato_rapido.matricula) is type(contrato_zeep.matricula) is int
+    assert [contrato.to_dict() for contrato in rapido] == [contrato.to_dict() for contrato in zeep]
+
+
+@pytest.mark.parametrize("trecho, valor", [
+    (b"<TotalDePaginas>1</TotalDePaginas>", b"<TotalDePaginas>um</TotalDePaginas>"),
+    (b"<Matricula>1</Matricula>", b"<Matricula>A1</Matricula>"),
+    (b"<DataAdmissao>2024-01-15T00:00:00</DataAdmissao>", b"<DataAdmissao>15/01/2024</DataAdmissao>"),
+])
+def test_valor_invalido_cai_no_zeep(trecho, valor):
+    pytest.importorskip("lxml")
+    from utils.parser_lg import extrair_pagina
+
+    with pytest.raises(RespostaNaoInterpretada):
+        extrair_pagina(RESPOSTA_COM_DATA_NULA.replace(trecho, valor))
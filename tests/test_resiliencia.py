@@ -0,0 +1,89 @@
+import asyncio
+import threading
+from types import SimpleNamespace
+from unittest import mock
+
+import pytest
+
+from contrato_trabalho import ContratoTrabalhoLG, _ConsultaPaginada
+from utils.cancelamento import BuscaCancelada, TokenCancelamento
+from utils.limitador_taxa import LimitadorTaxa, LimiteConcorrencia
+from utils.resiliencia import CircuitoAbertoError, DisjuntorCircuito
+
+
+def _disjuntor_meio_aberto():
+    disjuntor = DisjuntorCircuito(limite_falhas=1, tempo_aberto=0)
+    disjuntor.registrar_falha()
+    return disjuntor
+
+
+def _consulta(servico, disjuntor, cancelamento=None):
+    return _ConsultaPaginada(
+        client=SimpleNamespace(service=servico),
+        filtro_factory=mock.Mock(),
+        filtros_especificos=None,
+        soapheaders={},
+        limitador=LimitadorTaxa(taxa_inicial=1000, taxa_maxima=1000),
+        disjuntor=disjuntor,
+        cancelamento=cancelamento
+    )
+
+
+def test_meio_aberto_libera_uma_chamada_de_teste_por_vez():
+    disjuntor = _disjuntor_meio_aberto()
+
+    assert disjuntor.verificar()
+    with pytest.raises(CircuitoAbertoError):
+        disjuntor.verificar()
+
+
+def test_teste_cancelado_na_espera_por_vaga_e_liberado():
+    disjuntor = _disjuntor_meio_aberto()
+    limite = LimiteConcorrencia(1)
+    limite.adquirir()
+    cancelamento = TokenCancelamento()
+    threading.Timer(0.1, cancelamento.cancelar).start()
+    servico = mock.Mock()
+
+    with mock.patch("contrato_trabalho.get_limite_concorrencia", return_value=limite):
+        with pytest.raises(BuscaCancelada):
+            ContratoTrabalhoLG()._consultar_pagina(_consulta(servico, disjuntor, cancelamento), 0)
+
+    servico.ConsultarListaPorDemanda.assert_not_called()
+    assert disjuntor.estado()["situacao"] == DisjuntorCircuito.MEIO_ABERTO
+    # A próxima chamada pode fazer o teste
+    assert disjuntor.verificar()
+
+
+def test_teste_assincrono_cancelado_durante_a_chamada_e_liberado():
+    disjuntor = _disjuntor_meio_aberto()
+
+    async def consultar(**_):
+        await asyncio.sleep(10)
+
+    async def executar():
+        tarefa = asyncio.ensure_future(
+            ContratoTrabalhoLG()._aconsultar_pagina(_consulta(SimpleNamespace(ConsultarListaPorDemanda=consultar), disjuntor), 0)
+        )
+        await asyncio.sleep(0.05)
+        tarefa.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await tarefa
+
+    with mock.patch("contrato_trabalho.get_limite_concorrencia", return_value=LimiteConcorrencia(1)):
+        asyncio.run(executar())
+
+    assert disjuntor.verificar()
+
+
+def test_abandonar_teste_antigo_nao_libera_o_teste_seguinte():
+    disjuntor = _disjuntor_meio_aberto()
+    primeiro = disjuntor.verificar()
+    disjuntor.registrar_falha()
+    segundo = disjuntor.verificar()
+
+    disjuntor.abandonar_teste(primeiro)
+
+    assert segundo != primeiro
+    with pytest.raises(CircuitoAbertoError):
+        disjuntor.verificar()
@@ -0,0 +1,85 @@
+import socket
+import threading
+from types import SimpleNamespace
+from unittest import mock
+
+import pytest
+from requests import exceptions as requests_exceptions
+
+from contrato_trabalho import ContratoTrabalhoLG, _ConsultaPaginada
+from utils.cliente_lg import RegistroClientesLG
+from utils.limitador_taxa import LimitadorTaxa
+from utils.resiliencia import DisjuntorCircuito, PoliticaRetentativa
+
+
+@pytest.fixture
+def servidor_parado():
+    """Servidor que aceita a conexão e nunca responde."""
+    servidor = socket.socket()
+    servidor.bind(("127.0.0.1", 0))
+    servidor.listen()
+    conexoes = []
+
+    def aceitar():
+        try:
+            while True:
+                conexoes.append(servidor.accept()[0])
+        except OSError:
+            pass
+
+    threading.Thread(target=aceitar, daemon=True).start()
+    yield f"http://127.0.0.1:{servidor.getsockname()[1]}/"
+    servidor.close()
+    for conexao in conexoes:
+        conexao.close()
+
+
+def _registro(tempo_limite):
+    registro = RegistroClientesLG("https://lg.exemplo/wsdl", cache_wsdl=mock.Mock(), tempo_limite=tempo_limite)
+    # WSDL já compilado: _derivar_client só copia os atributos do cliente base
+    registro._client_base = SimpleNamespace()
+    return registro
+
+
+def test_cliente_sincrono_usa_tempo_limite_configurado():
+    cliente = _registro(tempo_limite=30).obter("operador@exemplo", "senha", "tenant", "1")
+
+    assert cliente.client.transport.operation_timeout == (RegistroClientesLG.TEMPO_LIMITE_CONEXAO, 30)
+
+
+def test_chamada_parada_estoura_tempo_limite(servidor_parado):
+    cliente = _registro(tempo_limite=0.2).obter("operador@exemplo", "senha", "tenant", "1")
+
+    with pytest.raises(requests_exceptions.Timeout):
+        cliente.client.transport.post(servidor_parado, b"<Envelope/>", {})
+
+
+def test_timeout_da_pagina_e_tentado_novamente():
+    resposta = SimpleNamespace(TotalDePaginas=1)
+    servico = mock.Mock()
+    servico.ConsultarListaPorDemanda.side_effect = [requests_exceptions.ReadTimeout("parado"), resposta]
+    consulta = _ConsultaPaginada(
+        client=SimpleNamespace(service=servico),
+        filtro_factory=mock.Mock(),
+        filtros_especificos=None,
+        soapheaders={},
+        limitador=LimitadorTaxa(taxa_inicial=1000, taxa_maxima=1000),
+        disjuntor=DisjuntorCircuito()
+    )
+    lg = ContratoTrabalhoLG(politica_retentativa=PoliticaRetentativa(tentativas=3, espera_base=0, espera_maxima=0))
+
+    assert lg._consultar_pagina(consulta, 0) is resposta
+    assert servico.ConsultarListaPorDemanda.call_count == 2
+
+
+def test_clientes_assincronos_usam_tempo_limite_e_compartilham_wsdl_client():
+    httpx = pytest.importorskip("httpx")
+    registro = _registro(tempo_limite=30)
+
+    primeiro = registro.obter_async("a@exemplo", "senha", "tenant", "1")
+    segundo = registro.obter_async("b@exemplo", "senha", "tenant", "1")
+
+    assert primeiro.session.timeout == httpx.Timeout(30, connect=RegistroClientesLG.TEMPO_LIMITE_CONEXAO)
+    assert primeiro.client.transport.wsdl_client is segundo.client.transport.wsdl_client
+    registro.limpar()
+    assert registro._wsdl_client_async is None
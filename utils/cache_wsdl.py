@@ -0,0 +1,233 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from zeep.transports import Transport
+
+from utils.logger import obter_logger
+
+logger = obter_logger(__name__)
+
+# Versão do formato do diretório de cache; alterar invalida caches antigos
+VERSAO_FORMATO = 1
+
+DIRETORIO_PADRAO = os.environ.get("LG_WSDL_CACHE_DIR", "./wsdl_cache")
+
+# Intervalo mínimo entre revalidações do WSDL em segundo plano (segundos)
+INTERVALO_REVALIDACAO = 24 * 60 * 60
+
+
+class CacheWsdl:
+    """Cache em disco do WSDL e de todos os XSD importados por ele.
+
+    Cada documento é gravado com o nome derivado do hash da URL, e um
+    ``manifest.json`` guarda a versão do formato, o hash do conteúdo e a data
+    da última revalidação. No modo ``offline`` o diretório é tratado como uma
+    cópia empacotada: nada é baixado e a ausência de um documento é um erro.
+    """
+
+    ARQUIVO_MANIFESTO = "manifest.json"
+
+    def __init__(self, diretorio: str = DIRETORIO_PADRAO, offline: bool = False,
+                 intervalo_revalidacao: float = INTERVALO_REVALIDACAO):
+        self.diretorio = diretorio
+        self.offline = offline
+        self.intervalo_revalidacao = intervalo_revalidacao
+        self._lock = threading.Lock()
+        self._revalidando = False
+        self._ao_atualizar: List[Callable[[], None]] = []
+        self._manifesto = self._carregar_manifesto()
+
+    def obter(self, url: str) -> Optional[bytes]:
+        """Retorna o conteúdo local de uma URL ou None se não estiver em cache."""
+        entrada = self._manifesto["documentos"].get(url)
+        if not entrada:
+            return None
+        try:
+            with open(os.path.join(self.diretorio, entrada["arquivo"]), "rb") as arquivo:
+                return arquivo.read()
+        except OSError:
+            return None
+
+    def salvar(self, url: str, conteudo: bytes) -> bool:
+        """Grava um documento no cache. Retorna True se o conteúdo mudou."""
+        if self.offline:
+            return False
+
+        sha256 = hashlib.sha256(conteudo).hexdigest()
+        with self._lock:
+            entrada = self._manifesto["documentos"].get(url)
+            if entrada and entrada["sha256"] == sha256:
+                return False
+
+            os.makedirs(self.diretorio, exist_ok=True)
+            nome_arquivo = hashlib.sha1(url.encode()).hexdigest() + ".xml"
+            self._gravar_atomico(nome_arquivo, conteudo)
+
+            self._manifesto["documentos"][url] = {
+                "arquivo": nome_arquivo,
+                "sha256": sha256,
+                "baixado_em": time.time()
+            }
+            self._manifesto.setdefault("revalidado_em", time.time())
+            self._salvar_manifesto()
+            return True
+
+    def ao_atualizar(self, callback: Callable[[], None]):
+        """Registra uma função chamada quando a revalidação encontra mudanças."""
+        self._ao_atualizar.append(callback)
+
+    def precisa_revalidar(self) -> bool:
+        if self.offline or not self._manifesto["documentos"]:
+            return False
+        revalidado_em = self._manifesto.get("revalidado_em", 0)
+        return time.time() - revalidado_em >= self.intervalo_revalidacao
+
+    def revalidar_em_segundo_plano(self, session) -> bool:
+        """Baixa novamente os documentos em uma thread separada, se necessário.
+
+        Args:
+            session: Sessão requests (já autenticada) usada para o download
+
+        Returns:
+            bool: True se uma revalidação foi iniciada
+        """
+        with self._lock:
+            if self._revalidando or not self.precisa_revalidar():
+                return False
+            self._revalidando = True
+
+        thread = threading.Thread(
+            target=self._revalidar,
+            args=(session,),
+            name="revalidacao-wsdl",
+            daemon=True
+        )
+        thread.start()
+        return True
+
+    def _revalidar(self, session):
+        """Baixa todos os documentos e só então os grava, de uma vez.
+
+        Se algum download falhar nada é gravado: o cache nunca mistura
+        documentos novos e antigos, e a revalidação é tentada de novo depois.
+        """
+        alterado = False
+        try:
+            baixados = {}
+            for url in list(self._manifesto["documentos"]):
+                try:
+                    resposta = session.get(url, timeout=30)
+                    resposta.raise_for_status()
+                except Exception as e:
+                    logger.warning("Falha ao revalidar %s: %s", url, e)
+                    return
+                baixados[url] = resposta.content
+
+            for url, conteudo in baixados.items():
+                alterado = self.salvar(url, conteudo) or alterado
+
+            with self._lock:
+                self._manifesto["revalidado_em"] = time.time()
+                self._salvar_manifesto()
+        finally:
+            self._revalidando = False
+
+        if alterado:
+            logger.info("WSDL da LG alterado no servidor; o cache local foi atualizado")
+            for callback in self._ao_atualizar:
+                try:
+                    callback()
+                except Exception as e:
+                    logger.warning("Erro ao notificar atualização do WSDL: %s", e)
+
+    def _carregar_manifesto(self) -> Dict:
+        vazio = {"versao": VERSAO_FORMATO, "documentos": {}}
+        try:
+            with open(os.path.join(self.diretorio, self.ARQUIVO_MANIFESTO), encoding="utf-8") as arquivo:
+                manifesto = json.load(arquivo)
+        except (OSError, ValueError):
+            return vazio
+
+        if manifesto.get("versao") != VERSAO_FORMATO:
+            return vazio
+        return manifesto
+
+    def _salvar_manifesto(self):
+        conteudo = json.dumps(self._manifesto, indent=2, sort_keys=True).encode("utf-8")
+        self._gravar_atomico(self.ARQUIVO_MANIFESTO, conteudo)
+
+    def _gravar_atomico(self, nome_arquivo: str, conteudo: bytes):
+        caminho = os.path.join(self.diretorio, nome_arquivo)
+        temporario = caminho + ".tmp"
+        with open(temporario, "wb") as arquivo:
+            arquivo.write(conteudo)
+        os.replace(temporario, caminho)
+
+
+class TransporteCacheWsdl(Transport):
+    """Transport do zeep que carrega WSDL/XSD a partir do CacheWsdl.
+
+    Só o carregamento de documentos passa pelo cache; as chamadas SOAP seguem
+    o caminho normal do Transport.
+    """
+
+    def __init__(self, cache_wsdl: CacheWsdl, **kwargs):
+        super().__init__(**kwargs)
+        self.cache_wsdl = cache_wsdl
+
+    def load(self, url):
+        conteudo = self.cache_wsdl.obter(url)
+        if conteudo is not None:
+            return conteudo
+
+        if self.cache_wsdl.offline:
+            raise IOError(f"Documento {url} não encontrado no diretório de WSDL {self.cache_wsdl.diretorio}")
+
+        conteudo = super().load(url)
+        self.cache_wsdl.salvar(url, conteudo)
+        return conteudo
+
+
+_cache_padrao: Optional[CacheWsdl] = None
+
+
+def configurar_cache_wsdl(diretorio: str, offline: bool = False) -> CacheWsdl:
+    """Define o cache de WSDL usado pelos clientes LG deste processo."""
+    global _cache_padrao
+    _cache_padrao = CacheWsdl(diretorio, offline=offline)
+    return _cache_padrao
+
+
+def get_cache_wsdl() -> CacheWsdl:
+    """Retorna o cache de WSDL do processo.
+
+    A variável de ambiente LG_WSDL_DIR ativa o modo offline com a cópia
+    empacotada do diretório indicado.
+    """
+    global _cache_padrao
+    if _cache_padrao is None:
+        diretorio_offline = os.environ.get("LG_WSDL_DIR")
+        if diretorio_offline:
+            _cache_padrao = CacheWsdl(diretorio_offline, offline=True)
+        else:
+            _cache_padrao = CacheWsdl(DIRETORIO_PADRAO)
+    return _cache_padrao
+
+
+# Exemplo de uso: python -m utils.cache_wsdl ./wsdl_lg
+# Baixa o WSDL e os XSD para o diretório, gerando uma cópia para --wsdl-dir.
+if __name__ == "__main__":
+    import sys
+    from zeep import Client
+    from contrato_trabalho import ContratoTrabalhoLG
+    from utils.logger import configurar_logging
+
+    configurar_logging()
+
+    destino = sys.argv[1] if len(sys.argv) > 1 else DIRETORIO_PADRAO
+    Client(wsdl=ContratoTrabalhoLG.WSDL_URL, transport=TransporteCacheWsdl(CacheWsdl(destino)))
+    logger.info("WSDL salvo em %s", destino)
@@ -0,0 +1,59 @@
+import threading
+from typing import Callable, List
+
+from utils.logger import obter_logger
+
+logger = obter_logger(__name__)
+
+
+class BuscaCancelada(Exception):
+    """A busca foi interrompida pelo usuário (TokenCancelamento.cancelar)."""
+
+
+class TokenCancelamento:
+    """Sinal de cancelamento compartilhado entre a tela e a busca em andamento.
+
+    A tela cria o token e chama ``cancelar``; controller, model e o laço de
+    páginas recebem o mesmo token e consultam ``verificar`` entre uma etapa e
+    outra. ``esperar`` substitui ``time.sleep`` nas esperas da busca para que
+    o cancelamento as interrompa na hora.
+    """
+
+    def __init__(self):
+        self._evento = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks: List[Callable[[], None]] = []
+
+    @property
+    def cancelado(self) -> bool:
+        return self._evento.is_set()
+
+    def cancelar(self):
+        """Sinaliza o cancelamento (chamadas repetidas são ignoradas)."""
+        with self._lock:
+            if self._evento.is_set():
+                return
+            self._evento.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                logger.warning("Erro ao notificar cancelamento: %s", e)
+
+    def ao_cancelar(self, callback: Callable[[], None]):
+        """Registra uma função chamada no cancelamento (na hora, se já cancelado)."""
+        with self._lock:
+            if not self._evento.is_set():
+                self._callbacks.append(callback)
+                return
+        callback()
+
+    def verificar(self):
+        """Levanta BuscaCancelada se o cancelamento foi pedido."""
+        if self._evento.is_set():
+            raise BuscaCancelada("Busca cancelada pelo usuário")
+
+    def esperar(self, segundos: float) -> bool:
+        """Dorme até ``segundos`` ou até o cancelamento; retorna se foi cancelado."""
+        return self._evento.wait(segundos)
@@ -0,0 +1,343 @@
+import asyncio
+import copy
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from requests import Session
+from requests.auth import HTTPBasicAuth
+from zeep import AsyncClient, Client, Settings
+from zeep.plugins import HistoryPlugin
+from zeep.transports import AsyncTransport, Transport
+
+from utils.cache_wsdl import CacheWsdl, TransporteCacheWsdl, get_cache_wsdl
+from utils.logger import obter_logger
+
+logger = obter_logger(__name__)
+
+# Tempo limite (s) de cada chamada SOAP à LG (conexão + resposta de uma página)
+TEMPO_LIMITE_PADRAO = float(os.environ.get("LG_TEMPO_LIMITE", "60"))
+
+
+class ClienteLG:
+    """Cliente SOAP da LG vinculado a um conjunto de credenciais.
+
+    O WSDL compilado é compartilhado com os demais clientes do mesmo registro;
+    aqui ficam apenas a sessão autenticada e os cabeçalhos SOAP da credencial.
+    Em clientes assíncronos, ``client`` é um ``zeep.AsyncClient`` e ``session``
+    um ``httpx.AsyncClient``, fechado no event loop em que é usado (``loop``).
+    Um cliente reservado (buscas em andamento) só tem a sessão fechada quando
+    a última reserva é devolvida.
+    """
+
+    def __init__(self, client: Client, session, operator_email: str,
+                 operator_password: str, tenet_id: str, ambiente: str):
+        self.client = client
+        self.session = session
+        self.operator_email = operator_email
+        self.operator_password = operator_password
+        self.tenet_id = tenet_id
+        self.ambiente = ambiente
+        self.ultimo_uso = time.monotonic()
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._cabecalhos = None
+        self._client_bruto = None
+        self._reservas = 0
+        self._descartado = False
+        self._fechamento = None
+        self._lock = threading.Lock()
+
+    @property
+    def client_bruto(self) -> Client:
+        """Cliente que devolve a resposta HTTP sem interpretá-la (raw_response).
+
+        Usado pelo parser rápido; compartilha WSDL, transporte e sessão com
+        ``client``.
+        """
+        if self._client_bruto is None:
+            client = copy.copy(self.client)
+            client.settings = Settings(raw_response=True)
+            client._default_service = None
+            self._client_bruto = client
+        return self._client_bruto
+
+    def cabecalhos_soap(self) -> Dict:
+        """Retorna os cabeçalhos LGContextoAmbiente e LGAutenticacao da credencial."""
+        if self._cabecalhos is None:
+            header_factory = self.client.type_factory('ns3')
+
+            contexto_ambiente = header_factory.LGContextoAmbiente(
+                Ambiente=self.ambiente
+            )
+
+            token_usuario = header_factory.LGTokenUsuario(
+                Senha=self.operator_password,
+                Usuario=self.operator_email,
+                GuidTenant=self.tenet_id
+            )
+
+            autenticacao = header_factory.LGAutenticacao(
+                TokenUsuario=token_usuario
+            )
+
+            self._cabecalhos = {
+                "LGContextoAmbiente": contexto_ambiente,
+                "LGAutenticacao": autenticacao
+            }
+        return self._cabecalhos
+
+    @property
+    def assincrono(self) -> bool:
+        return isinstance(self.client, AsyncClient)
+
+    def reservar(self):
+        """Marca o cliente como em uso por uma busca (ver devolver)."""
+        with self._lock:
+            self._reservas += 1
+
+    def devolver(self):
+        """Encerra uma reserva; fecha a sessão se o cliente já foi descartado."""
+        with self._lock:
+            self._reservas -= 1
+            fechar = self._descartado and self._reservas == 0
+        if fechar:
+            self._fechar_sessao()
+
+    def fechar(self):
+        """Libera as conexões HTTP da sessão, ou ao fim das reservas em andamento."""
+        with self._lock:
+            self._descartado = True
+            if self._reservas:
+                return
+        self._fechar_sessao()
+
+    def _fechar_sessao(self):
+        if not self.assincrono:
+            self.session.close()
+            return
+
+        # httpx.AsyncClient é fechado no loop em que foi usado, de qualquer thread
+        loop = self.loop
+        if loop is not None and not loop.is_closed():
+            self._fechamento = asyncio.run_coroutine_threadsafe(self.session.aclose(), loop)
+            return
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            # Nunca usado em um loop (ou o loop já acabou): fechar aqui mesmo
+            try:
+                asyncio.run(self.session.aclose())
+            except Exception as e:
+                logger.debug("Erro ao fechar sessão assíncrona de %s: %s", self.tenet_id, e)
+        else:
+            self._fechamento = asyncio.ensure_future(self.session.aclose())
+
+
+class RegistroClientesLG:
+    """Registro de clientes SOAP compartilhado por todo o processo.
+
+    O WSDL/XSD é lido do cache em disco (ou baixado, na primeira execução) e
+    compilado uma única vez por registro. Cada credencial (operador, tenant,
+    ambiente) recebe um cliente leve que reutiliza a definição compilada e só
+    acrescenta sessão autenticada e cabeçalhos.
+    Clientes ociosos por mais de ``tempo_ocioso`` segundos são descartados, e o
+    registro nunca mantém mais de ``max_clientes`` credenciais (LRU).
+    Cada chamada SOAP falha com timeout após ``tempo_limite`` segundos sem
+    resposta (a conexão, após TEMPO_LIMITE_CONEXAO), e entra nas novas
+    tentativas como qualquer erro temporário.
+    """
+
+    # Limites do pool de conexões httpx dos clientes assíncronos
+    MAX_CONEXOES_ASYNC = 20
+    MAX_CONEXOES_OCIOSAS_ASYNC = 10
+    # Tempo limite (s) para estabelecer a conexão com a LG
+    TEMPO_LIMITE_CONEXAO = 10
+
+    def __init__(self, wsdl_url: str, cache_wsdl: Optional[CacheWsdl] = None,
+                 tempo_ocioso: float = 900, max_clientes: int = 32,
+                 tempo_limite: float = TEMPO_LIMITE_PADRAO):
+        self.wsdl_url = wsdl_url
+        self.cache_wsdl = cache_wsdl or get_cache_wsdl()
+        self.tempo_ocioso = tempo_ocioso
+        self.max_clientes = max_clientes
+        self.tempo_limite = tempo_limite
+        self._lock = threading.Lock()
+        self._client_base: Optional[Client] = None
+        # httpx.Client exigido pelo AsyncTransport para ler WSDL; o WSDL já vem
+        # compilado, então um único cliente serve a todas as credenciais
+        self._wsdl_client_async = None
+        self._clientes: "OrderedDict[Tuple[str, str, str, bool], ClienteLG]" = OrderedDict()
+        self.cache_wsdl.ao_atualizar(self._invalidar_wsdl)
+
+    def obter(self, operator_email: str, operator_password: str, tenet_id: str, ambiente: str) -> ClienteLG:
+        """Retorna o cliente da credencial, criando-o se necessário."""
+        return self._obter(operator_email, operator_password, tenet_id, ambiente, assincrono=False)
+
+    def obter_async(self, operator_email: str, operator_password: str, tenet_id: str, ambiente: str,
+                    reservar: bool = False) -> ClienteLG:
+        """Retorna o cliente assíncrono (zeep.AsyncClient sobre httpx) da credencial.
+
+        A primeira chamada do processo pode compilar o WSDL de forma bloqueante;
+        quem estiver em um event loop deve fazê-la fora dele (run_in_executor).
+        Com ``reservar``, o cliente já volta reservado (ClienteLG.reservar) e a
+        sessão não é fechada por LRU, ociosidade ou nova versão do WSDL antes
+        de ``devolver``: um httpx.AsyncClient fechado não atende mais a busca.
+        """
+        return self._obter(operator_email, operator_password, tenet_id, ambiente, assincrono=True, reservar=reservar)
+
+    def precisa_compilar(self) -> bool:
+        """Indica se o próximo cliente criado vai compilar o WSDL."""
+        return self._client_base is None
+
+    def remover(self, operator_email: str, tenet_id: str, ambiente: str):
+        """Remove do registro os clientes (síncrono e assíncrono) de uma credencial."""
+        with self._lock:
+            for assincrono in (False, True):
+                self._descartar((operator_email, tenet_id, ambiente, assincrono))
+
+    def limpar(self):
+        """Descarta todos os clientes e o WSDL compilado."""
+        with self._lock:
+            for chave in list(self._clientes):
+                self._descartar(chave)
+            self._client_base = None
+            if self._wsdl_client_async is not None:
+                self._wsdl_client_async.close()
+                self._wsdl_client_async = None
+
+    def __len__(self):
+        return len(self._clientes)
+
+    def _obter(self, operator_email: str, operator_password: str, tenet_id: str, ambiente: str,
+               assincrono: bool, reservar: bool = False) -> ClienteLG:
+        chave = (operator_email, tenet_id, ambiente, assincrono)
+        agora = time.monotonic()
+
+        with self._lock:
+            self._remover_ociosos(agora)
+
+            cliente = self._clientes.get(chave)
+            if cliente is not None and cliente.operator_password == operator_password:
+                cliente.ultimo_uso = agora
+                self._clientes.move_to_end(chave)
+                if reservar:
+                    cliente.reservar()
+                return cliente
+
+            if cliente is not None:
+                # Senha alterada: descartar o cliente antigo
+                self._descartar(chave)
+
+            if assincrono:
+                cliente = self._criar_cliente_async(operator_email, operator_password, tenet_id, ambiente)
+            else:
+                cliente = self._criar_cliente(operator_email, operator_password, tenet_id, ambiente)
+            self._clientes[chave] = cliente
+            if reservar:
+                cliente.reservar()
+
+            while len(self._clientes) > self.max_clientes:
+                self._descartar(next(iter(self._clientes)))
+
+            return cliente
+
+    def _criar_cliente(self, operator_email: str, operator_password: str, tenet_id: str, ambiente: str) -> ClienteLG:
+        session = Session()
+        session.auth = HTTPBasicAuth(operator_email, operator_password)
+        self._compilar_wsdl(session)
+
+        transport = Transport(
+            session=session,
+            operation_timeout=(min(self.TEMPO_LIMITE_CONEXAO, self.tempo_limite), self.tempo_limite)
+        )
+        client = self._derivar_client(Client, transport)
+        return ClienteLG(client, session, operator_email, operator_password, tenet_id, ambiente)
+
+    def _criar_cliente_async(self, operator_email: str, operator_password: str, tenet_id: str, ambiente: str) -> ClienteLG:
+        import httpx
+
+        if self._client_base is None:
+            session_wsdl = Session()
+            session_wsdl.auth = HTTPBasicAuth(operator_email, operator_password)
+            self._compilar_wsdl(session_wsdl)
+
+        tempo_limite = httpx.Timeout(self.tempo_limite, connect=min(self.TEMPO_LIMITE_CONEXAO, self.tempo_limite))
+        if self._wsdl_client_async is None:
+            self._wsdl_client_async = httpx.Client(timeout=tempo_limite)
+
+        session = httpx.AsyncClient(
+            auth=(operator_email, operator_password),
+            timeout=tempo_limite,
+            limits=httpx.Limits(
+                max_connections=self.MAX_CONEXOES_ASYNC,
+                max_keepalive_connections=self.MAX_CONEXOES_OCIOSAS_ASYNC
+            )
+        )
+        client = self._derivar_client(
+            AsyncClient,
+            AsyncTransport(client=session, wsdl_client=self._wsdl_client_async)
+        )
+        return ClienteLG(client, session, operator_email, operator_password, tenet_id, ambiente)
+
+    def _compilar_wsdl(self, session: Session):
+        """Compila o WSDL (uma única vez) a partir do cache local.
+
+        Apenas o que ainda não estiver em disco é baixado, com a sessão da
+        primeira credencial.
+        """
+        if self._client_base is None:
+            self._client_base = Client(
+                wsdl=self.wsdl_url,
+                transport=TransporteCacheWsdl(self.cache_wsdl, session=session)
+            )
+            self.cache_wsdl.revalidar_em_segundo_plano(session)
+
+    def _derivar_client(self, classe, transport) -> Client:
+        """Cria um cliente da classe informada reaproveitando o WSDL já compilado."""
+        client = classe.__new__(classe)
+        client.__dict__.update(self._client_base.__dict__)
+        client.transport = transport
+        client.plugins = [HistoryPlugin()]
+        client._default_service = None
+        client._default_soapheaders = None
+        return client
+
+    def _invalidar_wsdl(self):
+        """Força a recompilação do WSDL após uma revalidação com mudanças."""
+        with self._lock:
+            # As próximas buscas recompilam. Os clientes atuais são fechados para
+            # liberar os pools de conexão: os reservados (buscas assíncronas em
+            # andamento) só ao fim da busca; uma busca síncrona segue funcionando
+            # (a sessão requests reabre o pool se for usada de novo)
+            self._client_base = None
+            for chave in list(self._clientes):
+                self._descartar(chave)
+
+    def _remover_ociosos(self, agora: float):
+        expirados = [
+            chave for chave, cliente in self._clientes.items()
+            if agora - cliente.ultimo_uso > self.tempo_ocioso
+        ]
+        for chave in expirados:
+            self._descartar(chave)
+
+    def _descartar(self, chave):
+        cliente = self._clientes.pop(chave, None)
+        if cliente is not None:
+            cliente.fechar()
+
+
+_registros: Dict[str, RegistroClientesLG] = {}
+_registros_lock = threading.Lock()
+
+
+def get_registro_clientes(wsdl_url: str) -> RegistroClientesLG:
+    """Retorna o registro de clientes do processo para o WSDL informado."""
+    with _registros_lock:
+        registro = _registros.get(wsdl_url)
+        if registro is None:
+            registro = RegistroClientesLG(wsdl_url)
+            _registros[wsdl_url] = registro
+        return registro
@@ -0,0 +1,334 @@
+import threading
+import unicodedata
+from bisect import bisect_left
+from collections.abc import Sequence as SequenceABC
+from datetime import date, datetime
+from operator import attrgetter
+from typing import Dict, Iterable, List, Optional, Sequence, Set
+
+# Colunas que podem ordenar o resultado, na ordem da tabela
+CAMPOS_ORDENACAO = ('matricula', 'nome', 'cpf', 'data_admissao', 'cargo', 'departamento', 'situacao', 'empresa')
+# Colunas com índice de valores (filtros por igualdade)
+CAMPOS_INDEXADOS = ('empresa', 'situacao', 'cargo')
+
+# Termos menores que isso buscam por prefixo no vocabulário; os demais, por trigramas
+TAMANHO_NGRAMA = 3
+
+
+class VisaoContratos(SequenceABC):
+    """Sequência de contratos selecionados por posição, sem copiar os registros."""
+
+    def __init__(self, contratos: Sequence, posicoes: Sequence[int]):
+        self._contratos = contratos
+        self._posicoes = posicoes
+
+    def __len__(self):
+        return len(self._posicoes)
+
+    def __getitem__(self, indice):
+        if isinstance(indice, slice):
+            return [self._contratos[posicao] for posicao in self._posicoes[indice]]
+        return self._contratos[self._posicoes[indice]]
+
+
+class IndiceContratos:
+    """Índices em memória sobre o resultado de uma busca de contratos.
+
+    Tudo é montado sob demanda e guardado até o resultado mudar:
+    permutações de ordenação por coluna, índices de valor (empresa, situação,
+    cargo) e o índice de texto. O índice de texto tem as palavras do nome
+    (com trigramas do vocabulário para buscar trechos) e a matrícula e o CPF
+    ordenados para busca por prefixo. Filtrar, ordenar e buscar nunca chama a
+    LG nem percorre os registros de novo; o resultado é uma VisaoContratos.
+
+    Aceita ``Contrato`` ou dicionários no formato antigo.
+    """
+
+    def __init__(self, contratos: Sequence):
+        self.contratos = contratos
+        self._lock = threading.Lock()
+        self._ordens: Dict[tuple, List[int]] = {}
+        self._valores: Dict[str, Dict[object, List[int]]] = {}
+        self._colunas: Dict[str, List] = {}
+        self._dicionarios = any(isinstance(contrato, dict) for contrato in contratos)
+        self._texto = None
+
+    def __len__(self):
+        return len(self.contratos)
+
+    def preparar(self):
+        """Monta de uma vez todos os índices e permutações (ex.: em segundo plano)."""
+        for campo in CAMPOS_INDEXADOS:
+            self._indice_valores(campo)
+        self._indice_texto()
+        for campo in CAMPOS_ORDENACAO:
+            self.ordem(campo)
+
+    def coluna(self, campo: str) -> List:
+        """Valores de uma coluna em todos os contratos, na ordem original."""
+        coluna = self._colunas.get(campo)
+        if coluna is None:
+            if self._dicionarios:
+                coluna = [_valor(contrato, campo) for contrato in self.contratos]
+            else:
+                coluna = list(map(_ATRIBUTOS[campo], self.contratos))
+            self._colunas[campo] = coluna
+        return coluna
+
+    def valores(self, campo: str) -> List:
+        """Valores distintos da coluna, ordenados (opções de filtro)."""
+        return sorted(self._indice_valores(campo), key=_chave_ordenacao)
+
+    def posicoes(self, campo: str, valor) -> List[int]:
+        """Posições dos contratos com ``campo == valor``."""
+        return self._indice_valores(campo).get(valor, [])
+
+    def ordem(self, campo: str, decrescente: bool = False) -> List[int]:
+        """Permutação das posições que ordena o resultado pela coluna."""
+        chave = (campo, decrescente)
+        ordem = self._ordens.get(chave)
+        if ordem is None:
+            with self._lock:
+                ordem = self._ordens.get(chave)
+                if ordem is None:
+                    crescente = self._ordens.get((campo, False))
+                    if crescente is None:
+                        # Uma chave por valor distinto (cargo, situação, data se repetem muito)
+                        chaves_por_valor = {}
+                        for valor in self.coluna(campo):
+                            if valor not in chaves_por_valor:
+                                chaves_por_valor[valor] = _chave_ordenacao(valor)
+                        categorias = {categoria for categoria, _, _ in chaves_por_valor.values()}
+                        if categorias == {0} or categorias == {1}:
+                            # Coluna só de números ou só de textos: comparar o valor, não a tupla
+                            parte = 1 if categorias == {0} else 2
+                            chaves_por_valor = {valor: chave[parte] for valor, chave in chaves_por_valor.items()}
+                        chaves = [chaves_por_valor[valor] for valor in self.coluna(campo)]
+                        crescente = sorted(range(len(chaves)), key=chaves.__getitem__)
+                        self._ordens[(campo, False)] = crescente
+                    ordem = crescente[::-1] if decrescente else crescente
+                    self._ordens[chave] = ordem
+        return ordem
+
+    def buscar_texto(self, texto: str) -> Set[int]:
+        """Posições dos contratos em que cada termo do texto aparece.
+
+        Um termo casa com um trecho de qualquer palavra do nome (prefixo, se
+        tiver menos de três letras) ou com o início da matrícula ou do CPF
+        (pontuação ignorada).
+        """
+        termos = _normalizar(texto).split()
+        if not termos:
+            return set(range(len(self.contratos)))
+
+        indice = self._indice_texto()
+        resultado = None
+        for termo in termos:
+            encontrados = indice.buscar(termo)
+            resultado = encontrados if resultado is None else resultado & encontrados
+            if not resultado:
+                break
+        return resultado
+
+    def consultar(self, texto: Optional[str] = None, filtros: Optional[Dict[str, object]] = None,
+                  ordenar_por: Optional[str] = None, decrescente: bool = False) -> Sequence:
+        """Aplica busca de texto, filtros por valor e ordenação.
+
+        Args:
+            texto: Termos buscados em nome, matrícula e CPF (vazio: todos)
+            filtros: Coluna -> valor exigido (ver CAMPOS_INDEXADOS); None é ignorado
+            ordenar_por: Coluna de ordenação (None: ordem original)
+            decrescente: Ordem decrescente
+
+        Returns:
+            Sequence: os contratos selecionados, na ordem pedida
+        """
+        selecionados = None
+        for campo, valor in (filtros or {}).items():
+            if valor is None:
+                continue
+            posicoes = set(self.posicoes(campo, valor))
+            selecionados = posicoes if selecionados is None else selecionados & posicoes
+        if texto and texto.strip():
+            encontrados = self.buscar_texto(texto)
+            selecionados = encontrados if selecionados is None else selecionados & encontrados
+
+        if selecionados is None:
+            if ordenar_por is None:
+                return self.contratos
+            return VisaoContratos(self.contratos, self.ordem(ordenar_por, decrescente))
+
+        if ordenar_por is None:
+            return VisaoContratos(self.contratos, sorted(selecionados))
+        if len(selecionados) * 8 < len(self.contratos):
+            # Poucos selecionados: ordenar só eles sai mais barato que percorrer a permutação
+            lugares = self._lugares(ordenar_por, decrescente)
+            return VisaoContratos(self.contratos, sorted(selecionados, key=lugares.__getitem__))
+        return VisaoContratos(
+            self.contratos,
+            [posicao for posicao in self.ordem(ordenar_por, decrescente) if posicao in selecionados]
+        )
+
+    def _lugares(self, campo: str, decrescente: bool) -> List[int]:
+        """Inverso da permutação: lugar de cada posição na ordem da coluna."""
+        ordem = self.ordem(campo, decrescente)
+        chave = ('lugares', campo, decrescente)
+        lugares = self._ordens.get(chave)
+        if lugares is None:
+            lugares = [0] * len(ordem)
+            for lugar, posicao in enumerate(ordem):
+                lugares[posicao] = lugar
+            self._ordens[chave] = lugares
+        return lugares
+
+    def _indice_valores(self, campo: str) -> Dict[object, List[int]]:
+        indice = self._valores.get(campo)
+        if indice is None:
+            with self._lock:
+                indice = self._valores.get(campo)
+                if indice is None:
+                    indice = {}
+                    for posicao, valor in enumerate(self.coluna(campo)):
+                        indice.setdefault(valor, []).append(posicao)
+                    self._valores[campo] = indice
+        return indice
+
+    def _indice_texto(self) -> "_IndiceTexto":
+        if self._texto is None:
+            with self._lock:
+                if self._texto is None:
+                    self._texto = _IndiceTexto(self)
+        return self._texto
+
+
+class _IndiceTexto:
+    """Palavras do nome -> posições, trigramas do vocabulário e prefixos de matrícula/CPF."""
+
+    def __init__(self, indice: IndiceContratos):
+        palavras: Dict[str, List[int]] = {}
+        normalizadas: Dict[str, str] = {}
+        for posicao, nome in enumerate(indice.coluna('nome')):
+            if not nome:
+                continue
+            for palavra in nome.split():
+                # Nomes e sobrenomes se repetem: normalizar cada palavra uma vez
+                normalizada = normalizadas.get(palavra)
+                if normalizada is None:
+                    normalizada = normalizadas[palavra] = _normalizar(palavra)
+                posicoes = palavras.get(normalizada)
+                if posicoes is None:
+                    palavras[normalizada] = [posicao]
+                elif posicoes[-1] != posicao:
+                    # Palavra repetida no mesmo nome entra uma vez só
+                    posicoes.append(posicao)
+
+        self.matriculas, self.posicoes_matricula = _ordenar_para_prefixo(
+            ['' if matricula is None else str(matricula).lower() for matricula in indice.coluna('matricula')]
+        )
+        self.cpfs, self.posicoes_cpf = _ordenar_para_prefixo(list(map(_so_digitos, indice.coluna('cpf'))))
+
+        self.palavras = palavras
+        self.vocabulario = sorted(palavras)
+        self.trigramas: Dict[str, List[str]] = {}
+        for palavra in self.vocabulario:
+            for trigrama in {palavra[i:i + TAMANHO_NGRAMA] for i in range(len(palavra) - TAMANHO_NGRAMA + 1)}:
+                self.trigramas.setdefault(trigrama, []).append(palavra)
+
+    def buscar(self, termo: str) -> Set[int]:
+        encontrados = set()
+        for palavra in self._palavras_com(termo):
+            encontrados.update(self.palavras[palavra])
+
+        encontrados.update(_prefixo(self.matriculas, self.posicoes_matricula, termo))
+        digitos = _so_digitos(termo)
+        if digitos and len(digitos) == len(termo.replace('.', '').replace('-', '').replace('/', '')):
+            encontrados.update(_prefixo(self.cpfs, self.posicoes_cpf, digitos))
+        return encontrados
+
+    def _palavras_com(self, termo: str) -> Iterable[str]:
+        if len(termo) < TAMANHO_NGRAMA:
+            inicio = bisect_left(self.vocabulario, termo)
+            fim = bisect_left(self.vocabulario, termo + '\uffff')
+            return self.vocabulario[inicio:fim]
+
+        listas = []
+        for i in range(len(termo) - TAMANHO_NGRAMA + 1):
+            candidatas = self.trigramas.get(termo[i:i + TAMANHO_NGRAMA])
+            if not candidatas:
+                return []
+            listas.append(candidatas)
+        # Conferir o termo inteiro só nas palavras da menor lista de trigramas
+        return [palavra for palavra in min(listas, key=len) if termo in palavra]
+
+
+def _ordenar_para_prefixo(chaves: List[str]):
+    """(chaves ordenadas, posição de cada uma), sem as vazias, para busca com bisect."""
+    ordem = sorted((posicao for posicao, chave in enumerate(chaves) if chave), key=chaves.__getitem__)
+    return [chaves[posicao] for posicao in ordem], ordem
+
+
+def _prefixo(chaves: List[str], posicoes: List[int], termo: str) -> List[int]:
+    inicio = bisect_left(chaves, termo)
+    fim = bisect_left(chaves, termo + '\uffff')
+    return posicoes[inicio:fim]
+
+
+# Atributo de Contrato de cada coluna
+_ATRIBUTOS = {campo: attrgetter('empresa_codigo' if campo == 'empresa' else campo) for campo in CAMPOS_ORDENACAO}
+
+
+def _valor(contrato, campo: str):
+    """Valor de uma coluna em um Contrato ou no dicionário do formato antigo."""
+    if isinstance(contrato, dict):
+        if campo == 'empresa':
+            return (contrato.get('empresa') or {}).get('Codigo')
+        valor = contrato.get(campo)
+        if campo == 'data_admissao' and isinstance(valor, str):
+            try:
+                return datetime.strptime(valor, '%d/%m/%Y').date()
+            except ValueError:
+                return None
+        return valor
+    if campo == 'empresa':
+        return contrato.empresa_codigo
+    return getattr(contrato, campo)
+
+
+def _chave_ordenacao(valor):
+    # Vazios por último; números (ex.: matrícula) antes de textos; textos sem acento/caixa
+    if valor is None or valor == '':
+        return (2, 0, '')
+    if isinstance(valor, (int, float)):
+        return (0, valor, '')
+    if isinstance(valor, date):
+        return (0, valor.toordinal(), '')
+    texto = str(valor)
+    if texto.isdigit():
+        return (0, int(texto), '')
+    return (1, 0, _normalizar(texto))
+
+
+# Acentos do português removidos sem passar pelo unicodedata (caminho comum)
+_SEM_ACENTO = str.maketrans('áàâãäéèêëíìîïóòôõöúùûüçñÁÀÂÃÄÉÈÊËÍÌÎÏÓÒÔÕÖÚÙÛÜÇÑ',
+                            'aaaaaeeeeiiiiooooouuuucnAAAAAEEEEIIIIOOOOOUUUUCN')
+
+
+def _normalizar(texto) -> str:
+    """Minúsculas e sem acentos."""
+    texto = str(texto)
+    if texto.isascii():
+        return texto.lower()
+    texto = texto.translate(_SEM_ACENTO)
+    if texto.isascii():
+        return texto.lower()
+    texto = unicodedata.normalize('NFKD', texto)
+    return ''.join(caractere for caractere in texto if not unicodedata.combining(caractere)).lower()
+
+
+def _so_digitos(valor) -> str:
+    if valor is None:
+        return ''
+    texto = str(valor)
+    if texto.isdigit():
+        return texto
+    return ''.join(caractere for caractere in texto if caractere.isdigit())
@@ -0,0 +1,255 @@
+import asyncio
+import os
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+# Requisições simultâneas à LG no processo todo, somando tenants e buscas
+MAX_REQUISICOES_SIMULTANEAS = int(os.environ.get("LG_MAX_REQUISICOES_SIMULTANEAS", "8"))
+
+
+class LimitadorTaxa:
+    """Token bucket com taxa adaptativa para as chamadas à API da LG.
+
+    A taxa (requisições por segundo) cresce de forma aditiva enquanto as
+    respostas chegam dentro da latência alvo e cai de forma multiplicativa
+    quando a latência passa do alvo, quando o servidor sinaliza throttling ou
+    quando ocorrem falhas.
+    """
+
+    # Acréscimo da taxa a cada resposta rápida (req/s)
+    INCREMENTO = 0.25
+    # Fatores de redução da taxa
+    FATOR_LATENCIA = 0.9
+    FATOR_FALHA = 0.75
+    FATOR_THROTTLING = 0.5
+    # Peso da última amostra na média móvel de latência
+    PESO_LATENCIA = 0.2
+
+    def __init__(self, taxa_inicial: float = 4.0, taxa_minima: float = 0.5, taxa_maxima: float = 20.0,
+                 latencia_alvo: float = 3.0):
+        self.taxa = taxa_inicial
+        self.taxa_minima = taxa_minima
+        self.taxa_maxima = taxa_maxima
+        self.latencia_alvo = latencia_alvo
+        self.tokens = 1.0
+        self.latencia_media = None
+        self.requisicoes = 0
+        self.throttlings = 0
+        self.falhas = 0
+        self._ultimo_abastecimento = time.monotonic()
+        self._lock = threading.Lock()
+
+    @property
+    def capacidade(self) -> float:
+        # Rajada máxima de um segundo de requisições
+        return max(1.0, self.taxa)
+
+    def reservar(self) -> float:
+        """Reserva um token e retorna quantos segundos esperar antes de usá-lo."""
+        with self._lock:
+            agora = time.monotonic()
+            decorrido = agora - self._ultimo_abastecimento
+            self._ultimo_abastecimento = agora
+            self.tokens = min(self.capacidade, self.tokens + decorrido * self.taxa)
+
+            self.tokens -= 1
+            self.requisicoes += 1
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.taxa
+
+    def adquirir(self, cancelamento=None):
+        """Bloqueia até que a requisição possa ser feita.
+
+        Args:
+            cancelamento: TokenCancelamento que interrompe a espera (BuscaCancelada)
+        """
+        espera = self.reservar()
+        if espera <= 0:
+            return
+        if cancelamento is None:
+            time.sleep(espera)
+        elif cancelamento.esperar(espera):
+            cancelamento.verificar()
+
+    async def aadquirir(self):
+        """Versão assíncrona de adquirir."""
+        espera = self.reservar()
+        if espera > 0:
+            await asyncio.sleep(espera)
+
+    def registrar_sucesso(self, latencia: float):
+        """Ajusta a taxa a partir da latência de uma resposta bem-sucedida."""
+        with self._lock:
+            if self.latencia_media is None:
+                self.latencia_media = latencia
+            else:
+                self.latencia_media += self.PESO_LATENCIA * (latencia - self.latencia_media)
+
+            if self.latencia_media > self.latencia_alvo:
+                self._reduzir(self.FATOR_LATENCIA)
+            else:
+                self.taxa = min(self.taxa_maxima, self.taxa + self.INCREMENTO)
+
+    def registrar_throttling(self):
+        """Servidor pediu para diminuir o ritmo (HTTP 429/503)."""
+        with self._lock:
+            self.throttlings += 1
+            self._reduzir(self.FATOR_THROTTLING)
+            # Esvaziar o balde para que a próxima requisição espere
+            self.tokens = min(self.tokens, 0.0)
+
+    def registrar_falha(self):
+        """Falha que não é throttling (timeout, fault, erro de conexão)."""
+        with self._lock:
+            self.falhas += 1
+            self._reduzir(self.FATOR_FALHA)
+
+    def estado(self) -> Dict:
+        """Retorna o estado atual do limitador, para acompanhamento e ajuste."""
+        with self._lock:
+            return {
+                "taxa": round(self.taxa, 3),
+                "taxa_minima": self.taxa_minima,
+                "taxa_maxima": self.taxa_maxima,
+                "tokens": round(self.tokens, 3),
+                "latencia_media": round(self.latencia_media, 3) if self.latencia_media is not None else None,
+                "latencia_alvo": self.latencia_alvo,
+                "requisicoes": self.requisicoes,
+                "throttlings": self.throttlings,
+                "falhas": self.falhas
+            }
+
+    def _reduzir(self, fator: float):
+        self.taxa = max(self.taxa_minima, self.taxa * fator)
+
+
+class LimiteConcorrencia:
+    """Limite de requisições em andamento à LG, compartilhado pelo processo.
+
+    O LimitadorTaxa controla o ritmo de cada tenant/operador; este limite vale
+    para todas as buscas juntas (vários tenants, várias sessões da tela), para
+    que a carga total na LG não cresça com o número de buscas em paralelo.
+    Cada ``adquirir`` deve ser seguido de um ``liberar``. As esperas
+    assíncronas não ocupam o event loop: ``liberar`` as acorda, de qualquer
+    thread, pelo loop de cada uma.
+    """
+
+    # Intervalo (s) com que a espera por uma vaga confere o cancelamento
+    INTERVALO_ESPERA = 0.05
+
+    def __init__(self, maximo: int):
+        if maximo < 1:
+            raise ValueError("O limite de requisições simultâneas deve ser maior que zero")
+        self.maximo = maximo
+        self.em_uso = 0
+        self.esperas = 0
+        self._semaforo = threading.BoundedSemaphore(maximo)
+        self._lock = threading.Lock()
+        # Esperas assíncronas pendentes: (loop, future acordado em liberar)
+        self._avisos = []
+
+    def adquirir(self, cancelamento=None):
+        """Bloqueia até haver uma vaga; com ``cancelamento``, a espera é interrompida."""
+        if not self._semaforo.acquire(blocking=False):
+            self._contar_espera()
+            while not self._semaforo.acquire(timeout=self.INTERVALO_ESPERA):
+                if cancelamento is not None:
+                    cancelamento.verificar()
+        self._ocupar()
+
+    async def aadquirir(self):
+        """Versão assíncrona de adquirir: aguarda um aviso de liberar, sem sondar."""
+        loop = asyncio.get_running_loop()
+        esperou = False
+        while True:
+            # O aviso é registrado antes de tentar, para não perder um liberar no meio
+            aviso = (loop, loop.create_future())
+            with self._lock:
+                self._avisos.append(aviso)
+            try:
+                if self._semaforo.acquire(blocking=False):
+                    break
+                if not esperou:
+                    esperou = True
+                    self._contar_espera()
+                await aviso[1]
+            finally:
+                with self._lock:
+                    self._avisos.remove(aviso)
+        self._ocupar()
+
+    def liberar(self):
+        """Devolve a vaga obtida em adquirir e acorda as esperas assíncronas."""
+        with self._lock:
+            self.em_uso -= 1
+            avisos = list(self._avisos)
+        self._semaforo.release()
+        for loop, futuro in avisos:
+            try:
+                loop.call_soon_threadsafe(_avisar, futuro)
+            except RuntimeError:
+                # Loop já encerrado: a espera dele não existe mais
+                pass
+
+    def estado(self) -> Dict:
+        """Retorna a ocupação atual do limite."""
+        with self._lock:
+            return {"maximo": self.maximo, "em_uso": self.em_uso, "esperas": self.esperas}
+
+    def _ocupar(self):
+        with self._lock:
+            self.em_uso += 1
+
+    def _contar_espera(self):
+        with self._lock:
+            self.esperas += 1
+
+
+def _avisar(futuro: asyncio.Future):
+    if not futuro.done():
+        futuro.set_result(None)
+
+
+def eh_throttling(erro: Exception) -> bool:
+    """Indica se o erro é o servidor pedindo para diminuir o ritmo."""
+    status = getattr(erro, "status_code", None)
+    if status is None:
+        status = getattr(getattr(erro, "response", None), "status_code", None)
+    return status in (429, 503)
+
+
+_limitadores: Dict[Tuple[str, str], LimitadorTaxa] = {}
+_limitadores_lock = threading.Lock()
+_limite_concorrencia: Optional[LimiteConcorrencia] = None
+
+
+def get_limitador(tenet_id: str, operator_email: str) -> LimitadorTaxa:
+    """Retorna o limitador do processo para o par (tenant, operador)."""
+    chave = (tenet_id, operator_email)
+    with _limitadores_lock:
+        limitador = _limitadores.get(chave)
+        if limitador is None:
+            limitador = LimitadorTaxa()
+            _limitadores[chave] = limitador
+        return limitador
+
+
+def estado_limitadores() -> Dict[str, Dict]:
+    """Retorna o estado de todos os limitadores, indexado por 'tenant/operador'."""
+    with _limitadores_lock:
+        limitadores = dict(_limitadores)
+    return {
+        f"{tenet_id}/{operator_email}": limitador.estado()
+        for (tenet_id, operator_email), limitador in limitadores.items()
+    }
+
+
+def get_limite_concorrencia() -> LimiteConcorrencia:
+    """Retorna o limite de requisições simultâneas do processo (LG_MAX_REQUISICOES_SIMULTANEAS)."""
+    global _limite_concorrencia
+    with _limitadores_lock:
+        if _limite_concorrencia is None:
+            _limite_concorrencia = LimiteConcorrencia(MAX_REQUISICOES_SIMULTANEAS)
+        return _limite_concorrencia
@@ -0,0 +1,151 @@
+import itertools
+import logging
+import os
+import sys
+import threading
+from typing import Dict, Optional
+
+from dotenv import load_dotenv
+
+FORMATO = "%(asctime)s %(levelname)-7s %(name)s: %(message)s"
+NIVEL_PADRAO = "INFO"
+# A cada quantos registros repetitivos (por contrato, por página) um é gravado
+AMOSTRAGEM_PADRAO = 100
+
+_configurado = False
+_lock = threading.Lock()
+
+
+class FormatadorEstruturado(logging.Formatter):
+    """Formato de texto com os campos estruturados ao final (``chave=valor``).
+
+    Os campos vêm de ``extra={"campos": {...}}`` e só são formatados quando o
+    registro de fato é emitido.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        texto = super().format(record)
+        campos = getattr(record, "campos", None)
+        if campos:
+            texto += " " + " ".join(f"{chave}={valor!r}" for chave, valor in campos.items())
+        return texto
+
+
+class LoggerAmostrado:
+    """Grava só um a cada ``a_cada`` registros de um logger.
+
+    Para logs por registro em laços quentes (um por contrato, por página):
+    quando o nível está desligado, a chamada custa uma comparação; quando
+    ligado, os registros descartados pela amostragem também não são
+    formatados. A mensagem usa os argumentos no estilo do ``logging``
+    (``"%s"``), nunca uma f-string. Sem ``a_cada``, a taxa vem de
+    ``LOG_AMOSTRAGEM`` no primeiro registro (depois de configurar_logging).
+    """
+
+    def __init__(self, logger: logging.Logger, a_cada: Optional[int] = None):
+        self.logger = logger
+        self._a_cada = max(1, a_cada) if a_cada is not None else None
+        self._contador = itertools.count()
+
+    @property
+    def a_cada(self) -> int:
+        if self._a_cada is None:
+            self._a_cada = _amostragem_configurada()
+        return self._a_cada
+
+    def log(self, nivel: int, mensagem: str, *args, **kwargs):
+        self._registrar(nivel, mensagem, args, kwargs)
+
+    def debug(self, mensagem: str, *args, **kwargs):
+        self._registrar(logging.DEBUG, mensagem, args, kwargs)
+
+    def info(self, mensagem: str, *args, **kwargs):
+        self._registrar(logging.INFO, mensagem, args, kwargs)
+
+    def _registrar(self, nivel: int, mensagem: str, args: tuple, kwargs: dict):
+        if not self.logger.isEnabledFor(nivel):
+            return
+        numero = next(self._contador)
+        if numero % self.a_cada == 0:
+            campos = dict(kwargs.pop("campos", None) or {})
+            if self.a_cada > 1:
+                campos["amostra"] = f"1/{self.a_cada}"
+            # Pilha: quem chamou -> log/debug/info -> _registrar -> Logger.log
+            self.logger.log(nivel, mensagem, *args, extra={"campos": campos}, stacklevel=3, **kwargs)
+
+
+def _amostragem_configurada() -> int:
+    try:
+        return max(1, int(os.environ.get("LOG_AMOSTRAGEM", AMOSTRAGEM_PADRAO)))
+    except ValueError:
+        return AMOSTRAGEM_PADRAO
+
+
+def _interpretar_nivel(valor: str, padrao: int) -> int:
+    nivel = logging.getLevelName(valor.strip().upper())
+    return nivel if isinstance(nivel, int) else padrao
+
+
+def _niveis_por_modulo(valor: str) -> Dict[str, int]:
+    """Interpreta ``LOG_NIVEIS`` (``modulo=NIVEL,outro.modulo=NIVEL``)."""
+    niveis = {}
+    for item in valor.split(","):
+        if "=" not in item:
+            continue
+        modulo, nivel = item.split("=", 1)
+        if modulo.strip():
+            niveis[modulo.strip()] = _interpretar_nivel(nivel, logging.NOTSET)
+    return niveis
+
+
+def configurar_logging(forcar: bool = False):
+    """Configura o logging da aplicação a partir do ``.env``.
+
+    Variáveis:
+        LOG_LEVEL: nível geral (DEBUG, INFO, WARNING, ERROR); padrão INFO
+        LOG_NIVEIS: níveis por módulo, ex. ``contrato_trabalho=DEBUG,controllers=WARNING``
+        LOG_AMOSTRAGEM: 1 a cada N registros repetitivos é gravado; padrão 100
+
+    Deve ser chamada pelos pontos de entrada (``__main__``), nunca na
+    importação de um módulo. Chamadas repetidas não fazem nada, a não ser com
+    ``forcar``.
+    """
+    global _configurado
+    with _lock:
+        if _configurado and not forcar:
+            return
+        load_dotenv()
+
+        raiz = logging.getLogger()
+        raiz.setLevel(_interpretar_nivel(os.environ.get("LOG_LEVEL", NIVEL_PADRAO), logging.INFO))
+        for handler in list(raiz.handlers):
+            if getattr(handler, "_da_aplicacao", False):
+                raiz.removeHandler(handler)
+        handler = logging.StreamHandler(sys.stderr)
+        handler.setFormatter(FormatadorEstruturado(FORMATO))
+        handler._da_aplicacao = True
+        raiz.addHandler(handler)
+
+        for modulo, nivel in _niveis_por_modulo(os.environ.get("LOG_NIVEIS", "")).items():
+            logging.getLogger(modulo).setLevel(nivel)
+
+        # Bibliotecas de rede só acima de WARNING, salvo pedido explícito
+        for ruidoso in ("zeep", "urllib3", "httpx"):
+            if logging.getLogger(ruidoso).level == logging.NOTSET:
+                logging.getLogger(ruidoso).setLevel(logging.WARNING)
+        _configurado = True
+
+
+def obter_logger(nome: str) -> logging.Logger:
+    """Logger do módulo (use ``__name__``); a saída é definida por configurar_logging."""
+    return logging.getLogger(nome)
+
+
+def obter_logger_amostrado(nome: str, a_cada: Optional[int] = None) -> LoggerAmostrado:
+    """Logger amostrado do módulo para logs por registro (ver LoggerAmostrado).
+
+    Args:
+        nome: Nome do logger (use ``__name__``)
+        a_cada: Taxa de amostragem (None: ``LOG_AMOSTRAGEM`` do ``.env``)
+    """
+    return LoggerAmostrado(logging.getLogger(nome), a_cada)
@@ -0,0 +1,122 @@
+from datetime import date
+from io import BytesIO
+from typing import List, NamedTuple, Optional, Tuple
+
+try:
+    from lxml import etree
+except ImportError:  # pragma: no cover - lxml vem junto com o zeep
+    etree = None
+
+# Caminho (relativo a ContratoDeTrabalhoParcial) -> posição do campo no registro
+CAMPOS_CONTRATO = {
+    ('Pessoa', 'Nome'): 0,
+    ('Pessoa', 'Cpf'): 1,
+    ('DataAdmissao',): 2,
+    ('Cargo', 'Descricao'): 3,
+    ('CentroDeCusto', 'Descricao'): 4,
+    ('Matricula',): 5,
+    ('SituacaoDoColaborador', 'Descricao'): 6,
+    ('Empresa', 'Codigo'): 7,
+}
+
+# Campos xsd:int no serviço (posição -> nome): convertidos como o zeep faz
+CAMPOS_INTEIROS = {5: 'Matricula', 7: 'Empresa.Codigo'}
+
+# Registro compacto: (nome, cpf, data_admissao, cargo, departamento, matricula, situacao, empresa_codigo)
+RegistroContrato = Tuple
+
+
+class RespostaNaoInterpretada(Exception):
+    """A resposta não pôde ser lida pelo caminho rápido (fault, HTML, XML inesperado)."""
+
+
+class PaginaExtraida(NamedTuple):
+    """Página de ConsultarListaPorDemanda lida diretamente do XML."""
+    TotalDePaginas: Optional[int]
+    registros: List[RegistroContrato]
+
+
+def parser_disponivel() -> bool:
+    return etree is not None
+
+
+def extrair_pagina(conteudo: bytes) -> PaginaExtraida:
+    """Lê TotalDePaginas e os oito campos usados de cada ContratoDeTrabalhoParcial.
+
+    O corpo SOAP é percorrido de forma incremental (iterparse) e cada contrato
+    é descartado da árvore assim que seus campos são lidos, sem montar o grafo
+    de objetos do zeep.
+
+    Os tipos dos campos são os mesmos que o zeep devolveria (matrícula e
+    código da empresa como ``int``, data de admissão como ``date``).
+
+    Raises:
+        RespostaNaoInterpretada: se a resposta contém um Fault, não é o XML
+            esperado ou traz um valor que não é do tipo do campo
+    """
+    if etree is None:
+        raise RespostaNaoInterpretada("lxml não está disponível")
+
+    total_paginas = None
+    registros = []
+    registro = None
+    caminho = []
+
+    try:
+        for evento, elemento in etree.iterparse(BytesIO(conteudo), events=('start', 'end')):
+            nome = elemento.tag.rpartition('}')[2] if isinstance(elemento.tag, str) else ''
+
+            if evento == 'start':
+                if nome == 'Fault':
+                    raise RespostaNaoInterpretada("Resposta contém SOAP Fault")
+                if registro is not None:
+                    caminho.append(nome)
+                elif nome == 'ContratoDeTrabalhoParcial':
+                    registro = [None] * len(CAMPOS_CONTRATO)
+                continue
+
+            if registro is None:
+                if nome == 'TotalDePaginas' and elemento.text:
+                    total_paginas = _inteiro(elemento.text, nome)
+                continue
+
+            if not caminho:
+                # Fim do ContratoDeTrabalhoParcial
+                registros.append(_converter(registro))
+                registro = None
+                elemento.clear()
+                while elemento.getprevious() is not None:
+                    del elemento.getparent()[0]
+                continue
+
+            posicao = CAMPOS_CONTRATO.get(tuple(caminho))
+            if posicao is not None:
+                registro[posicao] = elemento.text
+            caminho.pop()
+    except etree.XMLSyntaxError as e:
+        raise RespostaNaoInterpretada(f"XML inválido: {str(e)}")
+
+    return PaginaExtraida(total_paginas, registros)
+
+
+def _inteiro(texto: str, campo: str) -> int:
+    try:
+        return int(texto)
+    except ValueError:
+        raise RespostaNaoInterpretada(f"{campo} não é um inteiro: {texto!r}")
+
+
+def _converter(registro: list) -> RegistroContrato:
+    # DataAdmissao nula (xsi:nil) ou vazia vira None
+    data_admissao = (registro[2] or '').strip()
+    try:
+        registro[2] = (
+            date(int(data_admissao[0:4]), int(data_admissao[5:7]), int(data_admissao[8:10]))
+            if data_admissao else None
+        )
+    except ValueError:
+        raise RespostaNaoInterpretada(f"DataAdmissao inválida: {data_admissao!r}")
+    for posicao, campo in CAMPOS_INTEIROS.items():
+        texto = (registro[posicao] or '').strip()
+        registro[posicao] = _inteiro(texto, campo) if texto else None
+    return tuple(registro)
@@ -0,0 +1,64 @@
+from typing import FrozenSet, Iterable, NamedTuple, Optional, Set, Tuple
+
+# Acima disso a lista de empresas não vai para o servidor (filtro muito grande)
+MAX_EMPRESAS_SERVIDOR = 100
+
+
+class PlanoFiltros(NamedTuple):
+    """Divisão dos filtros de uma busca entre o servidor da LG e o cliente.
+
+    ``empresas_servidor`` são os códigos enviados em
+    FiltroDeContratoPorDemanda.Empresas (None: nenhum filtro de empresa no
+    servidor). ``empresas_locais`` são os códigos conferidos em cada contrato
+    recebido (None: nenhum filtro local).
+    """
+    empresas_servidor: Optional[Tuple[int, ...]] = None
+    empresas_locais: Optional[FrozenSet[str]] = None
+
+    @property
+    def filtra_empresas(self) -> bool:
+        return self.empresas_locais is not None
+
+
+SEM_FILTROS = PlanoFiltros()
+
+
+def planejar_filtros(empresas: Optional[Iterable[str]], campos_servidor: Set[str],
+                     max_empresas_servidor: int = MAX_EMPRESAS_SERVIDOR) -> PlanoFiltros:
+    """Decide quais filtros de empresa vão para o servidor e quais ficam locais.
+
+    Os códigos são enviados ao servidor quando o serviço aceita o campo
+    ``Empresas``, todos os códigos são numéricos (o serviço usa inteiros) e a
+    lista não passa de ``max_empresas_servidor``. O filtro local é sempre
+    mantido quando há empresas: é uma consulta a um conjunto por contrato e
+    garante o resultado mesmo que o servidor ignore o filtro.
+
+    Args:
+        empresas: Códigos das empresas desejadas (None ou vazio: todas)
+        campos_servidor: Campos aceitos por FiltroDeContratoPorDemanda no WSDL
+        max_empresas_servidor: Limite de códigos enviados ao servidor
+
+    Returns:
+        PlanoFiltros: filtros do servidor e filtros locais
+    """
+    if not empresas:
+        return SEM_FILTROS
+
+    codigos = frozenset(str(codigo) for codigo in empresas)
+    empresas_servidor = None
+    if ("Empresas" in campos_servidor
+            and len(codigos) <= max_empresas_servidor
+            and all(codigo.isdigit() for codigo in codigos)):
+        empresas_servidor = tuple(sorted(int(codigo) for codigo in codigos))
+
+    return PlanoFiltros(empresas_servidor, normalizar_codigos_empresa(codigos))
+
+
+def normalizar_codigos_empresa(codigos: Iterable) -> FrozenSet[str]:
+    """Conjunto de códigos para comparar com ``str(contrato.empresa_codigo)``.
+
+    Códigos numéricos podem chegar da LG sem zeros à esquerda ("001" como 1),
+    então as duas formas entram no conjunto.
+    """
+    codigos = frozenset(str(codigo) for codigo in codigos)
+    return codigos | {str(int(codigo)) for codigo in codigos if codigo.isdigit()}
@@ -0,0 +1,167 @@
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict
+
+from requests import exceptions as requests_exceptions
+from zeep import exceptions as zeep_exceptions
+
+# Status HTTP que indicam falha temporária do servidor
+STATUS_RETENTAVEIS = (408, 429, 500, 502, 503, 504)
+
+
+class CircuitoAbertoError(Exception):
+    """O disjuntor do tenant está aberto: a LG está falhando e a chamada nem foi feita."""
+
+
+class PoliticaRetentativa:
+    """Novas tentativas com backoff exponencial e jitter completo."""
+
+    def __init__(self, tentativas: int = 4, espera_base: float = 0.5, espera_maxima: float = 15.0):
+        self.tentativas = tentativas
+        self.espera_base = espera_base
+        self.espera_maxima = espera_maxima
+
+    def espera(self, tentativa: int) -> float:
+        """Segundos de espera após a tentativa (1, 2, ...) que falhou."""
+        limite = min(self.espera_maxima, self.espera_base * (2 ** (tentativa - 1)))
+        return random.uniform(0, limite)
+
+
+def eh_retentavel(erro: Exception) -> bool:
+    """Classifica um erro de chamada SOAP como temporário (True) ou fatal (False).
+
+    Falhas de rede, timeouts, respostas truncadas e status HTTP 408/429/5xx
+    são temporários. Faults SOAP (credenciais, filtro inválido etc.), demais
+    status 4xx e erros de programação são fatais.
+    """
+    if isinstance(erro, CircuitoAbertoError):
+        return False
+    if isinstance(erro, zeep_exceptions.Fault):
+        return False
+    if isinstance(erro, zeep_exceptions.TransportError):
+        return erro.status_code in STATUS_RETENTAVEIS
+    if isinstance(erro, zeep_exceptions.XMLSyntaxError):
+        return True
+    if isinstance(erro, (requests_exceptions.ConnectionError, requests_exceptions.Timeout)):
+        return True
+    if isinstance(erro, requests_exceptions.HTTPError):
+        status = getattr(erro.response, "status_code", None)
+        return status in STATUS_RETENTAVEIS
+
+    try:
+        import httpx
+        if isinstance(erro, (httpx.TransportError, httpx.TimeoutException)):
+            return True
+    except ImportError:
+        pass
+
+    return isinstance(erro, (TimeoutError, ConnectionError))
+
+
+class DisjuntorCircuito:
+    """Disjuntor (circuit breaker) das chamadas de um tenant.
+
+    Após ``limite_falhas`` falhas temporárias seguidas o circuito abre e as
+    chamadas falham imediatamente com CircuitoAbertoError. Passados
+    ``tempo_aberto`` segundos, uma chamada de teste é liberada (meio aberto):
+    se der certo o circuito fecha, se falhar volta a abrir. Uma chamada de
+    teste interrompida antes do resultado (cancelamento) libera o teste para
+    a próxima chamada (ver ``chamada``).
+    """
+
+    FECHADO = "fechado"
+    ABERTO = "aberto"
+    MEIO_ABERTO = "meio_aberto"
+
+    def __init__(self, limite_falhas: int = 5, tempo_aberto: float = 30.0):
+        self.limite_falhas = limite_falhas
+        self.tempo_aberto = tempo_aberto
+        self.situacao = self.FECHADO
+        self.falhas_seguidas = 0
+        self._aberto_em = 0.0
+        self._teste_em_andamento = False
+        self._numero_teste = 0
+        self._lock = threading.Lock()
+
+    def verificar(self) -> int:
+        """Levanta CircuitoAbertoError se a chamada não deve ser feita agora.
+
+        Returns:
+            int: Número da chamada de teste liberada (meio aberto) ou 0
+        """
+        with self._lock:
+            if self.situacao == self.FECHADO:
+                return 0
+
+            if self.situacao == self.ABERTO:
+                restante = self.tempo_aberto - (time.monotonic() - self._aberto_em)
+                if restante > 0:
+                    raise CircuitoAbertoError(f"LG indisponível; nova tentativa em {restante:.0f}s")
+                self.situacao = self.MEIO_ABERTO
+                self._teste_em_andamento = False
+
+            # Meio aberto: apenas uma chamada de teste por vez
+            if self._teste_em_andamento:
+                raise CircuitoAbertoError("LG indisponível; aguardando chamada de teste")
+            self._teste_em_andamento = True
+            self._numero_teste += 1
+            return self._numero_teste
+
+    def abandonar_teste(self, numero_teste: int):
+        """Libera a chamada de teste ``numero_teste`` que terminou sem resultado.
+
+        Não faz nada se o teste já registrou sucesso/falha ou se outro teste
+        começou depois dele.
+        """
+        with self._lock:
+            if self._teste_em_andamento and numero_teste == self._numero_teste:
+                self._teste_em_andamento = False
+
+    @contextmanager
+    def chamada(self):
+        """Envolve uma tentativa: verificar na entrada e, se a chamada de teste
+        sair sem registrar_sucesso/registrar_falha (BuscaCancelada,
+        CancelledError), abandonar_teste na saída."""
+        numero_teste = self.verificar()
+        try:
+            yield
+        finally:
+            if numero_teste:
+                self.abandonar_teste(numero_teste)
+
+    def registrar_sucesso(self):
+        with self._lock:
+            self.situacao = self.FECHADO
+            self.falhas_seguidas = 0
+            self._teste_em_andamento = False
+
+    def registrar_falha(self):
+        with self._lock:
+            self.falhas_seguidas += 1
+            self._teste_em_andamento = False
+            if self.situacao == self.MEIO_ABERTO or self.falhas_seguidas >= self.limite_falhas:
+                self.situacao = self.ABERTO
+                self._aberto_em = time.monotonic()
+
+    def estado(self) -> Dict:
+        with self._lock:
+            return {
+                "situacao": self.situacao,
+                "falhas_seguidas": self.falhas_seguidas
+            }
+
+
+_disjuntores: Dict[str, DisjuntorCircuito] = {}
+_disjuntores_lock = threading.Lock()
+
+
+def get_disjuntor(tenet_id: str) -> DisjuntorCircuito:
+    """Retorna o disjuntor do processo para o tenant."""
+    with _disjuntores_lock:
+        disjuntor = _disjuntores.get(tenet_id)
+        if disjuntor is None:
+            disjuntor = DisjuntorCircuito()
+            _disjuntores[tenet_id] = disjuntor
+        return disjuntor
@@ -0,0 +1,294 @@
+import threading
+from typing import List, Optional, Sequence
+
+import flet as ft
+
+from contrato_trabalho import Contrato
+from utils.indice_contratos import CAMPOS_ORDENACAO, IndiceContratos
+
+# Opções de linhas por página oferecidas ao usuário
+TAMANHOS_PAGINA = (25, 50, 100, 200)
+TAMANHO_PAGINA_PADRAO = 50
+
+COLUNAS = ["Matrícula", "Nome", "CPF", "Data Admissão", "Cargo", "Departamento", "Situação", "Empresa"]
+
+# Filtros por valor oferecidos acima da tabela (campo do índice -> rótulo)
+FILTROS = {"empresa": "Empresa", "situacao": "Situação", "cargo": "Cargo"}
+
+
+class TabelaContratos:
+    """Tabela paginada de contratos.
+
+    O resultado da busca fica apenas em memória (``contratos``); a tabela tem
+    um conjunto fixo de linhas, do tamanho da página, que são reaproveitadas a
+    cada troca de página. O custo de renderização e o volume enviado ao cliente
+    dependem só do tamanho da página, não do total de contratos.
+
+    Com o resultado completo, busca por texto, filtros e ordenação pelas
+    colunas usam um IndiceContratos (montado em segundo plano) e só trocam a
+    visão exibida (``contratos``), sem nova consulta à LG. Durante a busca,
+    enquanto páginas chegam, a barra de filtros fica desabilitada.
+
+    ``barra_filtros`` vai acima da tabela, ``data_table`` no lugar da antiga
+    tabela e ``barra_paginacao`` logo abaixo dela. Os métodos podem ser
+    chamados da thread da busca enquanto o usuário navega pelas páginas.
+    """
+
+    def __init__(self, tamanho_pagina: int = TAMANHO_PAGINA_PADRAO, largura: int = 1100):
+        # Resultado completo e a visão exibida (filtrada/ordenada)
+        self.resultado: Sequence = []
+        self.contratos: Sequence = []
+        # Se ``resultado`` é uma lista da própria tabela (pode receber páginas)
+        self._lista_propria = True
+        self._indice: Optional[IndiceContratos] = None
+        self._ordenacao = None
+        # Valor original de cada opção dos filtros (as opções do Dropdown são texto)
+        self._valores_filtro = {}
+        self.pagina = 0
+        self.tamanho_pagina = tamanho_pagina
+        self._linhas: List[ft.DataRow] = []
+        self._lock = threading.RLock()
+
+        self.data_table = ft.DataTable(
+            columns=[
+                ft.DataColumn(ft.Text(coluna, weight=ft.FontWeight.BOLD), on_sort=self._ordenar)
+                for coluna in COLUNAS
+            ],
+            rows=self._linhas,
+            border=ft.border.all(1, ft.colors.BLUE_GREY_200),
+            vertical_lines=ft.border.BorderSide(1, ft.colors.BLUE_GREY_200),
+            horizontal_lines=ft.border.BorderSide(1, ft.colors.BLUE_GREY_200),
+            heading_row_color=ft.colors.BLUE_50,
+            heading_row_height=50,
+            data_row_color=ft.colors.WHITE,
+            data_row_min_height=40,
+            data_row_max_height=40,
+            column_spacing=20,
+            width=largura,
+            horizontal_margin=10
+        )
+
+        self.texto_pagina = ft.Text(size=14, color=ft.colors.BLUE_GREY_700)
+        self.btn_primeira = ft.IconButton(icon=ft.icons.FIRST_PAGE, tooltip="Primeira página",
+                                          on_click=lambda e: self.ir_para_pagina(0))
+        self.btn_anterior = ft.IconButton(icon=ft.icons.CHEVRON_LEFT, tooltip="Página anterior",
+                                          on_click=lambda e: self.ir_para_pagina(self.pagina - 1))
+        self.btn_proxima = ft.IconButton(icon=ft.icons.CHEVRON_RIGHT, tooltip="Próxima página",
+                                         on_click=lambda e: self.ir_para_pagina(self.pagina + 1))
+        self.btn_ultima = ft.IconButton(icon=ft.icons.LAST_PAGE, tooltip="Última página",
+                                        on_click=lambda e: self.ir_para_pagina(self.total_paginas - 1))
+        self.tamanho_dropdown = ft.Dropdown(
+            width=120,
+            label="Por página",
+            value=str(tamanho_pagina),
+            options=[ft.dropdown.Option(str(tamanho)) for tamanho in TAMANHOS_PAGINA],
+            on_change=self._alterar_tamanho_pagina
+        )
+
+        self.barra_paginacao = ft.Row(
+            [
+                self.tamanho_dropdown,
+                ft.Container(expand=True),
+                self.btn_primeira,
+                self.btn_anterior,
+                self.texto_pagina,
+                self.btn_proxima,
+                self.btn_ultima
+            ],
+            alignment=ft.MainAxisAlignment.SPACE_BETWEEN
+        )
+
+        self.campo_busca = ft.TextField(
+            label="Buscar nome, matrícula ou CPF",
+            prefix_icon=ft.icons.SEARCH,
+            width=320,
+            on_change=lambda e: self._aplicar_consulta()
+        )
+        self.filtros = {
+            campo: ft.Dropdown(width=200, label=rotulo, options=[], on_change=lambda e: self._aplicar_consulta())
+            for campo, rotulo in FILTROS.items()
+        }
+        self.barra_filtros = ft.Row(
+            [self.campo_busca] + list(self.filtros.values()),
+            disabled=True
+        )
+
+        self._renderizar()
+
+    @property
+    def total_paginas(self) -> int:
+        return max(1, -(-len(self.contratos) // self.tamanho_pagina))
+
+    def definir_contratos(self, contratos: Optional[Sequence], manter_pagina: bool = False):
+        """Substitui o resultado exibido.
+
+        A sequência é guardada sem cópia; apenas a página visível vira controles.
+
+        Args:
+            contratos: Novo resultado (None: tabela vazia)
+            manter_pagina: Continua na página atual, se ela ainda existir, em vez
+                de voltar para a primeira
+        """
+        with self._lock:
+            self.resultado = self.contratos = contratos if contratos is not None else []
+            self._lista_propria = contratos is None
+            self._indice = IndiceContratos(self.resultado) if contratos else None
+            self._limpar_filtros()
+            self.pagina = min(self.pagina, self.total_paginas - 1) if manter_pagina else 0
+            self._renderizar()
+
+        if self._indice is not None:
+            # Índices de texto e ordenação prontos antes da primeira interação
+            threading.Thread(target=self._indice.preparar, name="indice_contratos", daemon=True).start()
+
+    def adicionar_contratos(self, contratos: Sequence):
+        """Acrescenta contratos ao final do resultado (busca em andamento).
+
+        A página exibida não muda; só as linhas dela e o contador são
+        atualizados, então o custo por chamada continua limitado ao tamanho
+        da página. Quem chama decide quando atualizar a tela.
+        """
+        with self._lock:
+            if not self._lista_propria:
+                self.resultado = list(self.resultado)
+                self._lista_propria = True
+            if self._indice is not None:
+                self._indice = None
+                self._limpar_filtros()
+            self.resultado.extend(contratos)
+            self.contratos = self.resultado
+            self._renderizar()
+
+    def limpar(self):
+        self.definir_contratos(None)
+
+    def ir_para_pagina(self, pagina: int):
+        """Exibe a página informada (limitada ao intervalo válido) e atualiza a tela."""
+        with self._lock:
+            pagina = min(max(pagina, 0), self.total_paginas - 1)
+            if pagina == self.pagina:
+                return
+            self.pagina = pagina
+            self._renderizar()
+        self._atualizar_tela()
+
+    def _ordenar(self, e):
+        """Clique no cabeçalho: ordena pela coluna usando a permutação do índice."""
+        with self._lock:
+            if self._indice is None:
+                return
+            self._ordenacao = (CAMPOS_ORDENACAO[e.column_index], not e.ascending)
+            self.data_table.sort_column_index = e.column_index
+            self.data_table.sort_ascending = e.ascending
+        self._aplicar_consulta()
+
+    def _aplicar_consulta(self):
+        """Recalcula a visão a partir do índice (texto, filtros e ordenação atuais)."""
+        with self._lock:
+            if self._indice is None:
+                return
+            campo, decrescente = self._ordenacao or (None, False)
+            self.contratos = self._indice.consultar(
+                texto=self.campo_busca.value,
+                filtros={
+                    campo_filtro: self._valores_filtro[campo_filtro].get(dropdown.value)
+                    for campo_filtro, dropdown in self.filtros.items()
+                },
+                ordenar_por=campo,
+                decrescente=decrescente
+            )
+            self.pagina = 0
+            self._renderizar()
+        self._atualizar_tela()
+
+    def _limpar_filtros(self):
+        """Zera busca, filtros e ordenação e recarrega as opções dos filtros."""
+        self._ordenacao = None
+        self.data_table.sort_column_index = None
+        self.campo_busca.value = ""
+        for campo, dropdown in self.filtros.items():
+            valores = self._indice.valores(campo) if self._indice is not None else []
+            self._valores_filtro[campo] = {str(valor): valor for valor in valores if valor not in (None, "")}
+            dropdown.value = ""
+            dropdown.options = [ft.dropdown.Option("", "Todos")] + [
+                ft.dropdown.Option(chave) for chave in self._valores_filtro[campo]
+            ]
+        self.barra_filtros.disabled = self._indice is None
+
+    def _alterar_tamanho_pagina(self, e):
+        with self._lock:
+            # Manter o primeiro contrato visível na nova página
+            primeiro = self.pagina * self.tamanho_pagina
+            self.tamanho_pagina = int(self.tamanho_dropdown.value)
+            self.pagina = primeiro // self.tamanho_pagina
+            self._renderizar()
+        self._atualizar_tela()
+
+    def _atualizar_tela(self):
+        page = self.data_table.page
+        if page is not None:
+            page.update()
+
+    def _renderizar(self):
+        """Preenche o conjunto fixo de linhas com os contratos da página atual."""
+        while len(self._linhas) < self.tamanho_pagina:
+            self._linhas.append(self._criar_linha())
+        del self._linhas[self.tamanho_pagina:]
+
+        inicio = self.pagina * self.tamanho_pagina
+        visiveis = self.contratos[inicio:inicio + self.tamanho_pagina]
+
+        for posicao, linha in enumerate(self._linhas):
+            if posicao < len(visiveis):
+                self._preencher_linha(linha, visiveis[posicao])
+                linha.visible = True
+            else:
+                linha.visible = False
+
+        total = len(self.contratos)
+        fim = inicio + len(visiveis)
+        filtrado = f" - filtrado de {len(self.resultado)}" if total != len(self.resultado) else ""
+        self.texto_pagina.value = (
+            f"Página {self.pagina + 1} de {self.total_paginas} ({inicio + 1}-{fim} de {total}{filtrado})"
+            if total else f"Nenhum registro{filtrado}"
+        )
+        self.btn_primeira.disabled = self.btn_anterior.disabled = self.pagina == 0
+        self.btn_proxima.disabled = self.btn_ultima.disabled = self.pagina >= self.total_paginas - 1
+
+    @staticmethod
+    def _criar_linha() -> ft.DataRow:
+        return ft.DataRow(
+            cells=[ft.DataCell(ft.Text()) for _ in range(6)] + [
+                ft.DataCell(
+                    ft.Container(
+                        content=ft.Text(color=ft.colors.WHITE, text_align=ft.TextAlign.CENTER),
+                        border_radius=15,
+                        padding=ft.padding.symmetric(horizontal=10, vertical=5)
+                    )
+                ),
+                ft.DataCell(ft.Text()),
+            ],
+            visible=False
+        )
+
+    @staticmethod
+    def _preencher_linha(linha: ft.DataRow, contrato):
+        if isinstance(contrato, Contrato):
+            valores = (contrato.matricula, contrato.nome, contrato.cpf, contrato.data_admissao_formatada,
+                       contrato.cargo, contrato.departamento)
+            situacao = contrato.situacao
+            empresa = contrato.empresa_codigo
+        else:
+            valores = tuple(contrato.get(campo, '') for campo in
+                            ('matricula', 'nome', 'cpf', 'data_admissao', 'cargo', 'departamento'))
+            situacao = contrato.get('situacao', '')
+            empresa = (contrato.get('empresa') or {}).get('Codigo', '')
+
+        celulas = linha.cells
+        for celula, valor in zip(celulas, valores):
+            celula.content.value = str(valor if valor is not None else '')
+
+        badge = celulas[6].content
+        badge.content.value = str(situacao or '')
+        badge.bgcolor = ft.colors.GREEN if situacao == 'Ativo' else ft.colors.RED_400
+        celulas[7].content.value = str(empresa if empresa is not None else '')